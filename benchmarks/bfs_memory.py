@@ -0,0 +1,119 @@
+"""
+Compare the path-copying BFS with the parent-pointer BFS of nodes.traversal.
+
+The graphs are built directly as in-memory snapshots, so no database is needed.
+Two shapes are generated, both with ~1M edges by default:
+
+- random: uniformly random edges, shallow BFS trees
+- layered: nodes arranged in layers with edges only to the next layer, so
+  every path is as deep as the number of layers
+
+Usage:
+    python -m benchmarks.bfs_memory [--edges 1000000] [--queries 5]
+"""
+
+import argparse
+import os
+import random
+import time
+import tracemalloc
+from collections import deque
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "graph_api.settings.test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from nodes.snapshot import GraphSnapshot  # noqa: E402
+from nodes.traversal import bfs  # noqa: E402
+
+
+def path_copying_bfs(snapshot, source, target):
+    """The original BFS, which stores a full path copy with every queue entry."""
+    if source == target:
+        return [source]
+
+    queue = deque([(source, [source])])
+    visited = {source}
+
+    while queue:
+        current, path = queue.popleft()
+
+        for neighbor in snapshot.successors(current):
+            if neighbor == target:
+                return path + [neighbor]
+
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append((neighbor, path + [neighbor]))
+
+    return None
+
+
+def random_graph(num_edges, rng):
+    num_nodes = num_edges // 10
+    sources = [rng.randrange(num_nodes) for _ in range(num_edges)]
+    targets = [rng.randrange(num_nodes) for _ in range(num_edges)]
+    return GraphSnapshot(0, list(range(num_nodes)), sources, targets)
+
+
+def layered_graph(num_edges, rng, width=100, degree=10):
+    layers = max(2, num_edges // (width * degree) + 1)
+    sources, targets = [], []
+    for layer in range(layers - 1):
+        for offset in range(width):
+            node = layer * width + offset
+            for _ in range(degree):
+                sources.append(node)
+                targets.append((layer + 1) * width + rng.randrange(width))
+    return GraphSnapshot(0, list(range(layers * width)), sources, targets)
+
+
+def measure(search, snapshot, pairs):
+    # Time and memory are measured in separate runs, tracemalloc slows
+    # allocation-heavy code down disproportionately
+    started = time.perf_counter()
+    lengths = [len(search(snapshot, s, t) or ()) for s, t in pairs]
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for s, t in pairs:
+        search(snapshot, s, t)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, lengths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for name, build in [("random", random_graph), ("layered", layered_graph)]:
+        snapshot = build(args.edges, rng)
+        n = len(snapshot)
+        # Last-layer / far-away targets force near-complete traversals
+        pairs = [
+            (rng.randrange(n // 10), n - 1 - rng.randrange(n // 10))
+            for _ in range(args.queries)
+        ]
+
+        print(f"{name}: {n} nodes, {snapshot.num_edges} edges, {len(pairs)} queries")
+        results = {}
+        for search in [path_copying_bfs, bfs]:
+            elapsed, peak, lengths = measure(search, snapshot, pairs)
+            results[search.__name__] = lengths
+            print(
+                f"  {search.__name__:<17} {elapsed:8.2f} s  "
+                f"peak {peak / 2**20:8.1f} MiB"
+            )
+        assert results["path_copying_bfs"] == results["bfs"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare the connections inspected by the plain and direction-optimizing BFS.
+
+The graph is a directed Chung-Lu power-law graph built directly as an
+in-memory snapshot, so no database is needed: node i gets the expected degree
+weight (i + 1) ** (-1 / (exponent - 1)), and both ends of every connection
+are drawn proportionally to those weights. A few hubs end up connected to a
+large part of the graph, which makes the middle BFS levels huge.
+
+Queries start at random nodes and target an isolated node, forcing complete
+traversals, which is the worst case of both searches.
+
+Usage:
+    python -m benchmarks.direction_optimizing [--edges 1000000] [--queries 5]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "graph_api.settings.test")
+
+import django  # noqa: E402
+
+django.setup()
+
+from nodes.snapshot import GraphSnapshot  # noqa: E402
+from nodes.traversal import bfs, direction_optimizing_bfs  # noqa: E402
+
+
+def power_law_graph(num_edges, rng, exponent=2.1, average_degree=10):
+    num_nodes = num_edges // average_degree
+    weights = [(i + 1) ** (-1 / (exponent - 1)) for i in range(num_nodes)]
+    cum_weights = list(itertools.accumulate(weights))
+    sources = rng.choices(range(num_nodes), cum_weights=cum_weights, k=num_edges)
+    targets = rng.choices(range(num_nodes), cum_weights=cum_weights, k=num_edges)
+    # One extra isolated node, unreachable from everywhere
+    return GraphSnapshot(0, list(range(num_nodes + 1)), sources, targets)
+
+
+def top_down_inspections(snapshot, source):
+    """Connections a plain top-down BFS inspects on a complete traversal."""
+    inspected = 0
+    seen = bytearray(len(snapshot))
+    seen[source] = 1
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for node in frontier:
+            successors = snapshot.successors(node)
+            inspected += len(successors)
+            for neighbor in successors:
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return inspected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    snapshot = power_law_graph(args.edges, rng)
+    target = len(snapshot) - 1
+    # Skip sources without outgoing connections, their traversal is trivial
+    candidates = [i for i in range(target) if snapshot.successors(i)]
+    sources = rng.sample(candidates, args.queries)
+
+    print(
+        f"power-law: {len(snapshot)} nodes, {snapshot.num_edges} edges, "
+        f"{len(sources)} queries"
+    )
+
+    totals = {"bfs": [0, 0.0], "direction_optimizing_bfs": [0, 0.0]}
+    for source in sources:
+        started = time.perf_counter()
+        assert bfs(snapshot, source, target) is None
+        totals["bfs"][1] += time.perf_counter() - started
+        totals["bfs"][0] += top_down_inspections(snapshot, source)
+
+        stats = {}
+        started = time.perf_counter()
+        assert direction_optimizing_bfs(snapshot, source, target, stats=stats) is None
+        totals["direction_optimizing_bfs"][1] += time.perf_counter() - started
+        totals["direction_optimizing_bfs"][0] += stats["edges_inspected"]
+
+    baseline = totals["bfs"][0]
+    for name, (inspected, elapsed) in totals.items():
+        print(
+            f"  {name:<24} {inspected / len(sources):12.0f} edges/query  "
+            f"{inspected / baseline:6.1%}  {elapsed:8.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
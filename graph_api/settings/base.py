@@ -169,3 +169,92 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
+
+# Periodic tasks, sent by a single `celery -A graph_api beat` process
+CELERY_BEAT_SCHEDULE = {
+    "prune-graph-changes": {
+        "task": "graph_api.prune_graph_changes",
+        # Seconds between two prunes of the graph change log
+        "schedule": env.int("GRAPH_CHANGE_LOG_PRUNE_INTERVAL", default=60 * 60),
+    },
+    "export-graph-csr": {
+        "task": "graph_api.export_graph_csr",
+        # Seconds between two CSR exports, a no-op unless GRAPH_CSR_DIR is set
+        "schedule": env.int("GRAPH_CSR_EXPORT_INTERVAL", default=10 * 60),
+    },
+}
+
+
+# Caches
+# Shortest-path answers are cached in Redis, keyed by the graph version
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "paths": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env.str("GRAPH_PATH_CACHE_URL", default=env("REDIS_URL")),
+        "TIMEOUT": env.int("GRAPH_PATH_CACHE_TIMEOUT", default=300),
+        "KEY_PREFIX": "graph_api",
+    },
+}
+
+
+# Graph Configuration
+# Default search mode of the find-path APIs (see nodes.constants.SEARCH_MODES)
+GRAPH_FIND_PATH_MODE = env.str("GRAPH_FIND_PATH_MODE", default="bidirectional")
+# On PostgreSQL, learn about graph writes through LISTEN/NOTIFY instead of
+# reading the graph version on every request
+GRAPH_VERSION_LISTENER = env.bool("GRAPH_VERSION_LISTENER", default=True)
+# Snapshots replay at most this many change log entries before reloading the
+# whole graph instead (0: always reload)
+GRAPH_SNAPSHOT_MAX_CHANGES = env.int("GRAPH_SNAPSHOT_MAX_CHANGES", default=10_000)
+# Versions of change log entries kept by prune_graph_changes_task
+GRAPH_CHANGE_LOG_RETENTION = env.int("GRAPH_CHANGE_LOG_RETENTION", default=100_000)
+# Directory of the memory-mapped CSR graph files written by export_graph_csr
+# and by the scheduled export_graph_csr_task, shared by the workers of a host
+# (empty: every process loads the graph from the database)
+GRAPH_CSR_DIR = env.str("GRAPH_CSR_DIR", default="")
+# Engine of the "bfs" search mode (see nodes.constants.BFS_ENGINES)
+GRAPH_BFS_ENGINE = env.str("GRAPH_BFS_ENGINE", default="python")
+# Maximum number of hops explored by the database-side ("cte") search mode
+GRAPH_CTE_MAX_DEPTH = env.int("GRAPH_CTE_MAX_DEPTH", default=10)
+# Ceilings on the max_depth and max_visited budgets of the FindPath API (0: none)
+GRAPH_FIND_PATH_MAX_DEPTH = env.int("GRAPH_FIND_PATH_MAX_DEPTH", default=0)
+GRAPH_FIND_PATH_MAX_VISITED = env.int("GRAPH_FIND_PATH_MAX_VISITED", default=0)
+# Landmarks used as A* bounds by the "weighted" search mode (0: plain Dijkstra)
+GRAPH_WEIGHTED_LANDMARKS = env.int("GRAPH_WEIGHTED_LANDMARKS", default=4)
+# Short-circuit unreachable pairs with the reachability index built by Celery
+GRAPH_REACHABILITY_INDEX = env.bool("GRAPH_REACHABILITY_INDEX", default=True)
+# Number of randomized interval labelings kept by the reachability index
+GRAPH_REACHABILITY_LABELS = env.int("GRAPH_REACHABILITY_LABELS", default=3)
+# Seconds after an index build finishes before the next build of the same
+# index may start; builds are locked in this cache shared by all processes
+GRAPH_INDEX_BUILD_INTERVAL = env.int("GRAPH_INDEX_BUILD_INTERVAL", default=30)
+GRAPH_INDEX_BUILD_CACHE_ALIAS = "paths"
+# Prune searches and short-circuit unreachable pairs with the hop distances
+# of the landmark index built by Celery
+GRAPH_LANDMARK_INDEX = env.bool("GRAPH_LANDMARK_INDEX", default=True)
+# Number of landmarks of that index, and how they are picked
+# (see nodes.constants.LANDMARK_STRATEGIES)
+GRAPH_LANDMARKS = env.int("GRAPH_LANDMARKS", default=8)
+GRAPH_LANDMARK_STRATEGY = env.str("GRAPH_LANDMARK_STRATEGY", default="degree")
+# Cache find-path answers in the "paths" cache
+GRAPH_PATH_CACHE = env.bool("GRAPH_PATH_CACHE", default=True)
+GRAPH_PATH_CACHE_ALIAS = "paths"
+# Paths longer than this many nodes are not cached
+GRAPH_PATH_CACHE_MAX_PATH_LENGTH = env.int(
+    "GRAPH_PATH_CACHE_MAX_PATH_LENGTH", default=100
+)
+# Maximum number of pairs accepted by the batch find-path API
+GRAPH_FIND_PATH_BATCH_MAX_PAIRS = env.int(
+    "GRAPH_FIND_PATH_BATCH_MAX_PAIRS", default=1000
+)
+# Maximum number of names accepted by the bulk node creation API
+GRAPH_BULK_MAX_NODES = env.int("GRAPH_BULK_MAX_NODES", default=10_000)
+# Maximum number of connections accepted by the bulk connect API
+GRAPH_BULK_MAX_CONNECTIONS = env.int("GRAPH_BULK_MAX_CONNECTIONS", default=10_000)
+# Maximum number of nodes returned by the neighborhood API
+GRAPH_NEIGHBORHOOD_MAX_NODES = env.int("GRAPH_NEIGHBORHOOD_MAX_NODES", default=1000)
+# Maximum number of source or target nodes accepted by the nearest-path API
+GRAPH_FIND_PATH_MAX_SET_SIZE = env.int("GRAPH_FIND_PATH_MAX_SET_SIZE", default=10_000)
@@ -8,6 +8,17 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "paths": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "graph-paths",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
 
 # Disable migrations during tests
 class DisableMigrations:
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Connection, Node
+from .models import Connection, GraphChange, Node
 
 
 @admin.register(Node)
@@ -18,7 +18,7 @@ class NodeAdmin(admin.ModelAdmin):
 class ConnectionAdmin(admin.ModelAdmin):
     """Admin interface for Connection model."""
 
-    list_display = ["from_node", "to_node", "created_at"]
+    list_display = ["from_node", "to_node", "weight", "created_at"]
     list_filter = ["created_at"]
     search_fields = ["from_node__name", "to_node__name"]
     readonly_fields = ["created_at"]
@@ -27,3 +27,18 @@ class ConnectionAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optimize queryset with select_related."""
         return super().get_queryset(request).select_related("from_node", "to_node")
+
+
+@admin.register(GraphChange)
+class GraphChangeAdmin(admin.ModelAdmin):
+    """Read-only admin interface for the graph change log."""
+
+    list_display = ["version", "kind", "node_id", "from_node_id", "to_node_id"]
+    list_filter = ["kind"]
+    ordering = ["-id"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
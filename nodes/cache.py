@@ -0,0 +1,109 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Returned by get_path when the cache has no answer for a pair
+MISSING = object()
+
+# What a cached path minimizes
+HOPS = "hops"
+WEIGHT = "weight"
+
+
+def _path_cache():
+    return caches[settings.GRAPH_PATH_CACHE_ALIAS]
+
+
+def _key(from_node_id, to_node_id, version: int, metric: str) -> str:
+    return f"path:{metric}:{version}:{from_node_id}:{to_node_id}"
+
+
+def _cacheable(path: Optional[List[str]]) -> bool:
+    return path is None or len(path) <= settings.GRAPH_PATH_CACHE_MAX_PATH_LENGTH
+
+
+def get_path(from_node_id, to_node_id, version: int, metric: str = HOPS):
+    """
+    Look up a cached find_path answer.
+
+    Args:
+        from_node_id: Id of the starting node
+        to_node_id: Id of the destination node
+        version: The current graph version
+        metric: What the path minimizes, HOPS or WEIGHT
+
+    Returns:
+        The cached path (a list of node names, or None for "no path"), or
+        MISSING if the pair is not cached at this graph version
+    """
+    if not settings.GRAPH_PATH_CACHE:
+        return MISSING
+
+    try:
+        return _path_cache().get(
+            _key(from_node_id, to_node_id, version, metric), MISSING
+        )
+    except Exception:
+        logger.warning("Path cache lookup failed", exc_info=True)
+        return MISSING
+
+
+def set_path(
+    from_node_id,
+    to_node_id,
+    version: int,
+    path: Optional[List[str]],
+    metric: str = HOPS,
+) -> None:
+    """
+    Cache a find_path answer, including "no path" answers.
+
+    Paths longer than GRAPH_PATH_CACHE_MAX_PATH_LENGTH nodes are not cached.
+    """
+    if not settings.GRAPH_PATH_CACHE or not _cacheable(path):
+        return
+
+    try:
+        _path_cache().set(_key(from_node_id, to_node_id, version, metric), path)
+    except Exception:
+        logger.warning("Path cache update failed", exc_info=True)
+
+
+def get_paths(pairs: Iterable[Tuple], version: int) -> Dict[Tuple, Optional[List]]:
+    """
+    Look up cached hop-count answers for many (from_node_id, to_node_id) pairs.
+
+    Returns:
+        A dict of pair -> cached path for the pairs found in the cache
+    """
+    if not settings.GRAPH_PATH_CACHE:
+        return {}
+
+    keys = {_key(f, t, version, HOPS): (f, t) for f, t in pairs}
+    try:
+        found = _path_cache().get_many(list(keys))
+    except Exception:
+        logger.warning("Path cache lookup failed", exc_info=True)
+        return {}
+
+    return {keys[key]: path for key, path in found.items()}
+
+
+def set_paths(paths: Dict[Tuple, Optional[List[str]]], version: int) -> None:
+    """Cache the hop-count answers of many (from_node_id, to_node_id) pairs."""
+    if not settings.GRAPH_PATH_CACHE:
+        return
+
+    values = {
+        _key(f, t, version, HOPS): path
+        for (f, t), path in paths.items()
+        if _cacheable(path)
+    }
+    try:
+        _path_cache().set_many(values)
+    except Exception:
+        logger.warning("Path cache update failed", exc_info=True)
@@ -11,3 +11,92 @@ class TASK_STATUSES(Enum):
     SUCCESS = "SUCCESS"
     FAILURE = "FAILURE"
     RETRY = "RETRY"
+
+
+class SEARCH_MODES(Enum):
+    """
+    Constants representing the available path search modes.
+    """
+
+    BFS = "bfs"
+    BIDIRECTIONAL = "bidirectional"
+    RECURSIVE_CTE = "cte"
+    FRONTIER_BATCHED = "lazy"
+    WEIGHTED = "weighted"
+    DIRECTION_OPTIMIZING = "hybrid"
+
+
+class BFS_ENGINES(Enum):
+    """
+    Constants representing the engines of the one-sided "bfs" search mode.
+    """
+
+    PYTHON = "python"
+    NUMPY = "numpy"
+
+
+class LANDMARK_STRATEGIES(Enum):
+    """
+    Constants representing how the stored landmark index picks its landmarks.
+    """
+
+    DEGREE = "degree"
+    RANDOM = "random"
+
+
+class NEIGHBORHOOD_DIRECTIONS(Enum):
+    """
+    Constants representing which connections a neighborhood query follows.
+    """
+
+    OUT = "out"
+    IN = "in"
+    BOTH = "both"
+
+
+class BULK_ITEM_STATUSES(Enum):
+    """
+    Constants representing the outcome of one item of a bulk write.
+    """
+
+    CREATED = "created"
+    EXISTS = "exists"
+    INVALID = "invalid"
+
+
+class EDGE_LIST_FORMATS(Enum):
+    """
+    Constants representing the file formats of imported and exported edge lists.
+    """
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class GRAPH_EXPORT_KINDS(Enum):
+    """
+    Constants representing which rows a graph export holds.
+    """
+
+    NODES = "nodes"
+    EDGES = "edges"
+
+
+class GRAPH_EXPORT_FORMATS(Enum):
+    """
+    Constants representing the file formats of a graph export.
+    """
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+    CSR = "csr"
+
+
+class GRAPH_INDEX_KINDS(Enum):
+    """
+    Constants representing the graph indexes built by Celery tasks.
+    """
+
+    REACHABILITY = "reachability"
+    LANDMARKS = "landmarks"
+    WEIGHTED_LANDMARKS = "weighted_landmarks"
@@ -0,0 +1,314 @@
+import csv
+import io
+import json
+import math
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from django.db import connection as db_connection
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .constants import EDGE_LIST_FORMATS, GRAPH_EXPORT_FORMATS, GRAPH_EXPORT_KINDS
+from .models import Connection, Node
+from .queries import node_ids_by_name
+from .signals import record_graph_rewrite
+from .snapshot import CHUNK_SIZE
+
+# (from_node name, to_node name, weight)
+Edge = Tuple[str, str, float]
+
+# Name of the per-transaction staging table of PostgreSQL imports
+STAGING_TABLE = "import_edges"
+
+CSV_HEADER = ["from_node", "to_node", "weight"]
+
+
+def _validate_edge(from_name, to_name, weight) -> Tuple[Optional[Edge], Optional[str]]:
+    """Return the edge with a default weight, or None and why it is invalid."""
+    max_length = Node._meta.get_field("name").max_length
+    for name in (from_name, to_name):
+        if not isinstance(name, str) or not name:
+            return None, "Node names must be non-empty strings."
+        if len(name) > max_length:
+            return None, f"Node names cannot be longer than {max_length} characters."
+    if from_name == to_name:
+        return None, "A node cannot connect to itself."
+
+    if weight is None or weight == "":
+        weight = 1.0
+    try:
+        if isinstance(weight, bool):
+            raise ValueError
+        weight = float(weight)
+    except (TypeError, ValueError):
+        return None, "The weight must be a number."
+    if not math.isfinite(weight) or weight < 0:
+        return None, "A connection weight must be finite and non-negative."
+
+    return (from_name, to_name, weight), None
+
+
+def read_edge_list(
+    lines: Iterable[str], fmt: str
+) -> Iterator[Tuple[int, Optional[Edge], Optional[str]]]:
+    """
+    Parse an edge list lazily, one line at a time.
+
+    CSV rows are ``from_node,to_node[,weight]``, with an optional header
+    row. NDJSON lines are objects with ``from_node``, ``to_node`` and an
+    optional ``weight``. The weight defaults to 1.0; blank lines are ignored.
+
+    Args:
+        lines: The lines of the file (CSV files opened with newline="")
+        fmt: One of EDGE_LIST_FORMATS
+
+    Yields:
+        (line number, edge, error) tuples, where edge is None and error
+        explains why for invalid lines
+    """
+    if fmt == EDGE_LIST_FORMATS.CSV.value:
+        reader = csv.reader(lines)
+        for row in reader:
+            if not row:
+                continue
+            if reader.line_num == 1 and row[:2] == CSV_HEADER[:2]:
+                continue
+            if len(row) not in (2, 3):
+                yield reader.line_num, None, "Expected 2 or 3 columns."
+                continue
+            weight = row[2] if len(row) == 3 else None
+            yield (reader.line_num, *_validate_edge(row[0], row[1], weight))
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON."
+            continue
+        if not isinstance(item, dict):
+            yield line_number, None, "Expected a JSON object."
+            continue
+        yield (
+            line_number,
+            *_validate_edge(
+                item.get("from_node"), item.get("to_node"), item.get("weight")
+            ),
+        )
+
+
+def _copy_batch(cursor, edges: Dict[Tuple[str, str], float]) -> None:
+    """Stage a batch with COPY and upsert it with two set-based statements."""
+    qn = db_connection.ops.quote_name
+    name_column = qn(Node._meta.get_field("name").column)
+    from_column = qn(Connection._meta.get_field("from_node").column)
+    to_column = qn(Connection._meta.get_field("to_node").column)
+    nodes_table = qn(Node._meta.db_table)
+    connections_table = qn(Connection._meta.db_table)
+    weight_column = qn(Connection._meta.get_field("weight").column)
+    timestamps = f'{qn("created_at")}, {qn("updated_at")}'
+    now = db_connection.ops.adapt_datetimefield_value(timezone.now())
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        (from_name, to_name, weight) for (from_name, to_name), weight in edges.items()
+    )
+    buffer.seek(0)
+
+    cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+    cursor.copy_expert(
+        f"COPY {STAGING_TABLE} (from_name, to_name, weight) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO {nodes_table} ({name_column}, {timestamps})
+        SELECT name, %s, %s
+        FROM (
+            SELECT from_name AS name FROM {STAGING_TABLE}
+            UNION
+            SELECT to_name FROM {STAGING_TABLE}
+        ) names
+        ON CONFLICT ({name_column}) DO NOTHING
+        """,
+        [now, now],
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO {connections_table}
+            ({from_column}, {to_column}, {weight_column}, {qn("created_at")})
+        SELECT f.{qn("id")}, t.{qn("id")}, e.weight, %s
+        FROM {STAGING_TABLE} e
+        JOIN {nodes_table} f ON f.{name_column} = e.from_name
+        JOIN {nodes_table} t ON t.{name_column} = e.to_name
+        ON CONFLICT ({from_column}, {to_column}) DO UPDATE
+            SET {weight_column} = EXCLUDED.{weight_column}
+            WHERE {connections_table}.{weight_column}
+                IS DISTINCT FROM EXCLUDED.{weight_column}
+        """,
+        [now],
+    )
+
+
+def _bulk_create_batch(edges: Dict[Tuple[str, str], float]) -> None:
+    """Upsert a batch with bulk_create, for databases without COPY."""
+    names = {name for edge in edges for name in edge}
+    Node.objects.bulk_create([Node(name=name) for name in names], ignore_conflicts=True)
+    node_ids = node_ids_by_name(names)
+    Connection.objects.bulk_create(
+        [
+            Connection(
+                from_node_id=node_ids[from_name],
+                to_node_id=node_ids[to_name],
+                weight=weight,
+            )
+            for (from_name, to_name), weight in edges.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["from_node", "to_node"],
+        update_fields=["weight"],
+    )
+
+
+def import_edges(
+    edges: Iterable[Edge],
+    batch_size: int = 50_000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Optional[int]:
+    """
+    Upsert an edge list into the graph in constant memory.
+
+    Missing nodes are created and existing connections take the imported
+    weight; when an edge is repeated, its last weight wins. On PostgreSQL
+    each batch is staged into a temporary table with COPY and merged with
+    one ``INSERT ... SELECT ... ON CONFLICT`` per table; other databases use
+    batched bulk_create. Everything runs in one transaction.
+
+    The rows are not logged one by one: the graph version is bumped once,
+    and the gap this leaves in the change log makes every worker reload
+    its snapshot. Model signals are not sent.
+
+    Args:
+        edges: Valid (from_node name, to_node name, weight) tuples
+        batch_size: Number of edges staged and merged at a time
+        progress: Called with the number of edges imported after each batch
+
+    Returns:
+        The new graph version, or None if there were no edges
+    """
+    edges = iter(edges)
+    imported = 0
+    with transaction.atomic(), db_connection.cursor() as cursor:
+        postgresql = db_connection.vendor == "postgresql"
+        if postgresql:
+            cursor.execute(
+                f"""
+                CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                    from_name text NOT NULL,
+                    to_name text NOT NULL,
+                    weight double precision NOT NULL
+                ) ON COMMIT DROP
+                """
+            )
+
+        while True:
+            batch = {}
+            for from_name, to_name, weight in islice(edges, batch_size):
+                batch[from_name, to_name] = weight
+                imported += 1
+            if not batch:
+                break
+
+            if postgresql:
+                _copy_batch(cursor, batch)
+            else:
+                _bulk_create_batch(batch)
+            if progress is not None:
+                progress(imported)
+
+        if not imported:
+            return None
+        return record_graph_rewrite()
+
+
+def _export_rows(kind: str) -> Tuple[List[str], QuerySet]:
+    """Return the column names and the rows of a node or connection export."""
+    if kind == GRAPH_EXPORT_KINDS.NODES.value:
+        return ["name"], Node.objects.order_by().values_list("name")
+    return CSV_HEADER, Connection.objects.order_by().values_list(
+        "from_node__name", "to_node__name", "weight"
+    )
+
+
+def export_rows(kind: str, fmt: str) -> Iterator[str]:
+    """
+    Stream the nodes or connections of the graph as CSV or NDJSON text.
+
+    Rows are read with QuerySet.iterator, which uses a server-side cursor on
+    PostgreSQL, and yielded CHUNK_SIZE rows at a time, so memory use does not
+    grow with the graph. Connection exports can be read back by import_graph.
+
+    Args:
+        kind: One of GRAPH_EXPORT_KINDS
+        fmt: GRAPH_EXPORT_FORMATS.CSV or GRAPH_EXPORT_FORMATS.NDJSON
+
+    Yields:
+        Chunks of text holding whole lines, starting with a header row for CSV
+    """
+    columns, rows = _export_rows(kind)
+    buffer = io.StringIO()
+    if fmt == GRAPH_EXPORT_FORMATS.CSV.value:
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        write_row = writer.writerow
+    else:
+
+        def write_row(row):
+            buffer.write(json.dumps(dict(zip(columns, row))) + "\n")
+
+    for count, row in enumerate(rows.iterator(chunk_size=CHUNK_SIZE), start=1):
+        write_row(row)
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def copy_rows(kind: str, file: TextIO) -> None:
+    """
+    Write the nodes or connections of the graph to a file as CSV with COPY.
+
+    ``COPY ... TO STDOUT`` streams the rows straight from the PostgreSQL
+    server into the file, with the same columns as export_rows. PostgreSQL
+    only.
+
+    Args:
+        kind: One of GRAPH_EXPORT_KINDS
+        file: Text file to write to
+    """
+    qn = db_connection.ops.quote_name
+    name_column = qn(Node._meta.get_field("name").column)
+    nodes_table = qn(Node._meta.db_table)
+    if kind == GRAPH_EXPORT_KINDS.NODES.value:
+        query = f"SELECT {name_column} AS name FROM {nodes_table}"
+    else:
+        query = f"""
+            SELECT f.{name_column} AS from_node, t.{name_column} AS to_node,
+                c.{qn("weight")} AS weight
+            FROM {qn(Connection._meta.db_table)} c
+            JOIN {nodes_table} f
+                ON f.{qn("id")} = c.{qn(Connection._meta.get_field("from_node").column)}
+            JOIN {nodes_table} t
+                ON t.{qn("id")} = c.{qn(Connection._meta.get_field("to_node").column)}
+        """
+
+    with db_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", file)
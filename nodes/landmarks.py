@@ -0,0 +1,403 @@
+import heapq
+import math
+import random
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .constants import GRAPH_INDEX_KINDS, LANDMARK_STRATEGIES
+from .models import LandmarkIndex
+from .reachability import ReachabilityHolder
+from .snapshot import GraphSnapshot
+from .traversal import UNREACHABLE_HOPS, distances_from
+
+# Pruned parent arrays kept per Landmarks instance, by group of targets
+PRUNED_CACHE_SIZE = 8
+
+# Largest number of (target group, node signature) tests pruned_parents
+# runs below graphs of this many nodes; above, at most one per node
+MIN_PRUNE_TESTS = 1 << 16
+
+
+class Landmarks:
+    """
+    Landmark distances for ALT (A*, landmarks, triangle inequality) bounds.
+
+    For every landmark L the distances L -> v (forward) and v -> L (backward)
+    are kept for all nodes v. The triangle inequality then gives, for any u
+    and t, d(u, t) >= max(d(L, t) - d(L, u), d(u, L) - d(t, L)), and proves
+    t unreachable from u when L reaches u but not t, or t reaches L but u
+    does not.
+
+    Attributes:
+        version: The graph version the distances were computed at
+        landmarks: Interned indices of the landmark nodes
+        forward: Per landmark, an array of distances from the landmark
+        backward: Per landmark, an array of distances to the landmark
+        weighted: Whether distances are connection weights or hop counts
+    """
+
+    def __init__(
+        self,
+        version: int,
+        landmarks: List[int],
+        forward: List[array],
+        backward: List[array],
+        weighted: bool,
+    ):
+        self.version = version
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+        self.weighted = weighted
+        self.unreachable = math.inf if weighted else UNREACHABLE_HOPS
+        self._signatures: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._pruned: Dict[bytes, Optional[bytes]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        snapshot: GraphSnapshot,
+        count: int,
+        weighted: bool,
+        strategy: str = LANDMARK_STRATEGIES.DEGREE.value,
+    ) -> "Landmarks":
+        """
+        Pick ``count`` landmarks and compute their distances.
+
+        Args:
+            snapshot: The graph snapshot to measure
+            count: Number of landmarks
+            weighted: Measure connection weights instead of hop counts
+            strategy: Pick the highest-degree nodes ("degree"), or nodes at
+                random, seeded by the graph version ("random")
+        """
+        n = len(snapshot)
+        if strategy == LANDMARK_STRATEGIES.RANDOM.value:
+            candidates = [
+                i
+                for i, node_id in enumerate(snapshot.node_ids)
+                if snapshot.intern(node_id) == i
+            ]
+            rng = random.Random(snapshot.version)
+            landmarks = rng.sample(candidates, min(count, len(candidates)))
+        else:
+            landmarks = heapq.nlargest(
+                min(count, n),
+                range(n),
+                key=lambda i: (
+                    snapshot.offsets[i + 1]
+                    - snapshot.offsets[i]
+                    + snapshot.in_offsets[i + 1]
+                    - snapshot.in_offsets[i]
+                ),
+            )
+        return cls.compute(snapshot, landmarks, weighted)
+
+    @classmethod
+    def compute(
+        cls, snapshot: GraphSnapshot, landmarks: List[int], weighted: bool
+    ) -> "Landmarks":
+        """Compute the forward and backward distances of the given landmarks."""
+        n = len(snapshot)
+        forward, backward = [], []
+        for landmark in landmarks:
+            forward.append(
+                distances_from(
+                    snapshot.offsets,
+                    snapshot.targets,
+                    snapshot.weights if weighted else None,
+                    landmark,
+                    n,
+                )
+            )
+            backward.append(
+                distances_from(
+                    snapshot.in_offsets,
+                    snapshot.in_sources,
+                    snapshot.in_weights if weighted else None,
+                    landmark,
+                    n,
+                )
+            )
+        return cls(snapshot.version, list(landmarks), forward, backward, weighted)
+
+    def lower_bound(self, node: int, target: int) -> float:
+        """
+        Return a lower bound of the distance from ``node`` to ``target``.
+
+        Returns:
+            The largest triangle-inequality bound over all landmarks, or
+            infinity if the landmarks prove ``target`` unreachable
+        """
+        unreachable = self.unreachable
+        bound = 0
+        for forward, backward in zip(self.forward, self.backward):
+            from_landmark = forward[node]
+            if from_landmark != unreachable:
+                to_target = forward[target]
+                if to_target == unreachable:
+                    return math.inf
+                if to_target - from_landmark > bound:
+                    bound = to_target - from_landmark
+
+            target_to_landmark = backward[target]
+            if target_to_landmark != unreachable:
+                node_to_landmark = backward[node]
+                if node_to_landmark == unreachable:
+                    return math.inf
+                if node_to_landmark - target_to_landmark > bound:
+                    bound = node_to_landmark - target_to_landmark
+
+        return bound
+
+    def _signature_words(self, masks: List[np.ndarray]) -> np.ndarray:
+        """Pack one bit per mask into rows of 64-bit words, one row per entry."""
+        words = np.zeros((len(masks[0]), (len(masks) + 63) // 64), dtype=np.uint64)
+        for bit, mask in enumerate(masks):
+            words[:, bit // 64] |= mask.astype(np.uint64) << np.uint64(bit % 64)
+        return words
+
+    def _node_signatures(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the distinct pruning signatures of the nodes, built once.
+
+        Each landmark gives two pruning masks: the nodes it reaches, and the
+        nodes that do not reach it. Bit k of a node's signature is set when
+        the node is in the first mask of landmark k, and bit K + k when it is
+        in the second one. Nodes sharing a signature are pruned together, so
+        pruned_parents works on the few distinct signatures, not on every node.
+
+        Returns:
+            The distinct signatures as rows of 64-bit words, and the row of
+            every interned node
+        """
+        signatures = self._signatures
+        if signatures is None:
+            unreachable = self.unreachable
+            words = self._signature_words(
+                [
+                    np.frombuffer(distances, dtype=distances.typecode) != unreachable
+                    for distances in self.forward
+                ]
+                + [
+                    np.frombuffer(distances, dtype=distances.typecode) == unreachable
+                    for distances in self.backward
+                ]
+            )
+            if words.shape[1] == 1:
+                unique, inverse = np.unique(words[:, 0], return_inverse=True)
+                unique = unique[:, np.newaxis]
+            else:
+                unique, inverse = np.unique(words, axis=0, return_inverse=True)
+            signatures = (unique, inverse.reshape(-1).astype(np.int32))
+            self._signatures = signatures
+        return signatures
+
+    def pruned_parents(self, targets: Iterable[int]) -> Optional[array]:
+        """
+        Return a BFS parent array that skips nodes unable to reach the targets.
+
+        A node u cannot reach a target t when a landmark reaches u but not t,
+        or when t reaches a landmark that u does not reach. Nodes proven
+        unable to reach every target are marked as already visited (-2), so
+        traversal.bfs_order never expands them.
+
+        Targets are grouped by the masks that apply to them, and each group
+        is matched against the distinct node signatures, so the cost grows
+        with the number of groups, not with targets x landmarks x nodes.
+        Pruning is skipped when that matching would cost more than a pass
+        over the nodes. The signatures are built once per instance, and the
+        arrays of the last PRUNED_CACHE_SIZE groups of targets are kept, so
+        repeated single-target searches only copy an array.
+
+        Args:
+            targets: Interned indices of the destination nodes
+
+        Returns:
+            An array over the interned indices for the ``parents`` argument
+            of traversal.bfs_many, or None if the landmarks prove nothing
+        """
+        targets = np.fromiter(targets, dtype=np.intp)
+        if not self.landmarks or not len(targets):
+            return None
+
+        # The masks that apply to each target, in the bit order of the node
+        # signatures: landmark k does not reach it, or it reaches landmark k
+        unreachable = self.unreachable
+        groups = np.unique(
+            self._signature_words(
+                [
+                    np.frombuffer(distances, dtype=distances.typecode)[targets]
+                    == unreachable
+                    for distances in self.forward
+                ]
+                + [
+                    np.frombuffer(distances, dtype=distances.typecode)[targets]
+                    != unreachable
+                    for distances in self.backward
+                ]
+            ),
+            axis=0,
+        )
+        if not groups.any(axis=1).all():
+            return None
+
+        key = groups.tobytes()
+        if key not in self._pruned:
+            if len(self._pruned) >= PRUNED_CACHE_SIZE:
+                self._pruned.clear()
+            self._pruned[key] = self._prune(groups)
+        codes = self._pruned[key]
+        if codes is None:
+            return None
+
+        parents = array("i")
+        parents.frombytes(codes)
+        return parents
+
+    def _prune(self, groups: np.ndarray) -> Optional[bytes]:
+        """Return the parent array bytes pruning for every group, or None."""
+        signatures, rows = self._node_signatures()
+        if len(groups) * len(signatures) > max(len(rows), MIN_PRUNE_TESTS):
+            return None
+
+        pruned = np.ones(len(signatures), dtype=bool)
+        for group in groups:
+            pruned &= (signatures & group).any(axis=1)
+            if not pruned.any():
+                return None
+
+        return np.where(pruned, -2, -1).astype(np.int32)[rows].tobytes()
+
+    def save(self, snapshot: GraphSnapshot, strategy: str) -> LandmarkIndex:
+        """Store the distances for other processes, replacing older versions."""
+        record, _ = LandmarkIndex.objects.update_or_create(
+            version=self.version,
+            weighted=self.weighted,
+            defaults={
+                "num_landmarks": len(self.landmarks),
+                "strategy": strategy,
+                "node_ids": array("q", snapshot.node_ids).tobytes(),
+                "landmarks": array(
+                    "q", (snapshot.node_ids[i] for i in self.landmarks)
+                ).tobytes(),
+                "forward": b"".join(distances.tobytes() for distances in self.forward),
+                "backward": b"".join(
+                    distances.tobytes() for distances in self.backward
+                ),
+            },
+        )
+        LandmarkIndex.objects.filter(
+            weighted=self.weighted, version__lt=self.version
+        ).delete()
+        return record
+
+    @classmethod
+    def load(cls, record: LandmarkIndex, snapshot: GraphSnapshot) -> "Landmarks":
+        """
+        Load stored distances and map them onto a snapshot's interned ids.
+
+        Nodes missing from the record are stored as unreachable, which only
+        holds for a snapshot of the record's graph version.
+        """
+        node_ids = array("q")
+        node_ids.frombytes(bytes(record.node_ids))
+
+        # Position of every interned node in the stored arrays, -1 if missing
+        positions = np.full(len(snapshot), -1, dtype=np.int64)
+        for position, node_id in enumerate(node_ids):
+            i = snapshot.intern(node_id)
+            if i is not None:
+                positions[i] = position
+        known = positions >= 0
+
+        if record.weighted:
+            typecode, dtype, unreachable = "d", np.float64, math.inf
+        else:
+            typecode, dtype, unreachable = "i", np.int32, UNREACHABLE_HOPS
+
+        def unpack(data):
+            stored = np.frombuffer(bytes(data), dtype=dtype).reshape(
+                record.num_landmarks, len(node_ids)
+            )
+            arrays = []
+            for row in stored:
+                mapped = np.full(len(snapshot), unreachable, dtype=dtype)
+                mapped[known] = row[positions[known]]
+                distances = array(typecode)
+                distances.frombytes(mapped.tobytes())
+                arrays.append(distances)
+            return arrays
+
+        landmark_ids = array("q")
+        landmark_ids.frombytes(bytes(record.landmarks))
+        return cls(
+            record.version,
+            [snapshot.intern(node_id) for node_id in landmark_ids],
+            unpack(record.forward),
+            unpack(record.backward),
+            weighted=record.weighted,
+        )
+
+
+def landmark_index_kind(weighted: bool) -> str:
+    """Return the GRAPH_INDEX_KINDS value of hop or weighted landmarks."""
+    if weighted:
+        return GRAPH_INDEX_KINDS.WEIGHTED_LANDMARKS.value
+    return GRAPH_INDEX_KINDS.LANDMARKS.value
+
+
+class LandmarkHolder(ReachabilityHolder):
+    """
+    Process-wide holder of the stored Landmarks of the current snapshot.
+
+    Landmark distances are computed by a Celery task and stored per graph
+    version, like the reachability index. One holder serves hop distances
+    and another weighted distances.
+    """
+
+    def __init__(self, weighted: bool = False):
+        super().__init__()
+        self.weighted = weighted
+        self.kind = landmark_index_kind(weighted)
+
+    def _fetch(self, snapshot: GraphSnapshot) -> Optional[Landmarks]:
+        """Load the stored landmarks of the snapshot's version, if any."""
+        record = LandmarkIndex.objects.filter(
+            version=snapshot.version, weighted=self.weighted
+        ).first()
+        if record is None:
+            return None
+        return Landmarks.load(record, snapshot)
+
+    def _enqueue_build(self) -> None:
+        from .tasks import build_landmark_index_task
+
+        build_landmark_index_task.delay(weighted=self.weighted)
+
+
+_holder = LandmarkHolder()
+_weighted_holder = LandmarkHolder(weighted=True)
+
+
+def get_landmarks(snapshot: GraphSnapshot) -> Optional[Landmarks]:
+    """Return the process-level hop landmarks for a snapshot, if available."""
+    if not settings.GRAPH_LANDMARK_INDEX:
+        return None
+    return _holder.get(snapshot)
+
+
+def get_weighted_landmarks(snapshot: GraphSnapshot) -> Optional[Landmarks]:
+    """Return the process-level weighted landmarks for a snapshot, if available."""
+    if not settings.GRAPH_WEIGHTED_LANDMARKS:
+        return None
+    return _weighted_holder.get(snapshot)
+
+
+def clear_landmarks() -> None:
+    """Drop the process-level hop and weighted landmarks."""
+    _holder.clear()
+    _weighted_holder.clear()
@@ -0,0 +1,54 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from nodes.mapped import (
+    CSR_FILES_KEPT,
+    csr_file_path,
+    remove_old_csr_files,
+    write_csr_file,
+)
+from nodes.snapshot import GraphSnapshot
+
+
+class Command(BaseCommand):
+    """Export the graph to a versioned CSR file that workers memory-map."""
+
+    help = (
+        "Export the current graph to <directory>/graph-<version>.csr, which "
+        "every worker on the host then maps instead of loading the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--directory",
+            default=settings.GRAPH_CSR_DIR,
+            help="Output directory, defaults to settings.GRAPH_CSR_DIR",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=CSR_FILES_KEPT,
+            help=f"Number of most recent CSR files to keep (default: {CSR_FILES_KEPT})",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        if not directory:
+            raise CommandError("Set GRAPH_CSR_DIR or pass --directory.")
+        if options["keep"] < 1:
+            raise CommandError("--keep must be at least 1.")
+
+        os.makedirs(directory, exist_ok=True)
+
+        snapshot = GraphSnapshot.build()
+        path = csr_file_path(directory, snapshot.version)
+        write_csr_file(snapshot, path)
+        self.stdout.write(
+            f"Exported {len(snapshot)} nodes and {snapshot.num_edges} connections "
+            f"at graph version {snapshot.version} to {path}"
+        )
+
+        for removed in remove_old_csr_files(directory, options["keep"]):
+            self.stdout.write(f"Removed {removed}")
@@ -0,0 +1,96 @@
+import gzip
+import io
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nodes.constants import EDGE_LIST_FORMATS
+from nodes.edgelist import import_edges, read_edge_list
+
+
+class Command(BaseCommand):
+    """Stream an edge list dump into the graph."""
+
+    help = (
+        "Import a CSV (from_node,to_node[,weight]) or NDJSON edge list, "
+        "creating missing nodes and upserting connections in constant memory. "
+        "Use - to read standard input; .gz files are decompressed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="Path of the edge list, or - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=[fmt.value for fmt in EDGE_LIST_FORMATS],
+            help="File format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50_000,
+            help="Number of edges staged and merged at a time (default: 50000)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["file"]
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        fmt = options["format"]
+        if fmt is None:
+            name = path[:-3] if path.endswith(".gz") else path
+            ndjson = name.endswith((".ndjson", ".jsonl"))
+            fmt = (EDGE_LIST_FORMATS.NDJSON if ndjson else EDGE_LIST_FORMATS.CSV).value
+
+        try:
+            if path == "-":
+                lines = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+            elif path.endswith(".gz"):
+                lines = gzip.open(path, "rt", encoding="utf-8", newline="")
+            else:
+                lines = open(path, encoding="utf-8", newline="")
+        except OSError as e:
+            raise CommandError(f"Cannot open '{path}': {e}") from e
+
+        valid = skipped = 0
+        start = time.monotonic()
+
+        def valid_edges():
+            nonlocal valid, skipped
+            for line_number, edge, error in read_edge_list(lines, fmt):
+                if edge is not None:
+                    valid += 1
+                    yield edge
+                    continue
+                skipped += 1
+                if options["verbosity"] >= 2:
+                    self.stderr.write(f"Line {line_number} skipped: {error}")
+
+        def progress(imported):
+            elapsed = time.monotonic() - start
+            self.stdout.write(
+                f"{imported:,} edges imported "
+                f"({imported / max(elapsed, 1e-9):,.0f} rows/s)"
+            )
+
+        try:
+            version = import_edges(
+                valid_edges(),
+                batch_size=options["batch_size"],
+                progress=progress if options["verbosity"] >= 1 else None,
+            )
+        finally:
+            # Leave the process' standard input open
+            if path == "-":
+                lines.detach()
+            else:
+                lines.close()
+
+        if version is None:
+            self.stdout.write(f"Nothing imported ({skipped:,} invalid lines skipped)")
+            return
+        self.stdout.write(
+            f"Imported {valid:,} edges in {time.monotonic() - start:.1f}s, "
+            f"{skipped:,} invalid lines skipped, graph version {version}"
+        )
@@ -0,0 +1,208 @@
+import bisect
+import glob
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .snapshot import GraphSnapshot
+
+# File layout: a fixed header followed by the arrays below, in this order,
+# each starting on an 8-byte boundary. Integers are native-endian.
+MAGIC = b"GRAPHCSR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("=8sIIqqq")  # magic, format, flags, version, nodes, edges
+HEADER_SIZE = 64
+# Largest chunk csr_file_chunks yields
+CHUNK_BYTES = 1 << 20
+# Number of most recent CSR files kept by default
+CSR_FILES_KEPT = 2
+
+# (attribute, typecode, length as "nodes", "nodes+1" or "edges")
+SECTIONS = [
+    ("node_ids", "q", "nodes"),
+    ("sorted_ids", "q", "nodes"),
+    ("sorted_index", "i", "nodes"),
+    ("offsets", "q", "nodes+1"),
+    ("targets", "i", "edges"),
+    ("weights", "d", "edges"),
+    ("in_offsets", "q", "nodes+1"),
+    ("in_sources", "i", "edges"),
+    ("in_weights", "d", "edges"),
+]
+
+
+def csr_file_path(directory: str, version: int) -> str:
+    """Return the path of the CSR file of a graph version."""
+    return os.path.join(directory, f"graph-{version}.csr")
+
+
+def _csr_files(directory: str) -> List[Tuple[int, str]]:
+    """Return the (version, path) of the CSR files of a directory, newest first."""
+    paths = glob.glob(os.path.join(directory, "graph-*.csr"))
+    files = [(int(os.path.basename(path)[6:-4]), path) for path in paths]
+    return sorted(files, reverse=True)
+
+
+def latest_csr_version(directory: str, version: int) -> Optional[int]:
+    """Return the version of the newest CSR file at or below a graph version."""
+    for file_version, _ in _csr_files(directory):
+        if file_version <= version:
+            return file_version
+    return None
+
+
+def _section_length(length: str, num_nodes: int, num_edges: int) -> int:
+    return {"nodes": num_nodes, "nodes+1": num_nodes + 1, "edges": num_edges}[length]
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+def csr_file_chunks(snapshot: GraphSnapshot) -> Iterator[Union[bytes, memoryview]]:
+    """
+    Yield the bytes of a snapshot's CSR file, at most CHUNK_BYTES at a time.
+
+    The adjacency arrays are yielded as memoryviews of the snapshot, not
+    copies, so streaming a file costs little more memory than the snapshot.
+
+    Args:
+        snapshot: The snapshot to export
+
+    Yields:
+        Consecutive chunks of the file
+    """
+    order = sorted(range(len(snapshot)), key=snapshot.node_ids.__getitem__)
+    arrays = {
+        "node_ids": array("q", snapshot.node_ids),
+        "sorted_ids": array("q", (snapshot.node_ids[i] for i in order)),
+        "sorted_index": array("i", order),
+        "offsets": snapshot.offsets,
+        "targets": snapshot.targets,
+        "weights": snapshot.weights,
+        "in_offsets": snapshot.in_offsets,
+        "in_sources": snapshot.in_sources,
+        "in_weights": snapshot.in_weights,
+    }
+
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        snapshot.version,
+        len(snapshot),
+        snapshot.num_edges,
+    )
+    yield header.ljust(HEADER_SIZE, b"\0")
+    for name, _, _ in SECTIONS:
+        data = memoryview(arrays[name]).cast("B")
+        for start in range(0, len(data), CHUNK_BYTES):
+            yield data[start : start + CHUNK_BYTES]
+        if _padding(len(data)):
+            yield b"\0" * _padding(len(data))
+
+
+def write_csr_file(snapshot: GraphSnapshot, path: str) -> None:
+    """
+    Write a snapshot to a binary CSR file.
+
+    The file is written next to its destination and renamed into place, so
+    readers never see a partial file.
+
+    Args:
+        snapshot: The snapshot to export
+        path: Destination file path
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        for chunk in csr_file_chunks(snapshot):
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temporary_path, path)
+
+
+def remove_old_csr_files(directory: str, keep: int) -> List[str]:
+    """
+    Delete all but the ``keep`` most recent CSR files of a directory.
+
+    The most recent file is always kept: it is the base that workers map
+    and catch up from with the change log (see MappedGraphSnapshot.load).
+    Workers still mapping a deleted file keep reading it until they unmap it.
+
+    Returns:
+        The removed paths
+    """
+    paths = [path for _, path in _csr_files(directory)][max(keep, 1) :]
+    for path in paths:
+        os.remove(path)
+    return paths
+
+
+class MappedGraphSnapshot(GraphSnapshot):
+    """
+    GraphSnapshot whose arrays are read-only views over a memory-mapped file.
+
+    Every process mapping the same file shares one page-cache copy of it,
+    and opening it costs no database scan and no parsing. Node ids are
+    interned with a binary search over the sorted id table instead of a dict.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        magic, format_version, _, version, num_nodes, num_edges = HEADER.unpack(
+            buffer[: HEADER.size]
+        )
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' is not a version {FORMAT_VERSION} CSR file.")
+
+        position = HEADER_SIZE
+        for name, typecode, length in SECTIONS:
+            size = array(typecode).itemsize * _section_length(
+                length, num_nodes, num_edges
+            )
+            if position + size > len(buffer):
+                raise ValueError(f"'{path}' is truncated.")
+            setattr(self, name, buffer[position : position + size].cast(typecode))
+            position += size + _padding(size)
+
+        self.version = version
+        self.path = path
+        self.derived = {}
+
+    @classmethod
+    def load(cls, directory: str, version: int) -> Optional["MappedGraphSnapshot"]:
+        """
+        Map the newest CSR file at or below a graph version.
+
+        The mapped snapshot may be older than ``version``; the caller then
+        replays the change log onto it.
+
+        Returns:
+            The mapped snapshot, or None if there is no such file
+        """
+        for file_version, path in _csr_files(directory):
+            if file_version <= version:
+                return cls(path)
+        return None
+
+    @property
+    def has_deleted_nodes(self) -> bool:
+        return False
+
+    def _copy_index(self) -> Dict:
+        """Return the node id -> interned index mapping as a new dict."""
+        return dict(zip(self.node_ids, range(len(self.node_ids))))
+
+    def intern(self, node_id) -> Optional[int]:
+        """Return the interned index of a node id, or None if it is unknown."""
+        position = bisect.bisect_left(self.sorted_ids, node_id)
+        if position == len(self.sorted_ids) or self.sorted_ids[position] != node_id:
+            return None
+        return self.sorted_index[position]
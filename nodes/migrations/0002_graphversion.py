@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+def create_graph_version(apps, schema_editor):
+    GraphVersion = apps.get_model("nodes", "GraphVersion")
+    GraphVersion.objects.get_or_create(pk=1, defaults={"version": 0})
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nodes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GraphVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "graph_version",
+            },
+        ),
+        migrations.RunPython(create_graph_version, migrations.RunPython.noop),
+    ]
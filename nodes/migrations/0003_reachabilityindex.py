@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nodes", "0002_graphversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReachabilityIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(unique=True)),
+                ("num_components", models.IntegerField()),
+                ("num_labels", models.IntegerField()),
+                ("node_ids", models.BinaryField()),
+                ("components", models.BinaryField()),
+                ("dag_offsets", models.BinaryField()),
+                ("dag_targets", models.BinaryField()),
+                ("labels", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "reachability_index",
+                "ordering": ["-version"],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nodes", "0003_reachabilityindex"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="connection",
+            name="weight",
+            field=models.FloatField(
+                default=1.0,
+                help_text="The non-negative cost of following the connection",
+                validators=[django.core.validators.MinValueValidator(0.0)],
+            ),
+        ),
+    ]
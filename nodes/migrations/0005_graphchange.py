@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nodes", "0004_connection_weight"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GraphChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(db_index=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("node_created", "Node Created"),
+                            ("node_updated", "Node Updated"),
+                            ("node_deleted", "Node Deleted"),
+                            ("edge_created", "Edge Created"),
+                            ("edge_updated", "Edge Updated"),
+                            ("edge_deleted", "Edge Deleted"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("node_id", models.BigIntegerField(blank=True, null=True)),
+                ("from_node_id", models.BigIntegerField(blank=True, null=True)),
+                ("to_node_id", models.BigIntegerField(blank=True, null=True)),
+                ("weight", models.FloatField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "graph_change",
+                "ordering": ["id"],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nodes", "0005_graphchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LandmarkIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(unique=True)),
+                ("num_landmarks", models.IntegerField()),
+                ("strategy", models.CharField(max_length=16)),
+                ("node_ids", models.BinaryField()),
+                ("landmarks", models.BinaryField()),
+                ("forward", models.BinaryField()),
+                ("backward", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "landmark_index",
+                "ordering": ["-version"],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nodes", "0006_landmarkindex"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="landmarkindex",
+            name="weighted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name="landmarkindex",
+            name="version",
+            field=models.BigIntegerField(),
+        ),
+        migrations.AddConstraint(
+            model_name="landmarkindex",
+            constraint=models.UniqueConstraint(
+                fields=("version", "weighted"), name="landmark_index_version_weighted"
+            ),
+        ),
+    ]
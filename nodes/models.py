@@ -1,6 +1,8 @@
+import math
 import uuid
 
-from django.db import models
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
 
 
 class Node(models.Model):
@@ -29,6 +31,11 @@ class Node(models.Model):
     def __repr__(self):
         return f"<Node: {self.name}>"
 
+    def save(self, *args, **kwargs):
+        """Save the node and its graph change log entry in one transaction."""
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Connection(models.Model):
     """
@@ -37,6 +44,7 @@ class Connection(models.Model):
     Attributes:
         from_node: The source node of the connection
         to_node: The target node of the connection
+        weight: Non-negative cost of following the connection
         created_at: Timestamp when the connection was created
     """
 
@@ -52,6 +60,11 @@ class Connection(models.Model):
         related_name="incoming_connections",
         help_text="The target node of the connection",
     )
+    weight = models.FloatField(
+        default=1.0,
+        validators=[MinValueValidator(0.0)],
+        help_text="The non-negative cost of following the connection",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -72,7 +85,194 @@ class Connection(models.Model):
         if self.from_node == self.to_node:
             raise ValidationError("A node cannot connect to itself.")
 
+        if self.weight is not None and not (
+            math.isfinite(self.weight) and self.weight >= 0
+        ):
+            raise ValidationError(
+                "A connection weight must be finite and non-negative."
+            )
+
     def save(self, *args, **kwargs):
-        """Override save to call clean method."""
+        """
+        Validate and save the connection and its graph change log entry in
+        one transaction.
+        """
         self.clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class GraphVersion(models.Model):
+    """
+    Singleton row holding the current version of the graph.
+
+    The version is incremented on every node or connection write so that
+    in-process graph snapshots can cheaply detect that they are stale.
+
+    Attributes:
+        version: Monotonic counter bumped on every graph write
+    """
+
+    SINGLETON_ID = 1
+
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "graph_version"
+
+    def __str__(self):
+        return f"Graph version {self.version}"
+
+    @classmethod
+    def current(cls) -> int:
+        """Return the current graph version (0 if the graph was never written)."""
+        version = (
+            cls.objects.filter(pk=cls.SINGLETON_ID)
+            .values_list("version", flat=True)
+            .first()
+        )
+        return version or 0
+
+    @classmethod
+    def bump(cls) -> int:
+        """
+        Increment the graph version.
+
+        The singleton row stays locked until the surrounding transaction
+        ends, so concurrent writers get consecutive versions in commit order.
+
+        Returns:
+            The new graph version
+        """
+        with transaction.atomic():
+            row, created = cls.objects.select_for_update().get_or_create(
+                pk=cls.SINGLETON_ID, defaults={"version": 1}
+            )
+            if not created:
+                row.version += 1
+                row.save(update_fields=["version"])
+        return row.version
+
+
+class GraphChange(models.Model):
+    """
+    Append-only log of graph writes, one or more entries per graph version.
+
+    Entries are written in the same transaction as the node or connection
+    write they describe, so snapshots can catch up with the graph by
+    replaying the entries newer than their version instead of reloading it.
+
+    Attributes:
+        version: The graph version the change produced
+        kind: What changed, see Kind
+        node_id: Id of the created, updated or deleted node
+        from_node_id: Source node id of the connection change
+        to_node_id: Target node id of the connection change
+        weight: Weight of the created or updated connection
+    """
+
+    class Kind(models.TextChoices):
+        NODE_CREATED = "node_created"
+        NODE_UPDATED = "node_updated"
+        NODE_DELETED = "node_deleted"
+        EDGE_CREATED = "edge_created"
+        EDGE_UPDATED = "edge_updated"
+        EDGE_DELETED = "edge_deleted"
+
+    version = models.BigIntegerField(db_index=True)
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    node_id = models.BigIntegerField(null=True, blank=True)
+    from_node_id = models.BigIntegerField(null=True, blank=True)
+    to_node_id = models.BigIntegerField(null=True, blank=True)
+    weight = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "graph_change"
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.kind} at version {self.version}"
+
+
+class ReachabilityIndex(models.Model):
+    """
+    Reachability index of the graph at a given graph version.
+
+    The arrays are stored as raw machine-order bytes; see
+    nodes.reachability.Reachability for their layout.
+
+    Attributes:
+        version: The graph version the index was built at
+        num_components: Number of strongly connected components
+        num_labels: Number of interval labelings
+        node_ids: Node ids (int64), in the order of the components array
+        components: Component id of every node (int32)
+        dag_offsets: CSR offsets of the condensation (int64)
+        dag_targets: CSR targets of the condensation (int32)
+        labels: Interval labels of every component (int32 pairs)
+        created_at: Timestamp when the index was built
+    """
+
+    version = models.BigIntegerField(unique=True)
+    num_components = models.IntegerField()
+    num_labels = models.IntegerField()
+    node_ids = models.BinaryField()
+    components = models.BinaryField()
+    dag_offsets = models.BinaryField()
+    dag_targets = models.BinaryField()
+    labels = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "reachability_index"
+        ordering = ["-version"]
+
+    def __str__(self):
+        return f"Reachability index at version {self.version}"
+
+
+class LandmarkIndex(models.Model):
+    """
+    Distances from and to a few landmark nodes at a given graph version.
+
+    Each graph version has at most one index of hop distances and one of
+    weighted distances. The arrays are stored as raw machine-order bytes;
+    see nodes.landmarks.Landmarks for how they bound and prune searches.
+
+    Attributes:
+        version: The graph version the distances were computed at
+        weighted: Whether distances are connection weights or hop counts
+        num_landmarks: Number of landmarks
+        strategy: How the landmarks were picked, see LANDMARK_STRATEGIES
+        node_ids: Node ids (int64), in the order of the distance arrays
+        landmarks: Node ids of the landmarks (int64)
+        forward: Per landmark, distances from it to every node (int32 hop
+            counts, or float64 weights)
+        backward: Per landmark, distances from every node to it (int32 hop
+            counts, or float64 weights)
+        created_at: Timestamp when the distances were computed
+    """
+
+    version = models.BigIntegerField()
+    weighted = models.BooleanField(default=False)
+    num_landmarks = models.IntegerField()
+    strategy = models.CharField(max_length=16)
+    node_ids = models.BinaryField()
+    landmarks = models.BinaryField()
+    forward = models.BinaryField()
+    backward = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "landmark_index"
+        ordering = ["-version"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["version", "weighted"], name="landmark_index_version_weighted"
+            )
+        ]
+
+    def __str__(self):
+        kind = "Weighted landmark" if self.weighted else "Landmark"
+        return f"{kind} index at version {self.version}"
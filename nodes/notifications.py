@@ -0,0 +1,145 @@
+import logging
+import os
+import select
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import GraphVersion
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "graph_version"
+# Seconds between liveness checks of an idle listening connection
+POLL_TIMEOUT = 30
+# Seconds to wait before reconnecting a failed listener
+RETRY_DELAY = 5
+
+
+def notify_graph_version(version: int, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Announce a new graph version to every process once the write commits.
+
+    On PostgreSQL the version is sent with NOTIFY, which the server only
+    delivers when the surrounding transaction commits. This process's own
+    listener is advanced on commit too, so it never serves its own writes
+    stale. Other databases have no notifications, and processes poll instead.
+
+    Args:
+        version: The graph version the write produced
+        using: Alias of the database the write went to
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, str(version)])
+
+    transaction.on_commit(lambda: _listener.advance(version), using=using)
+
+
+class GraphVersionListener:
+    """
+    Process-wide listener for graph version notifications.
+
+    A daemon thread keeps its own PostgreSQL connection in LISTEN mode and
+    records the highest version announced. While it is connected, processes
+    read the graph version from memory instead of querying the database on
+    every request. The thread starts on first use in each process (so also
+    after a fork) and reconnects after errors; in the meantime, and on
+    databases other than PostgreSQL, version() returns None and callers fall
+    back to polling.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.using = using
+        self._version: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def version(self) -> Optional[int]:
+        """Return the latest graph version, or None if not listening."""
+        self._ensure_started()
+        return self._version
+
+    def advance(self, version: int) -> None:
+        """Record a graph version, ignoring versions older than the known one."""
+        with self._lock:
+            if self._version is not None and version > self._version:
+                self._version = version
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        if connections[self.using].vendor != "postgresql":
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._version = None
+            threading.Thread(
+                target=self._run, name="graph-version-listener", daemon=True
+            ).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.warning("Graph version listener failed", exc_info=True)
+            with self._lock:
+                self._version = None
+            time.sleep(RETRY_DELAY)
+
+    def _listen(self) -> None:
+        wrapper = connections[self.using]
+        connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                # Listen before reading the version, so no write is missed
+                cursor.execute(f"LISTEN {CHANNEL}")
+                cursor.execute(
+                    f"SELECT version FROM {GraphVersion._meta.db_table} WHERE id = %s",
+                    [GraphVersion.SINGLETON_ID],
+                )
+                row = cursor.fetchone()
+            with self._lock:
+                self._version = max(row[0] if row else 0, self._version or 0)
+
+            while True:
+                if select.select([connection], [], [], POLL_TIMEOUT) == ([], [], []):
+                    # Detects a dead connection instead of waiting forever
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                connection.poll()
+                while connection.notifies:
+                    self._receive(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _receive(self, payload: str) -> None:
+        with self._lock:
+            self._version = max(int(payload), self._version or 0)
+
+
+_listener = GraphVersionListener()
+
+
+def current_graph_version() -> int:
+    """
+    Return the current graph version.
+
+    The version comes from the notification listener when it is enabled by
+    settings.GRAPH_VERSION_LISTENER and connected, and from the database
+    otherwise.
+    """
+    if settings.GRAPH_VERSION_LISTENER:
+        version = _listener.version()
+        if version is not None:
+            return version
+    return GraphVersion.current()
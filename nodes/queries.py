@@ -0,0 +1,421 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection as db_connection
+from django.utils import timezone
+
+from .models import Connection, Node
+from .traversal import SearchTruncated
+
+# ASCII unit separator, used to join node names inside SQL strings
+NAME_SEPARATOR = "\x1f"
+
+# Maximum number of ids bound into a single ``IN (...)`` clause
+IN_BATCH_SIZE = 1_000
+
+
+def _batched(values: List):
+    """Yield consecutive slices of ``values`` holding at most IN_BATCH_SIZE items."""
+    for start in range(0, len(values), IN_BATCH_SIZE):
+        yield values[start : start + IN_BATCH_SIZE]
+
+
+def node_names_by_id(node_ids: Iterable) -> Dict:
+    """
+    Map node ids to node names, one query per IN_BATCH_SIZE ids.
+
+    Args:
+        node_ids: Node ids to look up
+
+    Returns:
+        A dict of node id -> node name for the ids that exist
+    """
+    names = {}
+    for batch in _batched(list(set(node_ids))):
+        names.update(Node.objects.filter(id__in=batch).values_list("id", "name"))
+    return names
+
+
+def node_ids_by_name(names: Iterable[str]) -> Dict[str, Any]:
+    """
+    Map node names to node ids, one query per IN_BATCH_SIZE names.
+
+    Args:
+        names: Node names to look up
+
+    Returns:
+        A dict of node name -> node id for the names that exist
+    """
+    ids = {}
+    for batch in _batched(list(set(names))):
+        ids.update(Node.objects.filter(name__in=batch).values_list("name", "id"))
+    return ids
+
+
+def node_names(node_ids: List) -> List[str]:
+    """
+    Convert a list of node ids to node names with a single query.
+
+    Args:
+        node_ids: Node ids, in path order
+
+    Returns:
+        The list of node names, in the same order
+    """
+    node_id_to_name = node_names_by_id(node_ids)
+    return [node_id_to_name[node_id] for node_id in node_ids]
+
+
+def find_path_frontier_batched(
+    from_node_id,
+    to_node_id,
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
+) -> Optional[List[str]]:
+    """
+    Find a shortest path with a BFS that loads edges one level at a time.
+
+    Only the outgoing connections of the current frontier are fetched, with
+    one ``WHERE from_node_id IN (...)`` query per level (split into batches of
+    IN_BATCH_SIZE ids) returning plain id tuples. Short paths therefore touch
+    only the edges around the source, whatever the total size of the graph.
+
+    Args:
+        from_node_id: Id of the starting node
+        to_node_id: Id of the destination node
+        max_depth: Maximum number of hops of the path, unbounded if None
+        max_visited: Maximum number of nodes to visit, unbounded if None
+
+    Returns:
+        A list of node names representing the path, or None if no path exists
+
+    Raises:
+        SearchTruncated: If the budget runs out before the search is decided
+    """
+    if from_node_id == to_node_id:
+        return node_names([from_node_id])
+
+    parents = {from_node_id: None}
+    frontier, depth = [from_node_id], 0
+
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for batch in _batched(frontier):
+            edges = (
+                Connection.objects.filter(from_node_id__in=batch)
+                .order_by()
+                .values_list("from_node_id", "to_node_id")
+            )
+            for from_id, to_id in edges:
+                if to_id in parents:
+                    continue
+
+                # Anything new one level past max_depth means the search was cut off
+                if max_depth is not None and depth > max_depth:
+                    raise SearchTruncated(f"No path within max_depth={max_depth} hops.")
+
+                parents[to_id] = from_id
+                if max_visited is not None and len(parents) > max_visited:
+                    raise SearchTruncated(
+                        f"No path within max_visited={max_visited} nodes."
+                    )
+
+                if to_id == to_node_id:
+                    path = []
+                    node_id = to_id
+                    while node_id is not None:
+                        path.append(node_id)
+                        node_id = parents[node_id]
+                    path.reverse()
+                    return node_names(path)
+
+                next_frontier.append(to_id)
+
+        frontier = next_frontier
+
+    return None
+
+
+def neighborhood_batched(
+    node_id,
+    max_depth: int,
+    outgoing: bool = True,
+    incoming: bool = False,
+    limit: Optional[int] = None,
+) -> Tuple[Dict[Any, int], bool]:
+    """
+    Collect the nodes within ``max_depth`` hops of a node from the database.
+
+    Like find_path_frontier_batched, each level issues one query per
+    IN_BATCH_SIZE frontier ids and direction, on the from_node/to_node
+    foreign keys.
+
+    Args:
+        node_id: Id of the center node
+        max_depth: Maximum hop distance from the center
+        outgoing: Follow connections from node to neighbor
+        incoming: Follow connections from neighbor to node
+        limit: Maximum number of nodes to collect, unbounded if None
+
+    Returns:
+        A tuple of (distances, truncated): the hop distance of every collected
+        node id, and whether nodes within max_depth were left out by the limit
+    """
+    directions = []
+    if outgoing:
+        directions.append(("from_node_id__in", "to_node_id"))
+    if incoming:
+        directions.append(("to_node_id__in", "from_node_id"))
+
+    distances = {node_id: 0}
+    frontier, depth = [node_id], 0
+    while frontier and depth < max_depth:
+        depth += 1
+        next_frontier = []
+        for batch in _batched(frontier):
+            for lookup, neighbor_field in directions:
+                neighbors = (
+                    Connection.objects.filter(**{lookup: batch})
+                    .order_by()
+                    .values_list(neighbor_field, flat=True)
+                )
+                for neighbor_id in neighbors:
+                    if neighbor_id in distances:
+                        continue
+                    if limit is not None and len(distances) >= limit:
+                        return distances, True
+                    distances[neighbor_id] = depth
+                    next_frontier.append(neighbor_id)
+        frontier = next_frontier
+
+    return distances, False
+
+
+def induced_edges(node_ids: Iterable) -> List[Tuple[Any, Any, float]]:
+    """
+    Return the connections between the given nodes, one query per batch.
+
+    Args:
+        node_ids: Ids of the subgraph nodes
+
+    Returns:
+        (from_node_id, to_node_id, weight) tuples
+    """
+    members = set(node_ids)
+    edges = []
+    for batch in _batched(list(members)):
+        connections = (
+            Connection.objects.filter(from_node_id__in=batch)
+            .order_by()
+            .values_list("from_node_id", "to_node_id", "weight")
+        )
+        edges.extend(edge for edge in connections if edge[1] in members)
+    return edges
+
+
+def insert_nodes(names: List[str]) -> List[Tuple[Any, str]]:
+    """
+    Insert nodes by name, skipping names that already exist.
+
+    Each batch of IN_BATCH_SIZE names is one ``INSERT ... ON CONFLICT (name)
+    DO NOTHING RETURNING`` statement, supported by PostgreSQL and SQLite
+    3.35+, so existing names cost no extra lookup and concurrent inserts of
+    the same name cannot fail. Names are inserted in sorted order, so that
+    concurrent calls take their row locks in the same order and cannot
+    deadlock. Model signals are not sent.
+
+    Args:
+        names: Distinct node names
+
+    Returns:
+        (id, name) tuples of the nodes actually inserted, in no particular order
+    """
+    qn = db_connection.ops.quote_name
+    name_column = qn(Node._meta.get_field("name").column)
+    now = db_connection.ops.adapt_datetimefield_value(timezone.now())
+
+    inserted = []
+    with db_connection.cursor() as cursor:
+        for batch in _batched(sorted(names)):
+            rows = ", ".join(["(%s, %s, %s)"] * len(batch))
+            cursor.execute(
+                f"""
+                INSERT INTO {qn(Node._meta.db_table)}
+                    ({name_column}, {qn("created_at")}, {qn("updated_at")})
+                VALUES {rows}
+                ON CONFLICT ({name_column}) DO NOTHING
+                RETURNING {qn("id")}, {name_column}
+                """,
+                [value for name in batch for value in (name, now, now)],
+            )
+            inserted.extend(cursor.fetchall())
+    return inserted
+
+
+def insert_connections(edges: List[Tuple[Any, Any, float]]) -> List[Tuple[Any, Any]]:
+    """
+    Insert connections, skipping the ones that already exist.
+
+    Works like insert_nodes, with one ``INSERT ... ON CONFLICT DO NOTHING
+    RETURNING`` statement per batch on the (from_node, to_node) constraint,
+    in (from_node, to_node) order. The edges must be valid: existing nodes,
+    no self-loops, non-negative weights. Model signals are not sent.
+
+    Args:
+        edges: Distinct (from_node_id, to_node_id, weight) tuples
+
+    Returns:
+        (from_node_id, to_node_id) tuples of the connections actually
+        inserted, in no particular order
+    """
+    qn = db_connection.ops.quote_name
+    from_column = qn(Connection._meta.get_field("from_node").column)
+    to_column = qn(Connection._meta.get_field("to_node").column)
+    now = db_connection.ops.adapt_datetimefield_value(timezone.now())
+
+    inserted = []
+    with db_connection.cursor() as cursor:
+        for batch in _batched(sorted(edges, key=lambda edge: edge[:2])):
+            rows = ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+            cursor.execute(
+                f"""
+                INSERT INTO {qn(Connection._meta.db_table)}
+                    ({from_column}, {to_column}, {qn("weight")}, {qn("created_at")})
+                VALUES {rows}
+                ON CONFLICT ({from_column}, {to_column}) DO NOTHING
+                RETURNING {from_column}, {to_column}
+                """,
+                [value for edge in batch for value in (*edge, now)],
+            )
+            inserted.extend(cursor.fetchall())
+    return inserted
+
+
+def insert_connection_by_name(
+    from_name: str, to_name: str, weight: float
+) -> Optional[Tuple[Any, Any, Any, Any]]:
+    """
+    Insert a connection between two nodes given by name, in one statement.
+
+    A single ``INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING``
+    resolves both names, skips self-loops and inserts the connection. A
+    connection that already exists, including one inserted by a concurrent
+    request, is skipped instead of raising IntegrityError. Model signals
+    are not sent.
+
+    Args:
+        from_name: Name of the source node
+        to_name: Name of the target node
+        weight: Non-negative weight of the connection
+
+    Returns:
+        (id, from_node_id, to_node_id, created_at) of the inserted
+        connection, or None if a node is missing, both names are the same
+        node or the connection already exists
+    """
+    qn = db_connection.ops.quote_name
+    name_column = qn(Node._meta.get_field("name").column)
+    from_column = qn(Connection._meta.get_field("from_node").column)
+    to_column = qn(Connection._meta.get_field("to_node").column)
+    nodes_table = qn(Node._meta.db_table)
+    now = timezone.now()
+
+    with db_connection.cursor() as cursor:
+        # The WHERE clause also keeps SQLite from parsing ON CONFLICT as a
+        # join constraint
+        cursor.execute(
+            f"""
+            INSERT INTO {qn(Connection._meta.db_table)}
+                ({from_column}, {to_column}, {qn("weight")}, {qn("created_at")})
+            SELECT f.{qn("id")}, t.{qn("id")}, %s, %s
+            FROM {nodes_table} f
+            JOIN {nodes_table} t ON t.{name_column} = %s
+            WHERE f.{name_column} = %s AND f.{qn("id")} <> t.{qn("id")}
+            ON CONFLICT ({from_column}, {to_column}) DO NOTHING
+            RETURNING {qn("id")}, {from_column}, {to_column}
+            """,
+            [
+                weight,
+                db_connection.ops.adapt_datetimefield_value(now),
+                to_name,
+                from_name,
+            ],
+        )
+        row = cursor.fetchone()
+    return None if row is None else (*row, now)
+
+
+def find_path_recursive_cte(
+    from_node_id, to_node_id, max_depth: int
+) -> Optional[List[str]]:
+    """
+    Find a shortest path inside the database with a recursive CTE.
+
+    The walk starts at the source node and follows the connections table one
+    hop per recursion step, carrying the visited node ids (for the cycle check)
+    and the node names along the path. Both PostgreSQL and SQLite evaluate
+    recursive CTEs breadth first, so the first row that reaches the target is
+    a shortest path and ``LIMIT 1`` lets the database stop there.
+
+    The walk goes one hop past max_depth: a row at that depth comes after any
+    shorter path to the target and tells a search that was cut off from one
+    that ran out of nodes.
+
+    Args:
+        from_node_id: Id of the starting node
+        to_node_id: Id of the destination node
+        max_depth: Maximum number of hops to explore
+
+    Returns:
+        A list of node names representing the path, or None if no path exists
+
+    Raises:
+        SearchTruncated: If no path is found within max_depth hops but the
+            walk could go deeper
+    """
+    qn = db_connection.ops.quote_name
+    nodes = qn(Node._meta.db_table)
+    connections = qn(Connection._meta.db_table)
+    from_column = qn(Connection._meta.get_field("from_node").column)
+    to_column = qn(Connection._meta.get_field("to_node").column)
+
+    sql = f"""
+        WITH RECURSIVE walk(node_id, depth, id_path, name_path) AS (
+            SELECT n.id, 0, ',' || CAST(n.id AS TEXT) || ',', CAST(n.name AS TEXT)
+            FROM {nodes} n
+            WHERE n.id = %s
+          UNION ALL
+            SELECT c.{to_column},
+                   w.depth + 1,
+                   w.id_path || CAST(c.{to_column} AS TEXT) || ',',
+                   w.name_path || %s || CAST(n.name AS TEXT)
+            FROM walk w
+            JOIN {connections} c ON c.{from_column} = w.node_id
+            JOIN {nodes} n ON n.id = c.{to_column}
+            WHERE w.depth < %s
+              AND w.node_id <> %s
+              AND w.id_path NOT LIKE '%%,' || CAST(c.{to_column} AS TEXT) || ',%%'
+        )
+        SELECT name_path, depth FROM walk WHERE node_id = %s OR depth > %s LIMIT 1
+    """
+    params = [
+        from_node_id,
+        NAME_SEPARATOR,
+        max_depth + 1,
+        to_node_id,
+        to_node_id,
+        max_depth,
+    ]
+
+    with db_connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    name_path, depth = row
+    if depth > max_depth:
+        raise SearchTruncated(f"No path within max_depth={max_depth} hops.")
+
+    return name_path.split(NAME_SEPARATOR)
@@ -0,0 +1,501 @@
+import logging
+import random
+import threading
+import time
+from array import array
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .constants import GRAPH_INDEX_KINDS
+from .models import ReachabilityIndex
+from .snapshot import GraphSnapshot, build_csr
+
+logger = logging.getLogger(__name__)
+
+# Seconds a build lock is held when its task never releases it
+BUILD_LOCK_TIMEOUT = 30 * 60
+
+
+def strongly_connected_components(snapshot: GraphSnapshot) -> Tuple[array, int]:
+    """
+    Label the strongly connected components of the graph (iterative Tarjan).
+
+    Components are numbered in the order Tarjan's algorithm completes them,
+    which is a reverse topological order of the condensation: for every
+    connection u -> v between different components, component[u] > component[v].
+
+    Args:
+        snapshot: The graph snapshot to label
+
+    Returns:
+        A tuple of (component, count) where component[i] is the component id
+        of interned node i and count is the number of components
+    """
+    n = len(snapshot)
+    offsets, targets = snapshot.offsets, snapshot.targets
+
+    component = array("i", [-1]) * n
+    discovery = array("i", [-1]) * n
+    lowlink = array("i", [0]) * n
+    on_stack = bytearray(n)
+    scc_stack = []
+    counter = count = 0
+
+    for root in range(n):
+        if discovery[root] != -1:
+            continue
+
+        # Explicit call stack of (node, position of the next edge to follow)
+        call_stack = [(root, offsets[root])]
+        discovery[root] = lowlink[root] = counter
+        counter += 1
+        scc_stack.append(root)
+        on_stack[root] = 1
+
+        while call_stack:
+            node, position = call_stack[-1]
+
+            if position < offsets[node + 1]:
+                call_stack[-1] = (node, position + 1)
+                neighbor = targets[position]
+                if discovery[neighbor] == -1:
+                    discovery[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    scc_stack.append(neighbor)
+                    on_stack[neighbor] = 1
+                    call_stack.append((neighbor, offsets[neighbor]))
+                elif on_stack[neighbor]:
+                    lowlink[node] = min(lowlink[node], discovery[neighbor])
+                continue
+
+            call_stack.pop()
+            if call_stack:
+                parent = call_stack[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == discovery[node]:
+                while True:
+                    member = scc_stack.pop()
+                    on_stack[member] = 0
+                    component[member] = count
+                    if member == node:
+                        break
+                count += 1
+
+    return component, count
+
+
+def get_components(snapshot: GraphSnapshot) -> Tuple[array, int]:
+    """
+    Return the strongly connected components of a snapshot.
+
+    The labels of the stored reachability index are reused when it covers
+    every node; otherwise they are computed once and cached on the snapshot.
+
+    Args:
+        snapshot: The graph snapshot to label
+
+    Returns:
+        A tuple of (component, count), see strongly_connected_components
+    """
+    cached = snapshot.derived.get("components")
+    if cached is not None:
+        return cached
+
+    reachability = get_reachability(snapshot)
+    if reachability is not None and -1 not in reachability.component:
+        components = (reachability.component, reachability.count)
+    else:
+        components = strongly_connected_components(snapshot)
+
+    snapshot.derived["components"] = components
+    return components
+
+
+def component_sizes(component: array, count: int) -> array:
+    """Return the number of nodes of every component."""
+    sizes = array("i", [0]) * count
+    for node_component in component:
+        sizes[node_component] += 1
+    return sizes
+
+
+def condensation(snapshot: GraphSnapshot, component: array, count: int):
+    """
+    Build the DAG of components as CSR arrays, without duplicate edges.
+
+    Returns:
+        A tuple of (offsets, targets) over component ids
+    """
+    offsets, targets = snapshot.offsets, snapshot.targets
+    edges = set()
+    for node in range(len(snapshot)):
+        source = component[node]
+        for neighbor in targets[offsets[node] : offsets[node + 1]]:
+            target = component[neighbor]
+            if source != target:
+                edges.add((source, target))
+
+    sources = array("i", (source for source, _ in edges))
+    dag_targets = array("i", (target for _, target in edges))
+    dag_offsets, dag_targets, _ = build_csr(count, sources, dag_targets)
+    return dag_offsets, dag_targets
+
+
+def interval_labels(
+    dag_offsets: array, dag_targets: array, count: int, num_labels: int, seed: int
+) -> array:
+    """
+    Compute randomized interval labels over the condensation (GRAIL).
+
+    For each labeling a DFS with a random root order assigns every component
+    its post-order rank r, and low = min(r, low of all successors). If u
+    reaches v then [low(v), r(v)] is contained in [low(u), r(u)] for every
+    labeling, so a pair failing containment is proven unreachable in O(k).
+
+    Returns:
+        A flat array of (low, rank) pairs: labels[2 * (j * count + c)] is the
+        low of component c in labeling j, the next item its rank
+    """
+    rng = random.Random(seed)
+    labels = array("i", [0]) * (2 * count * num_labels)
+
+    for labeling in range(num_labels):
+        base = labeling * count
+        rank = array("i", [-1]) * count
+        next_rank = 0
+
+        roots = list(range(count))
+        rng.shuffle(roots)
+        for root in roots:
+            if rank[root] != -1:
+                continue
+            rank[root] = -2  # on the DFS path
+            stack = [(root, dag_offsets[root])]
+            while stack:
+                node, position = stack[-1]
+                if position < dag_offsets[node + 1]:
+                    stack[-1] = (node, position + 1)
+                    child = dag_targets[position]
+                    if rank[child] == -1:
+                        rank[child] = -2
+                        stack.append((child, dag_offsets[child]))
+                    continue
+                stack.pop()
+                rank[node] = next_rank
+                next_rank += 1
+
+        # Tarjan ids are a reverse topological order: successors come first
+        for c in range(count):
+            low = rank[c]
+            for position in range(dag_offsets[c], dag_offsets[c + 1]):
+                child_low = labels[2 * (base + dag_targets[position])]
+                if child_low < low:
+                    low = child_low
+            labels[2 * (base + c)] = low
+            labels[2 * (base + c) + 1] = rank[c]
+
+    return labels
+
+
+class Reachability:
+    """
+    Reachability index over a graph snapshot.
+
+    Nodes are mapped to their strongly connected component; two nodes of the
+    same component reach each other. Across components, the reverse
+    topological numbering and the interval labels reject most unreachable
+    pairs in O(k), and the remaining pairs are settled by a DFS over the
+    condensation that is pruned with the same labels.
+
+    Attributes:
+        version: The graph version the index was built at
+        component: Component id of every interned node of the snapshot,
+            -1 for nodes the index does not know about
+        count: Number of components
+        num_labels: Number of interval labelings
+    """
+
+    def __init__(
+        self,
+        version: int,
+        component: array,
+        count: int,
+        dag_offsets: array,
+        dag_targets: array,
+        labels: array,
+        num_labels: int,
+    ):
+        self.version = version
+        self.component = component
+        self.count = count
+        self.dag_offsets = dag_offsets
+        self.dag_targets = dag_targets
+        self.labels = labels
+        self.num_labels = num_labels
+
+    @classmethod
+    def build(
+        cls, snapshot: GraphSnapshot, num_labels: Optional[int] = None
+    ) -> "Reachability":
+        """Build the index for a snapshot."""
+        if num_labels is None:
+            num_labels = settings.GRAPH_REACHABILITY_LABELS
+
+        component, count = strongly_connected_components(snapshot)
+        dag_offsets, dag_targets = condensation(snapshot, component, count)
+        labels = interval_labels(
+            dag_offsets, dag_targets, count, num_labels, seed=snapshot.version
+        )
+        return cls(
+            snapshot.version,
+            component,
+            count,
+            dag_offsets,
+            dag_targets,
+            labels,
+            num_labels,
+        )
+
+    def save(self, snapshot: GraphSnapshot) -> ReachabilityIndex:
+        """Store the index for other processes, replacing older versions."""
+        node_ids = array("q", snapshot.node_ids)
+        record, _ = ReachabilityIndex.objects.update_or_create(
+            version=self.version,
+            defaults={
+                "num_components": self.count,
+                "num_labels": self.num_labels,
+                "node_ids": node_ids.tobytes(),
+                "components": self.component.tobytes(),
+                "dag_offsets": self.dag_offsets.tobytes(),
+                "dag_targets": self.dag_targets.tobytes(),
+                "labels": self.labels.tobytes(),
+            },
+        )
+        ReachabilityIndex.objects.filter(version__lt=self.version).delete()
+        return record
+
+    @classmethod
+    def load(cls, record: ReachabilityIndex, snapshot: GraphSnapshot) -> "Reachability":
+        """Load a stored index and map it onto the interned ids of a snapshot."""
+
+        def unpack(typecode, data):
+            values = array(typecode)
+            values.frombytes(bytes(data))
+            return values
+
+        node_ids = unpack("q", record.node_ids)
+        stored_components = unpack("i", record.components)
+
+        component = array("i", [-1]) * len(snapshot)
+        for node_id, node_component in zip(node_ids, stored_components):
+            i = snapshot.intern(node_id)
+            if i is not None:
+                component[i] = node_component
+
+        return cls(
+            record.version,
+            component,
+            record.num_components,
+            unpack("q", record.dag_offsets),
+            unpack("i", record.dag_targets),
+            unpack("i", record.labels),
+            record.num_labels,
+        )
+
+    def _may_reach(self, source: int, target: int) -> bool:
+        """Return False if the labels prove ``target`` unreachable from ``source``."""
+        if source < target:
+            return False
+
+        labels, count = self.labels, self.count
+        for labeling in range(self.num_labels):
+            s = 2 * (labeling * count + source)
+            t = 2 * (labeling * count + target)
+            if labels[t] < labels[s] or labels[t + 1] > labels[s + 1]:
+                return False
+
+        return True
+
+    def is_reachable(self, source: int, target: int) -> Optional[bool]:
+        """
+        Tell whether ``target`` is reachable from ``source``.
+
+        Args:
+            source: Interned index of the starting node
+            target: Interned index of the destination node
+
+        Returns:
+            True or False, or None if a node is unknown to the index
+        """
+        source, target = self.component[source], self.component[target]
+        if source == -1 or target == -1:
+            return None
+        if source == target:
+            return True
+        if not self._may_reach(source, target):
+            return False
+
+        dag_offsets, dag_targets = self.dag_offsets, self.dag_targets
+        stack, seen = [source], {source}
+        while stack:
+            current = stack.pop()
+            for position in range(dag_offsets[current], dag_offsets[current + 1]):
+                child = dag_targets[position]
+                if child == target:
+                    return True
+                if child not in seen and self._may_reach(child, target):
+                    seen.add(child)
+                    stack.append(child)
+
+        return False
+
+
+def _build_lock_key(kind: str, version: Optional[int] = None) -> str:
+    if version is None:
+        return f"index-build:{kind}"
+    return f"index-build:{kind}:{version}"
+
+
+def acquire_build_lock(kind: str, version: int) -> bool:
+    """
+    Claim the build of an index for a graph version, across all processes.
+
+    The claim takes two add() locks in the shared cache: one per index kind,
+    so that at most one build is in flight, and one per kind and version, so
+    that each version is built at most once. The kind lock is released by
+    release_build_lock. If the cache is unavailable, the build is allowed.
+
+    Args:
+        kind: One of GRAPH_INDEX_KINDS
+        version: The graph version the index is requested for
+
+    Returns:
+        Whether the caller should enqueue the build
+    """
+    cache = caches[settings.GRAPH_INDEX_BUILD_CACHE_ALIAS]
+    try:
+        if not cache.add(_build_lock_key(kind), version, BUILD_LOCK_TIMEOUT):
+            return False
+        if not cache.add(_build_lock_key(kind, version), True, BUILD_LOCK_TIMEOUT):
+            cache.delete(_build_lock_key(kind))
+            return False
+    except Exception:
+        logger.warning("Index build lock unavailable", exc_info=True)
+    return True
+
+
+def release_build_lock(kind: str) -> None:
+    """
+    Release the build lock of an index kind once its build has finished.
+
+    The lock is kept for settings.GRAPH_INDEX_BUILD_INTERVAL more seconds,
+    which throttles builds while the graph is being written to.
+    """
+    cache = caches[settings.GRAPH_INDEX_BUILD_CACHE_ALIAS]
+    try:
+        if settings.GRAPH_INDEX_BUILD_INTERVAL > 0:
+            cache.touch(_build_lock_key(kind), settings.GRAPH_INDEX_BUILD_INTERVAL)
+        else:
+            cache.delete(_build_lock_key(kind))
+    except Exception:
+        logger.warning("Index build lock unavailable", exc_info=True)
+
+
+class ReachabilityHolder:
+    """
+    Process-wide holder of the Reachability index of the current snapshot.
+
+    Indexes are built by a Celery task and stored per graph version. When no
+    index exists for the snapshot's version, the holder requests one and
+    answers None (no short-circuit) until it has been stored. Requests of
+    all processes are deduplicated and throttled, see acquire_build_lock.
+    """
+
+    # Seconds between two lookups of a missing index
+    RECHECK_INTERVAL = 5.0
+    # Which index this holder serves, one of GRAPH_INDEX_KINDS
+    kind = GRAPH_INDEX_KINDS.REACHABILITY.value
+
+    def __init__(self):
+        self._index: Optional[Reachability] = None
+        self._checked: Tuple[int, float] = (-1, 0.0)
+        self._requested_version = -1
+        self._lock = threading.Lock()
+
+    def get(self, snapshot: GraphSnapshot) -> Optional[Reachability]:
+        """Return the index matching the snapshot, if one is available."""
+        index = self._index
+        if index is not None and index.version == snapshot.version:
+            return index
+
+        with self._lock:
+            index = self._index
+            if index is not None and index.version == snapshot.version:
+                return index
+
+            checked_version, checked_at = self._checked
+            now = time.monotonic()
+            if (
+                checked_version == snapshot.version
+                and now - checked_at < self.RECHECK_INTERVAL
+            ):
+                return None
+            self._checked = (snapshot.version, now)
+
+            index = self._fetch(snapshot)
+            if index is None:
+                self._request_build(snapshot.version)
+                return None
+
+            self._index = index
+            return index
+
+    def _fetch(self, snapshot: GraphSnapshot) -> Optional[Reachability]:
+        """Load the stored index of the snapshot's version, if there is one."""
+        record = ReachabilityIndex.objects.filter(version=snapshot.version).first()
+        if record is None:
+            return None
+        return Reachability.load(record, snapshot)
+
+    def _request_build(self, version: int) -> None:
+        """
+        Enqueue the index build, once per graph version.
+
+        A request refused because another build is in flight or finished
+        recently is retried on a later lookup.
+        """
+        if self._requested_version == version:
+            return
+        if not acquire_build_lock(self.kind, version):
+            return
+        self._requested_version = version
+        self._enqueue_build()
+
+    def _enqueue_build(self) -> None:
+        from .tasks import build_reachability_index_task
+
+        build_reachability_index_task.delay()
+
+    def clear(self) -> None:
+        """Drop the cached index so the next call reloads it."""
+        self._index = None
+        self._checked = (-1, 0.0)
+        self._requested_version = -1
+
+
+_holder = ReachabilityHolder()
+
+
+def get_reachability(snapshot: GraphSnapshot) -> Optional[Reachability]:
+    """Return the process-level reachability index for a snapshot, if available."""
+    if not settings.GRAPH_REACHABILITY_INDEX:
+        return None
+    return _holder.get(snapshot)
+
+
+def clear_reachability() -> None:
+    """Drop the process-level reachability index."""
+    _holder.clear()
@@ -1,7 +1,23 @@
+import math
+
+from django.conf import settings
 from rest_framework import serializers
 
-from .constants import TASK_STATUSES
-from .models import Connection, Node
+from . import queries
+from .constants import (
+    GRAPH_EXPORT_FORMATS,
+    GRAPH_EXPORT_KINDS,
+    NEIGHBORHOOD_DIRECTIONS,
+    SEARCH_MODES,
+    TASK_STATUSES,
+)
+from .models import Node
+
+
+def validate_finite(value):
+    """Reject NaN and infinite floats, which FloatField and min_value let through."""
+    if not math.isfinite(value):
+        raise serializers.ValidationError("Ensure this value is a finite number.")
 
 
 class NodeSerializer(serializers.ModelSerializer):
@@ -33,6 +49,17 @@ class CreateNodeSerializer(serializers.Serializer):
         return Node.objects.create(**validated_data)
 
 
+class BulkCreateNodesSerializer(serializers.Serializer):
+    """Serializer for creating many nodes at once."""
+
+    names = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=settings.GRAPH_BULK_MAX_NODES,
+        help_text="The names of the nodes to create",
+    )
+
+
 class ConnectNodesSerializer(serializers.Serializer):
     """Serializer for connecting two nodes."""
 
@@ -42,44 +69,19 @@ class ConnectNodesSerializer(serializers.Serializer):
     to_node = serializers.CharField(
         max_length=255, help_text="The name of the target node"
     )
-
-    def validate_from_node(self, value):
-        """Validate that the from_node exists."""
-        try:
-            return Node.objects.get(name=value)
-        except Node.DoesNotExist:
-            raise serializers.ValidationError(
-                f"Node with name '{value}' does not exist."
-            )
-
-    def validate_to_node(self, value):
-        """Validate that the to_node exists."""
-        try:
-            return Node.objects.get(name=value)
-        except Node.DoesNotExist:
-            raise serializers.ValidationError(
-                f"Node with name '{value}' does not exist."
-            )
+    weight = serializers.FloatField(
+        min_value=0.0,
+        default=1.0,
+        validators=[validate_finite],
+        help_text="The non-negative cost of following the connection",
+    )
 
     def validate(self, attrs):
-        """Validate that the connection doesn't already exist and nodes are different."""
-        from_node = attrs["from_node"]
-        to_node = attrs["to_node"]
-
-        if from_node == to_node:
+        """Validate that the nodes are different; they are resolved on insert."""
+        if attrs["from_node"] == attrs["to_node"]:
             raise serializers.ValidationError("A node cannot connect to itself.")
-
-        if Connection.objects.filter(from_node=from_node, to_node=to_node).exists():
-            raise serializers.ValidationError(
-                f"Connection from '{from_node.name}' to '{to_node.name}' already exists."
-            )
-
         return attrs
 
-    def create(self, validated_data):
-        """Create and return a new Connection instance."""
-        return Connection.objects.create(**validated_data)
-
 
 class FindPathSerializer(serializers.Serializer):
     """Serializer for finding a path between two nodes."""
@@ -90,6 +92,39 @@ class FindPathSerializer(serializers.Serializer):
     to_node = serializers.CharField(
         max_length=255, help_text="The name of the target node"
     )
+    mode = serializers.ChoiceField(
+        choices=[mode.value for mode in SEARCH_MODES],
+        required=False,
+        help_text="The search mode, defaults to settings.GRAPH_FIND_PATH_MODE",
+    )
+    max_depth = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="The maximum number of hops of the path",
+    )
+    max_visited = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="The maximum number of nodes the search may visit",
+    )
+
+    def validate(self, attrs):
+        """Check the search budget and cap it at the configured ceilings."""
+        weighted = attrs.get("mode") == SEARCH_MODES.WEIGHTED.value
+        if weighted and "max_depth" in attrs:
+            raise serializers.ValidationError(
+                {"max_depth": "Not supported by the weighted search mode."}
+            )
+
+        ceilings = {"max_visited": settings.GRAPH_FIND_PATH_MAX_VISITED}
+        if not weighted:
+            ceilings["max_depth"] = settings.GRAPH_FIND_PATH_MAX_DEPTH
+
+        for field, ceiling in ceilings.items():
+            if ceiling:
+                attrs[field] = min(attrs.get(field, ceiling), ceiling)
+
+        return attrs
 
     def validate_from_node(self, value):
         """Validate that the from_node exists."""
@@ -110,6 +145,163 @@ class FindPathSerializer(serializers.Serializer):
             )
 
 
+class NodePairSerializer(serializers.Serializer):
+    """Serializer for a (from_node, to_node) pair of node names."""
+
+    from_node = serializers.CharField(
+        max_length=255, help_text="The name of the source node"
+    )
+    to_node = serializers.CharField(
+        max_length=255, help_text="The name of the target node"
+    )
+
+
+class WeightedNodePairSerializer(NodePairSerializer):
+    """Serializer for a (from_node, to_node) pair with a connection weight."""
+
+    weight = serializers.FloatField(
+        min_value=0.0,
+        default=1.0,
+        validators=[validate_finite],
+        help_text="The non-negative cost of following the connection",
+    )
+
+
+class BulkConnectNodesSerializer(serializers.Serializer):
+    """Serializer for connecting many pairs of nodes at once."""
+
+    connections = serializers.ListField(
+        child=WeightedNodePairSerializer(),
+        allow_empty=False,
+        max_length=settings.GRAPH_BULK_MAX_CONNECTIONS,
+        help_text="The (from_node, to_node, weight) connections to create",
+    )
+
+
+class FindPathBatchSerializer(serializers.Serializer):
+    """Serializer for finding paths between many pairs of nodes."""
+
+    pairs = serializers.ListField(
+        child=NodePairSerializer(),
+        allow_empty=False,
+        max_length=settings.GRAPH_FIND_PATH_BATCH_MAX_PAIRS,
+        help_text="The (from_node, to_node) pairs to find paths for",
+    )
+
+    def validate(self, attrs):
+        """Resolve every node name of the batch with a single query."""
+        names = set()
+        for pair in attrs["pairs"]:
+            names.add(pair["from_node"])
+            names.add(pair["to_node"])
+
+        attrs["node_ids"] = queries.node_ids_by_name(names)
+        return attrs
+
+
+class FindNearestPathSerializer(serializers.Serializer):
+    """Serializer for finding a shortest path between two sets of nodes."""
+
+    from_nodes = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=settings.GRAPH_FIND_PATH_MAX_SET_SIZE,
+        help_text="The names of the source nodes",
+    )
+    to_nodes = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=settings.GRAPH_FIND_PATH_MAX_SET_SIZE,
+        help_text="The names of the target nodes",
+    )
+    max_depth = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="The maximum number of hops of the path",
+    )
+    max_visited = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="The maximum number of nodes the search may visit",
+    )
+
+    def validate(self, attrs):
+        """Resolve all node names with one query and cap the search budget."""
+        node_ids = queries.node_ids_by_name(attrs["from_nodes"] + attrs["to_nodes"])
+
+        errors = {}
+        for field in ["from_nodes", "to_nodes"]:
+            missing = [name for name in attrs[field] if name not in node_ids]
+            if missing:
+                errors[field] = f"Node with name '{missing[0]}' does not exist."
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        ceilings = {
+            "max_depth": settings.GRAPH_FIND_PATH_MAX_DEPTH,
+            "max_visited": settings.GRAPH_FIND_PATH_MAX_VISITED,
+        }
+        for field, ceiling in ceilings.items():
+            if ceiling:
+                attrs[field] = min(attrs.get(field, ceiling), ceiling)
+
+        attrs["node_ids"] = node_ids
+        return attrs
+
+
+class ReachableQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of the reachability API."""
+
+    max_depth = serializers.IntegerField(
+        min_value=0,
+        required=False,
+        help_text="The maximum hop distance to explore, unbounded if omitted",
+    )
+
+
+class NeighborhoodQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of the neighborhood API."""
+
+    depth = serializers.IntegerField(
+        min_value=0,
+        default=1,
+        help_text="The maximum hop distance from the node",
+    )
+    direction = serializers.ChoiceField(
+        choices=[direction.value for direction in NEIGHBORHOOD_DIRECTIONS],
+        default=NEIGHBORHOOD_DIRECTIONS.OUT.value,
+        help_text="Follow outgoing, incoming or both kinds of connections",
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="The maximum number of nodes, capped at the configured ceiling",
+    )
+
+    def validate_limit(self, value):
+        """Cap the node limit at settings.GRAPH_NEIGHBORHOOD_MAX_NODES."""
+        return min(value, settings.GRAPH_NEIGHBORHOOD_MAX_NODES)
+
+    def validate(self, attrs):
+        attrs.setdefault("limit", settings.GRAPH_NEIGHBORHOOD_MAX_NODES)
+        return attrs
+
+
+class GraphExportQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of the graph export API."""
+
+    kind = serializers.ChoiceField(
+        choices=[kind.value for kind in GRAPH_EXPORT_KINDS],
+        default=GRAPH_EXPORT_KINDS.EDGES.value,
+        help_text="Export the nodes or the connections (ignored by csr)",
+    )
+    output = serializers.ChoiceField(
+        choices=[fmt.value for fmt in GRAPH_EXPORT_FORMATS],
+        default=GRAPH_EXPORT_FORMATS.CSV.value,
+        help_text="The file format of the export",
+    )
+
+
 class TaskResultSerializer(serializers.Serializer):
     """Serializer for task results."""
 
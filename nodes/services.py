@@ -1,63 +1,505 @@
-from collections import defaultdict, deque
-from typing import List, Optional
+import functools
+import heapq
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from .models import Connection, Node
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import cache as path_cache
+from . import queries, traversal, vectorized
+from .constants import (
+    BFS_ENGINES,
+    BULK_ITEM_STATUSES,
+    GRAPH_EXPORT_FORMATS,
+    NEIGHBORHOOD_DIRECTIONS,
+    SEARCH_MODES,
+)
+from .edgelist import export_rows
+from .landmarks import get_landmarks, get_weighted_landmarks
+from .mapped import csr_file_chunks
+from .models import Connection, GraphChange, Node
+from .notifications import current_graph_version
+from .reachability import component_sizes, get_components, get_reachability
+from .signals import record_graph_changes
+from .snapshot import GraphSnapshot, get_loaded_snapshot, get_snapshot
+
+
+def _weighted_search(
+    snapshot: GraphSnapshot,
+    source: int,
+    target: int,
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
+) -> Optional[List[int]]:
+    """
+    Find a minimum-weight path with A* over landmark bounds.
+
+    The GRAPH_WEIGHTED_LANDMARKS landmark distances are computed by a Celery
+    task once per graph version; until they are stored, and when the setting
+    is 0, this is a plain Dijkstra search. Hop limits do not apply to
+    weighted paths, so max_depth must be None.
+    """
+    if max_depth is not None:
+        raise ValueError("max_depth is not supported by the weighted search mode.")
+
+    landmarks = get_weighted_landmarks(snapshot)
+    if landmarks is None:
+        return traversal.dijkstra(snapshot, source, target, max_visited=max_visited)
+
+    return traversal.dijkstra(
+        snapshot,
+        source,
+        target,
+        lambda node: landmarks.lower_bound(node, target),
+        max_visited=max_visited,
+    )
 
 
 class GraphService:
     """Service class for graph operations."""
 
+    # Search mode -> traversal over the in-memory snapshot
+    SEARCH_FUNCTIONS = {
+        SEARCH_MODES.BFS.value: traversal.bfs,
+        SEARCH_MODES.BIDIRECTIONAL.value: traversal.bidirectional_bfs,
+        SEARCH_MODES.WEIGHTED.value: _weighted_search,
+        SEARCH_MODES.DIRECTION_OPTIMIZING.value: traversal.direction_optimizing_bfs,
+    }
+
+    # BFS engine -> one-sided BFS of the "bfs" search mode
+    BFS_FUNCTIONS = {
+        BFS_ENGINES.PYTHON.value: traversal.bfs,
+        BFS_ENGINES.NUMPY.value: vectorized.bfs,
+    }
+
     @staticmethod
-    def find_path(from_node: Node, to_node: Node) -> Optional[List[str]]:
+    def find_path(
+        from_node: Node,
+        to_node: Node,
+        mode: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        max_visited: Optional[int] = None,
+    ) -> Optional[List[str]]:
         """
-        Find a path between two nodes using BFS algorithm.
+        Find a shortest path between two nodes.
+
+        All modes minimize the number of hops, except "weighted" which
+        minimizes the sum of connection weights. Answers, including "no path",
+        are cached per graph version, so repeated queries for the same pair
+        skip the search until the graph changes. A cached path longer than
+        max_depth is not returned; the search runs with the budget instead.
+        Searches cut short are not cached.
 
         Args:
             from_node: The starting node
             to_node: The destination node
+            mode: The search mode (see SEARCH_MODES), defaults to
+                settings.GRAPH_FIND_PATH_MODE
+            max_depth: Maximum number of hops of the path, unbounded if None
+                (capped at settings.GRAPH_CTE_MAX_DEPTH for the "cte" mode,
+                not supported by the "weighted" mode)
+            max_visited: Maximum number of nodes the search may visit,
+                unbounded if None (ignored by the "cte" mode)
 
         Returns:
             A list of node names representing the path, or None if no path exists
+
+        Raises:
+            ValueError: If the search mode is unknown, or max_depth is given
+                for the "weighted" mode
+            SearchTruncated: If the budget runs out before the search can
+                tell whether a path exists
         """
+        mode = mode or settings.GRAPH_FIND_PATH_MODE
+        if mode not in {search_mode.value for search_mode in SEARCH_MODES}:
+            raise ValueError(f"Unknown search mode '{mode}'.")
+        if mode == SEARCH_MODES.WEIGHTED.value and max_depth is not None:
+            raise ValueError("max_depth is not supported by the weighted search mode.")
+
         if from_node == to_node:
             return [from_node.name]
 
-        # Build adjacency list for efficient traversal
-        graph = defaultdict(list)
-        connections = Connection.objects.select_related("from_node", "to_node").all()
+        metric = (
+            path_cache.WEIGHT
+            if mode == SEARCH_MODES.WEIGHTED.value
+            else path_cache.HOPS
+        )
+        version = current_graph_version()
+        path = path_cache.get_path(from_node.id, to_node.id, version, metric)
+        if path is not path_cache.MISSING and (
+            path is None or max_depth is None or len(path) - 1 <= max_depth
+        ):
+            return path
 
-        for connection in connections:
-            graph[connection.from_node.id].append(connection.to_node.id)
+        path = GraphService._search(from_node, to_node, mode, max_depth, max_visited)
+        path_cache.set_path(from_node.id, to_node.id, version, path, metric)
 
-        # BFS to find shortest path
-        queue = deque([(from_node.id, [from_node.id])])
-        visited = {from_node.id}
+        return path
 
-        while queue:
-            current_node_id, path = queue.popleft()
+    @staticmethod
+    def _search(
+        from_node: Node,
+        to_node: Node,
+        mode: str,
+        max_depth: Optional[int] = None,
+        max_visited: Optional[int] = None,
+    ) -> Optional[List[str]]:
+        """Run the search of the given mode, bypassing the path cache."""
+        # Let the database walk the graph, for graphs too large to hold in memory
+        if mode == SEARCH_MODES.RECURSIVE_CTE.value:
+            cte_max_depth = settings.GRAPH_CTE_MAX_DEPTH
+            if max_depth is not None:
+                cte_max_depth = min(max_depth, cte_max_depth)
+            return queries.find_path_recursive_cte(
+                from_node.id, to_node.id, cte_max_depth
+            )
 
-            for neighbor_id in graph[current_node_id]:
-                if neighbor_id == to_node.id:
-                    # Found the destination, build the path with node names
-                    full_path = path + [neighbor_id]
-                    node_names = []
+        # Load only the edges around the frontier, one query per BFS level
+        if mode == SEARCH_MODES.FRONTIER_BATCHED.value:
+            return queries.find_path_frontier_batched(
+                from_node.id, to_node.id, max_depth, max_visited
+            )
 
-                    # Convert node IDs to names
-                    node_id_to_name = {
-                        node.id: node.name
-                        for node in Node.objects.filter(id__in=full_path)
-                    }
+        if mode == SEARCH_MODES.BFS.value:
+            search = GraphService.BFS_FUNCTIONS[settings.GRAPH_BFS_ENGINE]
+        else:
+            search = GraphService.SEARCH_FUNCTIONS[mode]
 
-                    for node_id in full_path:
-                        node_names.append(node_id_to_name[node_id])
+        # Reuse the process-level adjacency instead of reloading all connections
+        snapshot = get_snapshot()
+        source = snapshot.intern(from_node.id)
+        target = snapshot.intern(to_node.id)
+        if source is None or target is None:
+            return None
 
-                    return node_names
+        # Skip the search for pairs the reachability index proves unreachable
+        reachability = get_reachability(snapshot)
+        if (
+            reachability is not None
+            and reachability.is_reachable(source, target) is False
+        ):
+            return None
 
-                if neighbor_id not in visited:
-                    visited.add(neighbor_id)
-                    queue.append((neighbor_id, path + [neighbor_id]))
+        # Same with the landmark index, which also prunes the one-sided BFS
+        landmarks = get_landmarks(snapshot)
+        if landmarks is not None:
+            if landmarks.lower_bound(source, target) == math.inf:
+                return None
+            if search is traversal.bfs:
+                parents = landmarks.pruned_parents([target])
+                search = functools.partial(traversal.bfs, parents=parents)
 
-        return None
+        path = search(snapshot, source, target, max_depth, max_visited)
+        if path is None:
+            return None
+
+        return GraphService._node_names(snapshot, path)
+
+    @staticmethod
+    def find_paths(pairs: List[Tuple[Any, Any]]) -> List[Optional[List[str]]]:
+        """
+        Find shortest paths for many pairs of nodes at once.
+
+        Pairs found in the path cache are answered from it. The others are
+        grouped by source node and each distinct source is searched with a
+        single BFS that stops as soon as all of its targets are found. Node
+        names of all paths are then looked up together.
+
+        Args:
+            pairs: A list of (from_node_id, to_node_id) tuples
+
+        Returns:
+            For each pair, in input order, a list of node names representing
+            the path, or None if no path exists
+        """
+        version = current_graph_version()
+        cached = path_cache.get_paths(pairs, version)
+
+        missing = [pair for pair in dict.fromkeys(pairs) if pair not in cached]
+        found = dict(zip(missing, GraphService._search_many(missing)))
+        path_cache.set_paths(found, version)
+
+        answers = {**cached, **found}
+        return [answers[pair] for pair in pairs]
+
+    @staticmethod
+    def _search_many(pairs: List[Tuple[Any, Any]]) -> List[Optional[List[str]]]:
+        """Answer many pairs with one BFS per source, bypassing the path cache."""
+        snapshot = get_snapshot()
+        interned = [(snapshot.intern(f), snapshot.intern(t)) for f, t in pairs]
+
+        reachability = get_reachability(snapshot)
+        landmarks = get_landmarks(snapshot)
+
+        targets_by_source = defaultdict(set)
+        for source, target in interned:
+            if source is None or target is None:
+                continue
+            if (
+                reachability is not None
+                and reachability.is_reachable(source, target) is False
+            ):
+                continue
+            if (
+                landmarks is not None
+                and landmarks.lower_bound(source, target) == math.inf
+            ):
+                continue
+            targets_by_source[source].add(target)
+
+        paths = {}
+        for source, targets in targets_by_source.items():
+            parents = None
+            if landmarks is not None:
+                parents = landmarks.pruned_parents(targets)
+            found = traversal.bfs_many(snapshot, source, targets, parents=parents)
+            for target, path in found.items():
+                paths[source, target] = path
+
+        names = queries.node_names_by_id(
+            snapshot.node_ids[i] for path in paths.values() for i in path
+        )
+
+        results = []
+        for source, target in interned:
+            path = paths.get((source, target))
+            if path is None:
+                results.append(None)
+            else:
+                results.append([names[snapshot.node_ids[i]] for i in path])
+
+        return results
+
+    @staticmethod
+    def find_nearest_path(
+        from_node_ids: Iterable,
+        to_node_ids: Iterable,
+        max_depth: Optional[int] = None,
+        max_visited: Optional[int] = None,
+    ) -> Optional[List[str]]:
+        """
+        Find a shortest path from any of several nodes to any of several others.
+
+        A single multi-source BFS answers the whole set-to-set query instead
+        of one search per (source, target) pair. Nodes the landmark index
+        proves unable to reach any target are never expanded. Targets are
+        tested against the landmark masks in groups (see
+        Landmarks.pruned_parents), so that pre-pass costs at most about one
+        pass over the nodes, like the BFS parent array, however many targets
+        there are.
+
+        Args:
+            from_node_ids: Ids of the source nodes
+            to_node_ids: Ids of the target nodes
+            max_depth: Maximum number of hops of the path, unbounded if None
+            max_visited: Maximum number of nodes to visit, unbounded if None
+
+        Returns:
+            A list of node names from the nearest source to the nearest
+            target, or None if no target is reachable from any source
+
+        Raises:
+            SearchTruncated: If the budget runs out before the search can
+                tell whether a path exists
+        """
+        snapshot = get_snapshot()
+        sources = [snapshot.intern(node_id) for node_id in from_node_ids]
+        targets = {snapshot.intern(node_id) for node_id in to_node_ids}
+        sources = [source for source in sources if source is not None]
+        targets.discard(None)
+        if not sources or not targets:
+            return None
+
+        parents = None
+        landmarks = get_landmarks(snapshot)
+        if landmarks is not None:
+            parents = landmarks.pruned_parents(targets)
+
+        path = traversal.multi_source_bfs(
+            snapshot, sources, targets, max_depth, max_visited, parents
+        )
+        if path is None:
+            return None
+
+        return GraphService._node_names(snapshot, path)
+
+    @staticmethod
+    def neighborhood(
+        node: Node,
+        depth: int,
+        direction: str = NEIGHBORHOOD_DIRECTIONS.OUT.value,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract the subgraph induced by the nodes within ``depth`` hops of a node.
+
+        The process-level snapshot is used when this process has loaded
+        one; otherwise only the neighborhood is read from the database, one
+        batched query per level, instead of loading the whole graph.
+
+        Args:
+            node: The center node
+            depth: Maximum hop distance from the center
+            direction: Follow outgoing ("out"), incoming ("in") or both
+                ("both") connections
+            limit: Maximum number of nodes, unbounded if None
+
+        Returns:
+            A dict with the nodes as (name, distance) tuples in BFS order,
+            the connections between them as (from name, to name, weight)
+            tuples, and whether the limit left nodes out
+        """
+        outgoing = direction != NEIGHBORHOOD_DIRECTIONS.IN.value
+        incoming = direction != NEIGHBORHOOD_DIRECTIONS.OUT.value
+
+        snapshot = get_loaded_snapshot()
+        center = snapshot.intern(node.id) if snapshot is not None else None
+        if center is not None:
+            distances, truncated = traversal.neighborhood(
+                snapshot, center, depth, outgoing, incoming, limit
+            )
+            node_ids = snapshot.node_ids
+            edges = [
+                (node_ids[source], node_ids[target], weight)
+                for source, target, weight in traversal.induced_edges(
+                    snapshot, distances
+                )
+            ]
+            distances = {node_ids[i]: d for i, d in distances.items()}
+        else:
+            distances, truncated = queries.neighborhood_batched(
+                node.id, depth, outgoing, incoming, limit
+            )
+            edges = queries.induced_edges(distances)
+
+        names = queries.node_names_by_id(distances)
+        return {
+            "nodes": [(names[node_id], d) for node_id, d in distances.items()],
+            "edges": [
+                (names[from_id], names[to_id], weight)
+                for from_id, to_id, weight in edges
+            ],
+            "truncated": truncated,
+        }
+
+    @staticmethod
+    def export_graph(kind: str, fmt: str) -> Iterator[Union[str, bytes, memoryview]]:
+        """
+        Stream the graph as an export file.
+
+        CSV and NDJSON exports stream the nodes or connections out of the
+        database in chunks. The binary CSR form (the format of
+        export_graph_csr) holds the whole graph whatever the kind and is
+        streamed from the process's snapshot without copying its arrays,
+        unless replayed deletions left nodes in it that no longer exist.
+
+        Args:
+            kind: One of GRAPH_EXPORT_KINDS
+            fmt: One of GRAPH_EXPORT_FORMATS
+
+        Returns:
+            An iterator over the chunks of the file
+        """
+        if fmt != GRAPH_EXPORT_FORMATS.CSR.value:
+            return export_rows(kind, fmt)
+
+        snapshot = get_snapshot()
+        if snapshot.has_deleted_nodes:
+            snapshot = GraphSnapshot.build()
+        return csr_file_chunks(snapshot)
+
+    @staticmethod
+    def reachable_from(
+        from_node: Node, max_depth: Optional[int] = None
+    ) -> Iterator[Tuple[str, int]]:
+        """
+        Stream every node reachable from a node with its hop distance.
+
+        Nodes are produced in BFS order by the same traversal core as
+        find_path; names are looked up one batch of nodes at a time.
+
+        Args:
+            from_node: The starting node
+            max_depth: Maximum hop distance to explore, unbounded if None
+
+        Yields:
+            (node name, distance) tuples in BFS order, starting with
+            (from_node.name, 0)
+        """
+        snapshot = get_snapshot()
+        source = snapshot.intern(from_node.id)
+        if source is None:
+            yield from_node.name, 0
+            return
+
+        batch = []
+        for node, depth in traversal.bfs_order(snapshot, source, max_depth):
+            batch.append((snapshot.node_ids[node], depth))
+            if len(batch) >= queries.IN_BATCH_SIZE:
+                yield from GraphService._name_batch(batch)
+                batch = []
+
+        yield from GraphService._name_batch(batch)
+
+    @staticmethod
+    def get_component(node: Node, largest: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        Get the strongly connected component of a node.
+
+        Nodes of the same component are mutually reachable. Component ids are
+        only stable within one graph version.
+
+        Args:
+            node: The node to look up
+            largest: Number of largest component sizes to report
+
+        Returns:
+            A dict with the component id and size, the graph version, the
+            number of components and the sizes of the largest components,
+            or None if the node is not in the graph snapshot yet
+        """
+        snapshot = get_snapshot()
+        i = snapshot.intern(node.id)
+        if i is None:
+            return None
+
+        component, count = get_components(snapshot)
+        sizes = snapshot.derived.get("component_sizes")
+        if sizes is None:
+            sizes = component_sizes(component, count)
+            snapshot.derived["component_sizes"] = sizes
+
+        return {
+            "component_id": component[i],
+            "component_size": sizes[component[i]],
+            "version": snapshot.version,
+            "num_components": count,
+            "largest_component_sizes": heapq.nlargest(largest, sizes),
+        }
+
+    @staticmethod
+    def _name_batch(batch: List[Tuple[Any, int]]) -> Iterator[Tuple[str, int]]:
+        """Replace the node ids of (node id, value) tuples with node names."""
+        names = queries.node_names_by_id(node_id for node_id, _ in batch)
+        for node_id, value in batch:
+            yield names[node_id], value
+
+    @staticmethod
+    def _node_names(snapshot: GraphSnapshot, path: List[int]) -> List[str]:
+        """
+        Convert a path of interned indices to node names with a single query.
+
+        Args:
+            snapshot: The snapshot the indices belong to
+            path: Interned node indices
+
+        Returns:
+            The list of node names along the path
+        """
+        return queries.node_names([snapshot.node_ids[i] for i in path])
 
     @staticmethod
     def get_or_create_node(name: str) -> tuple[Node, bool]:
@@ -73,25 +515,169 @@ class GraphService:
         return Node.objects.get_or_create(name=name)
 
     @staticmethod
-    def create_connection(from_node_name: str, to_node_name: str) -> Connection:
+    def bulk_create_nodes(names: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Create many nodes at once, skipping names that already exist.
+
+        Names are deduplicated and inserted with one statement per batch.
+        The whole call bumps the graph version once and logs one change per
+        created node, in the same transaction.
+
+        Args:
+            names: Node names, possibly with duplicates
+
+        Returns:
+            A tuple of (created, existing) name lists, in first-seen order
+        """
+        names = list(dict.fromkeys(names))
+        with transaction.atomic():
+            inserted = queries.insert_nodes(names)
+            record_graph_changes(
+                [
+                    (GraphChange.Kind.NODE_CREATED, {"node_id": node_id})
+                    for node_id, _ in inserted
+                ]
+            )
+
+        created = {name for _, name in inserted}
+        return (
+            [name for name in names if name in created],
+            [name for name in names if name not in created],
+        )
+
+    @staticmethod
+    def bulk_connect(
+        connections: List[Tuple[str, str, float]],
+    ) -> List[Tuple[str, Optional[str]]]:
+        """
+        Create many connections at once, validating each one separately.
+
+        All node names are resolved together, connections with a missing
+        node or connecting a node to itself are rejected, and the others
+        are inserted with one statement per batch. The whole call bumps the
+        graph version once and logs one change per created connection, in
+        the same transaction.
+
+        Args:
+            connections: (from_node name, to_node name, weight) tuples
+
+        Returns:
+            For each connection, in input order, a tuple of (status, error)
+            where status is one of BULK_ITEM_STATUSES and error explains
+            invalid items
+        """
+        node_ids = queries.node_ids_by_name(
+            name
+            for from_name, to_name, _ in connections
+            for name in (from_name, to_name)
+        )
+
+        results, edges = [], {}
+        for from_name, to_name, weight in connections:
+            missing = [name for name in (from_name, to_name) if name not in node_ids]
+            if missing:
+                error = f"Node with name '{missing[0]}' does not exist."
+            elif from_name == to_name:
+                error = "A node cannot connect to itself."
+            else:
+                edges.setdefault((node_ids[from_name], node_ids[to_name]), weight)
+                error = None
+            results.append(error)
+
+        with transaction.atomic():
+            inserted = queries.insert_connections(
+                [(from_id, to_id, weight) for (from_id, to_id), weight in edges.items()]
+            )
+            record_graph_changes(
+                [
+                    (
+                        GraphChange.Kind.EDGE_CREATED,
+                        {
+                            "from_node_id": from_id,
+                            "to_node_id": to_id,
+                            "weight": edges[from_id, to_id],
+                        },
+                    )
+                    for from_id, to_id in inserted
+                ]
+            )
+
+        # Only the first occurrence of a connection counts as created
+        created = set(inserted)
+        statuses = []
+        for (from_name, to_name, _), error in zip(connections, results):
+            if error is not None:
+                statuses.append((BULK_ITEM_STATUSES.INVALID.value, error))
+                continue
+            edge = (node_ids[from_name], node_ids[to_name])
+            if edge in created:
+                created.discard(edge)
+                statuses.append((BULK_ITEM_STATUSES.CREATED.value, None))
+            else:
+                statuses.append((BULK_ITEM_STATUSES.EXISTS.value, None))
+
+        return statuses
+
+    @staticmethod
+    def create_connection(
+        from_node_name: str, to_node_name: str, weight: float = 1.0
+    ) -> Optional[Connection]:
         """
         Create a connection between two nodes.
 
+        The connection is inserted by a single statement that resolves both
+        names, so concurrent requests for the same pair cannot fail with an
+        IntegrityError: exactly one of them creates the connection. The
+        nodes are only looked up again when nothing was inserted, to tell
+        a missing node from an existing connection.
+
         Args:
             from_node_name: Name of the source node
             to_node_name: Name of the target node
+            weight: Non-negative cost of following the connection
 
         Returns:
-            The created Connection instance
+            The created Connection instance, or None if the connection
+            already exists
 
         Raises:
             Node.DoesNotExist: If either node doesn't exist
             ValidationError: If the connection is invalid
         """
-        from_node = Node.objects.get(name=from_node_name)
-        to_node = Node.objects.get(name=to_node_name)
+        if from_node_name == to_node_name:
+            raise ValidationError("A node cannot connect to itself.")
+
+        with transaction.atomic():
+            row = queries.insert_connection_by_name(
+                from_node_name, to_node_name, weight
+            )
+            if row is not None:
+                connection_id, from_node_id, to_node_id, created_at = row
+                record_graph_changes(
+                    [
+                        (
+                            GraphChange.Kind.EDGE_CREATED,
+                            {
+                                "from_node_id": from_node_id,
+                                "to_node_id": to_node_id,
+                                "weight": weight,
+                            },
+                        )
+                    ]
+                )
+                return Connection(
+                    id=connection_id,
+                    from_node_id=from_node_id,
+                    to_node_id=to_node_id,
+                    weight=weight,
+                    created_at=created_at,
+                )
 
-        return Connection.objects.create(from_node=from_node, to_node=to_node)
+        node_ids = queries.node_ids_by_name([from_node_name, to_node_name])
+        for name in (from_node_name, to_node_name):
+            if name not in node_ids:
+                raise Node.DoesNotExist(f"Node with name '{name}' does not exist.")
+        return None
 
     @staticmethod
     def get_node_by_name(name: str) -> Node:
@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Connection, GraphChange, GraphVersion, Node
+from .notifications import notify_graph_version
+
+
+def record_graph_change(kind: str, **fields) -> None:
+    """Bump the graph version, log the change at it and announce it."""
+    record_graph_changes([(kind, fields)])
+
+
+def record_graph_changes(changes: List[Tuple[str, Dict[str, Any]]]) -> Optional[int]:
+    """
+    Bump the graph version once for many changes, log them at it and announce it.
+
+    Bulk writes that bypass model signals call this themselves, in their
+    own transaction.
+
+    Args:
+        changes: (kind, GraphChange fields) tuples in the order they happened
+
+    Returns:
+        The new graph version, or None if there were no changes
+    """
+    if not changes:
+        return None
+
+    with transaction.atomic():
+        version = GraphVersion.bump()
+        GraphChange.objects.bulk_create(
+            [
+                GraphChange(version=version, kind=kind, **fields)
+                for kind, fields in changes
+            ],
+            batch_size=1000,
+        )
+        notify_graph_version(version)
+    return version
+
+
+def record_graph_rewrite() -> int:
+    """
+    Bump the graph version without logging changes, and announce it.
+
+    For bulk writes too large to log entry by entry: the gap this leaves in
+    the change log makes every snapshot reload the graph instead.
+
+    Returns:
+        The new graph version
+    """
+    with transaction.atomic():
+        version = GraphVersion.bump()
+        notify_graph_version(version)
+    return version
+
+
+@receiver(post_save, sender=Node)
+def record_node_save(sender, instance, created, **kwargs):
+    """Log a node creation or update."""
+    kind = GraphChange.Kind.NODE_CREATED if created else GraphChange.Kind.NODE_UPDATED
+    record_graph_change(kind, node_id=instance.pk)
+
+
+@receiver(post_delete, sender=Node)
+def record_node_delete(sender, instance, **kwargs):
+    """Log a node deletion; its connections are logged by their own deletions."""
+    record_graph_change(GraphChange.Kind.NODE_DELETED, node_id=instance.pk)
+
+
+@receiver(pre_save, sender=Connection)
+def remember_connection_endpoints(sender, instance, **kwargs):
+    """Remember the stored endpoints of a connection about to be updated."""
+    if not instance._state.adding:
+        instance._stored_endpoints = (
+            Connection.objects.filter(pk=instance.pk)
+            .values_list("from_node_id", "to_node_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Connection)
+def record_connection_save(sender, instance, created, **kwargs):
+    """Log a connection creation or update."""
+    stored = getattr(instance, "_stored_endpoints", None)
+    if stored and stored != (instance.from_node_id, instance.to_node_id):
+        # Moving a connection removes it from its old endpoints
+        record_graph_change(
+            GraphChange.Kind.EDGE_DELETED, from_node_id=stored[0], to_node_id=stored[1]
+        )
+    kind = GraphChange.Kind.EDGE_CREATED if created else GraphChange.Kind.EDGE_UPDATED
+    record_graph_change(
+        kind,
+        from_node_id=instance.from_node_id,
+        to_node_id=instance.to_node_id,
+        weight=instance.weight,
+    )
+
+
+@receiver(post_delete, sender=Connection)
+def record_connection_delete(sender, instance, **kwargs):
+    """Log a connection deletion."""
+    record_graph_change(
+        GraphChange.Kind.EDGE_DELETED,
+        from_node_id=instance.from_node_id,
+        to_node_id=instance.to_node_id,
+    )
@@ -0,0 +1,450 @@
+import threading
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .models import Connection, GraphChange, GraphVersion, Node
+from .notifications import current_graph_version
+
+# Rows fetched per round trip when streaming the graph out of the database
+CHUNK_SIZE = 10_000
+
+
+def build_csr(
+    num_nodes: int,
+    sources: array,
+    targets: array,
+    weights: Optional[array] = None,
+) -> Tuple[array, array, Optional[array]]:
+    """
+    Build a compressed sparse row adjacency from parallel edge arrays.
+
+    Args:
+        num_nodes: Number of interned nodes
+        sources: Interned source index of every edge
+        targets: Interned target index of every edge
+        weights: Optional weight of every edge
+
+    Returns:
+        A tuple of (offsets, neighbors, neighbor_weights) where the neighbors
+        of node ``i`` are ``neighbors[offsets[i]:offsets[i + 1]]``, and
+        neighbor_weights holds their weights in the same order (None if no
+        weights were given)
+    """
+    offsets = array("q", bytes(8 * (num_nodes + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(num_nodes):
+        offsets[i + 1] += offsets[i]
+
+    neighbors = array("i", bytes(4 * len(sources)))
+    neighbor_weights = None if weights is None else array("d", weights)
+    cursor = array("q", offsets)
+    for edge, (source, target) in enumerate(zip(sources, targets)):
+        position = cursor[source]
+        neighbors[position] = target
+        if weights is not None:
+            neighbor_weights[position] = weights[edge]
+        cursor[source] += 1
+
+    return offsets, neighbors, neighbor_weights
+
+
+def patch_csr(
+    offsets: array,
+    neighbors: array,
+    weights: array,
+    num_nodes: int,
+    changes: Dict[int, Dict[int, Optional[float]]],
+) -> Tuple[array, array, array]:
+    """
+    Build new CSR arrays with some rows changed, leaving the inputs untouched.
+
+    Only the changed rows are rebuilt in Python. The rows between them are
+    copied as whole slices and the offsets are shifted with one cumulative
+    sum, so the Python-level work is proportional to the changes.
+
+    Args:
+        offsets: CSR row offsets, for num_nodes rows or fewer (rows past the
+            end are new, empty rows)
+        neighbors: CSR column indices
+        weights: Weights aligned with neighbors
+        num_nodes: Number of rows of the result
+        changes: Row -> {neighbor: new weight, or None to remove the entry}
+
+    Returns:
+        A tuple of (offsets, neighbors, weights) for the patched adjacency
+    """
+    neighbors, weights = memoryview(neighbors), memoryview(weights)
+    old_num_nodes = len(offsets) - 1
+    end_of_rows = offsets[old_num_nodes]
+
+    new_offsets = array("q")
+    new_offsets.frombytes(memoryview(offsets).cast("B"))
+    new_offsets.extend(array("q", [end_of_rows]) * (num_nodes - old_num_nodes))
+
+    new_neighbors, new_weights = array("i"), array("d")
+    shift = np.zeros(num_nodes + 1, dtype=np.int64)
+    copied = 0
+    for row in sorted(changes):
+        if row < old_num_nodes:
+            start, end = offsets[row], offsets[row + 1]
+        else:
+            start = end = end_of_rows
+        new_neighbors.frombytes(neighbors[copied:start].cast("B"))
+        new_weights.frombytes(weights[copied:start].cast("B"))
+
+        row_changes = changes[row]
+        row_neighbors, row_weights = [], []
+        for neighbor, weight in zip(neighbors[start:end], weights[start:end]):
+            if neighbor not in row_changes:
+                row_neighbors.append(neighbor)
+                row_weights.append(weight)
+        for neighbor, weight in row_changes.items():
+            if weight is not None:
+                row_neighbors.append(neighbor)
+                row_weights.append(weight)
+
+        new_neighbors.extend(row_neighbors)
+        new_weights.extend(row_weights)
+        shift[row + 1] += len(row_neighbors) - (end - start)
+        copied = end
+
+    new_neighbors.frombytes(neighbors[copied:].cast("B"))
+    new_weights.frombytes(weights[copied:].cast("B"))
+
+    offsets_view = np.frombuffer(new_offsets, dtype=np.int64)
+    offsets_view += np.cumsum(shift)
+    del offsets_view  # Release the buffer export
+
+    return new_offsets, new_neighbors, new_weights
+
+
+class GraphSnapshot:
+    """
+    Read-only in-memory copy of the graph at a given graph version.
+
+    Node ids are interned to dense integers ``0..n-1`` and the outgoing
+    connections are stored as CSR arrays, so traversals never touch the ORM.
+
+    Attributes:
+        version: The graph version the snapshot was built at
+        node_ids: Interned index -> Node id
+        index: Node id -> interned index
+        offsets: CSR row offsets of the outgoing adjacency
+        targets: CSR column indices of the outgoing adjacency
+        weights: Weight of every outgoing connection, aligned with targets
+        in_offsets: CSR row offsets of the incoming adjacency
+        in_sources: CSR column indices of the incoming adjacency
+        in_weights: Weight of every incoming connection, aligned with in_sources
+        derived: Cache of structures computed from the adjacency (components,
+            ...), which live exactly as long as the snapshot
+    """
+
+    def __init__(
+        self,
+        version: int,
+        node_ids: List,
+        sources: Iterable[int],
+        targets: Iterable[int],
+        weights: Optional[Iterable[float]] = None,
+    ):
+        self.version = version
+        self.node_ids = node_ids
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        sources, targets = array("i", sources), array("i", targets)
+        if weights is None:
+            weights = array("d", [1.0]) * len(sources)
+        else:
+            weights = array("d", weights)
+        self.offsets, self.targets, self.weights = build_csr(
+            len(node_ids), sources, targets, weights
+        )
+        self.in_offsets, self.in_sources, self.in_weights = build_csr(
+            len(node_ids), targets, sources, weights
+        )
+        self.derived = {}
+
+    @classmethod
+    def build(cls, version: Optional[int] = None) -> "GraphSnapshot":
+        """
+        Load the whole graph from the database.
+
+        Args:
+            version: The graph version read before loading, if already known
+
+        Returns:
+            A new GraphSnapshot instance
+        """
+        if version is None:
+            version = GraphVersion.current()
+
+        node_ids = list(
+            Node.objects.order_by()
+            .values_list("id", flat=True)
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        sources, targets, weights = array("i"), array("i"), array("d")
+        connections = (
+            Connection.objects.order_by()
+            .values_list("from_node_id", "to_node_id", "weight")
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for from_node_id, to_node_id, weight in connections:
+            source, target = index.get(from_node_id), index.get(to_node_id)
+            # Skip edges to nodes created after the node list was read;
+            # they are picked up by the next version bump.
+            if source is not None and target is not None:
+                sources.append(source)
+                targets.append(target)
+                weights.append(weight)
+
+        return cls(version, node_ids, sources, targets, weights)
+
+    def apply(
+        self, changes: Iterable[Tuple], version: int
+    ) -> Optional["GraphSnapshot"]:
+        """
+        Return a new snapshot with graph changes applied on top of this one.
+
+        This snapshot is left untouched, so concurrent readers are not
+        disturbed. Changes are idempotent: a snapshot built from the database
+        after some of the changes happened can still replay them. Deleted
+        nodes keep their interned index, but can no longer be interned.
+
+        Args:
+            changes: (kind, node_id, from_node_id, to_node_id, weight) tuples
+                in log order, see GraphChange
+            version: The graph version after the last change
+
+        Returns:
+            The updated snapshot, or None if a change refers to a node this
+            snapshot does not know about (the caller should rebuild)
+        """
+        node_ids = list(self.node_ids)
+        index = self._copy_index()
+        out_changes, in_changes = defaultdict(dict), defaultdict(dict)
+
+        for kind, node_id, from_node_id, to_node_id, weight in changes:
+            if kind == GraphChange.Kind.NODE_CREATED:
+                if node_id not in index:
+                    index[node_id] = len(node_ids)
+                    node_ids.append(node_id)
+            elif kind == GraphChange.Kind.NODE_DELETED:
+                index.pop(node_id, None)
+            elif kind != GraphChange.Kind.NODE_UPDATED:
+                source, target = index.get(from_node_id), index.get(to_node_id)
+                if source is None or target is None:
+                    return None
+                if kind == GraphChange.Kind.EDGE_DELETED:
+                    weight = None
+                out_changes[source][target] = weight
+                in_changes[target][source] = weight
+
+        snapshot = GraphSnapshot.__new__(GraphSnapshot)
+        snapshot.version = version
+        snapshot.node_ids = node_ids
+        snapshot.index = index
+        snapshot.offsets, snapshot.targets, snapshot.weights = patch_csr(
+            self.offsets, self.targets, self.weights, len(node_ids), out_changes
+        )
+        snapshot.in_offsets, snapshot.in_sources, snapshot.in_weights = patch_csr(
+            self.in_offsets, self.in_sources, self.in_weights, len(node_ids), in_changes
+        )
+        snapshot.derived = {}
+        return snapshot
+
+    def _copy_index(self) -> Dict:
+        """Return a copy of the node id -> interned index mapping."""
+        return dict(self.index)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    @property
+    def has_deleted_nodes(self) -> bool:
+        """Whether nodes deleted by apply() still hold an interned index."""
+        return len(self.index) < len(self.node_ids)
+
+    def intern(self, node_id) -> Optional[int]:
+        """Return the interned index of a node id, or None if it is unknown."""
+        return self.index.get(node_id)
+
+    def successors(self, i: int) -> array:
+        """Return the interned indices of the nodes ``i`` connects to."""
+        return self.targets[self.offsets[i] : self.offsets[i + 1]]
+
+    def successor_weights(self, i: int) -> array:
+        """Return the weights of the connections of ``i``, aligned with successors."""
+        return self.weights[self.offsets[i] : self.offsets[i + 1]]
+
+    def predecessors(self, i: int) -> array:
+        """Return the interned indices of the nodes connecting to ``i``."""
+        return self.in_sources[self.in_offsets[i] : self.in_offsets[i + 1]]
+
+
+class SnapshotHolder:
+    """
+    Process-wide holder of the current GraphSnapshot.
+
+    Every gunicorn and Celery worker process gets its own holder. The snapshot
+    is built on first use and reused across requests until the graph version
+    changes, as announced by the version listener on PostgreSQL or read from
+    the database otherwise (see notifications.current_graph_version). It then
+    catches up by replaying the GraphChange entries written since its
+    version, which costs work proportional to the changes instead of
+    reloading every connection.
+
+    Snapshots are loaded from scratch on first use, when the change log does
+    not cover the missing versions, or when more than
+    settings.GRAPH_SNAPSHOT_MAX_CHANGES changes are missing. When
+    settings.GRAPH_CSR_DIR holds CSR files (see the export_graph_csr
+    command), the newest one at or below the current version is
+    memory-mapped and caught up from the change log instead of loading the
+    graph from the database; the database is only read when the log does
+    not cover the versions since that file.
+
+    Catching up copies the mapped arrays into the process, so workers stop
+    sharing them once the graph changes. The export_graph_csr_task, run by
+    Celery beat, writes a file for the new version; while its snapshot is
+    such a private copy, the holder looks for a newer file every
+    CSR_RECHECK_INTERVAL seconds and maps it again.
+    """
+
+    # Seconds between two looks for a newer CSR file while the snapshot is
+    # not mapped
+    CSR_RECHECK_INTERVAL = 5.0
+
+    def __init__(self):
+        self._snapshot: Optional[GraphSnapshot] = None
+        # Version of the CSR file the snapshot was mapped from, -1 if none
+        self._csr_version = -1
+        self._csr_checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> GraphSnapshot:
+        """Return an up-to-date snapshot, rebuilding it if the graph changed."""
+        version = current_graph_version()
+
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and snapshot.version == version
+            and not self._csr_recheck_due(snapshot)
+        ):
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and self._newer_csr_file(snapshot, version):
+                snapshot = None
+            if snapshot is None or snapshot.version != version:
+                updated = None
+                if snapshot is not None and snapshot.version < version:
+                    updated = self._update(snapshot, version)
+                snapshot = updated or self._load(version)
+                self._snapshot = snapshot
+
+        return snapshot
+
+    def get_if_loaded(self) -> Optional[GraphSnapshot]:
+        """Return an up-to-date snapshot if one was loaded before, else None."""
+        if self._snapshot is None:
+            return None
+        return self.get()
+
+    @staticmethod
+    def _update(snapshot: GraphSnapshot, version: int) -> Optional[GraphSnapshot]:
+        """Replay the change log onto a snapshot, or return None to reload it."""
+        limit = settings.GRAPH_SNAPSHOT_MAX_CHANGES
+        changes = list(
+            GraphChange.objects.filter(
+                version__gt=snapshot.version, version__lte=version
+            )
+            .order_by("id")
+            .values_list(
+                "version", "kind", "node_id", "from_node_id", "to_node_id", "weight"
+            )[: limit + 1]
+        )
+        if len(changes) > limit:
+            return None
+
+        # Every version has at least one entry, unless the log was pruned
+        # or the graph was written without logging
+        if len({change[0] for change in changes}) != version - snapshot.version:
+            return None
+
+        return snapshot.apply((change[1:] for change in changes), version)
+
+    def _csr_recheck_due(self, snapshot: GraphSnapshot) -> bool:
+        """Whether to look for a CSR file to map instead of a private copy."""
+        from .mapped import MappedGraphSnapshot
+
+        return (
+            bool(settings.GRAPH_CSR_DIR)
+            and not isinstance(snapshot, MappedGraphSnapshot)
+            and time.monotonic() - self._csr_checked >= self.CSR_RECHECK_INTERVAL
+        )
+
+    def _newer_csr_file(self, snapshot: GraphSnapshot, version: int) -> bool:
+        """Whether a newer CSR file than the snapshot's was exported since."""
+        if not settings.GRAPH_CSR_DIR:
+            return False
+        if snapshot.version == version and not self._csr_recheck_due(snapshot):
+            return False
+
+        from .mapped import latest_csr_version
+
+        self._csr_checked = time.monotonic()
+        latest = latest_csr_version(settings.GRAPH_CSR_DIR, version)
+        return latest is not None and latest > self._csr_version
+
+    def _load(self, version: int) -> GraphSnapshot:
+        """Map the newest exported CSR file and catch up, else read the database."""
+        if settings.GRAPH_CSR_DIR:
+            from .mapped import MappedGraphSnapshot
+
+            self._csr_checked = time.monotonic()
+            snapshot = MappedGraphSnapshot.load(settings.GRAPH_CSR_DIR, version)
+            if snapshot is not None:
+                self._csr_version = snapshot.version
+                if snapshot.version < version:
+                    snapshot = self._update(snapshot, version)
+            if snapshot is not None:
+                return snapshot
+
+        return GraphSnapshot.build(version)
+
+    def clear(self) -> None:
+        """Drop the cached snapshot so the next call rebuilds it."""
+        self._snapshot = None
+        self._csr_version = -1
+        self._csr_checked = 0.0
+
+
+_holder = SnapshotHolder()
+
+
+def get_snapshot() -> GraphSnapshot:
+    """Return the process-level graph snapshot."""
+    return _holder.get()
+
+
+def get_loaded_snapshot() -> Optional[GraphSnapshot]:
+    """Return the process-level graph snapshot, unless it was never loaded."""
+    return _holder.get_if_loaded()
+
+
+def clear_snapshot() -> None:
+    """Drop the process-level graph snapshot."""
+    _holder.clear()
@@ -1,19 +1,36 @@
+import os
 import time
 from typing import List, Optional
 
 from celery import shared_task
 from celery.exceptions import Ignore
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
 
-from .constants import TASK_STATUSES
-from .models import Node
+from .constants import GRAPH_INDEX_KINDS, TASK_STATUSES
+from .landmarks import Landmarks, landmark_index_kind
+from .mapped import (
+    CSR_FILES_KEPT,
+    csr_file_path,
+    remove_old_csr_files,
+    write_csr_file,
+)
+from .models import GraphChange, GraphVersion, LandmarkIndex, Node, ReachabilityIndex
+from .reachability import Reachability, release_build_lock
 from .services import GraphService
+from .snapshot import get_snapshot
+from .traversal import SearchTruncated
 
 
 @shared_task(bind=True, name="graph_api.slow_find_path")
 def slow_find_path_task(
-    self, from_node_name: str, to_node_name: str
+    self,
+    from_node_name: str,
+    to_node_name: str,
+    mode: Optional[str] = None,
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
 ) -> Optional[List[str]]:
     """
     Celery task to find a path between two nodes.
@@ -24,6 +41,9 @@ def slow_find_path_task(
     Args:
         from_node_name: The name of the source node
         to_node_name: The name of the target node
+        mode: The search mode, defaults to settings.GRAPH_FIND_PATH_MODE
+        max_depth: Optional maximum number of hops of the path
+        max_visited: Optional maximum number of nodes the search may visit
 
     Returns:
         A list of node names representing the path, or None if no path exists
@@ -56,7 +76,25 @@ def slow_find_path_task(
             )
             return _dict
 
-        path = GraphService.find_path(from_node, to_node)
+        try:
+            path = GraphService.find_path(
+                from_node,
+                to_node,
+                mode=mode,
+                max_depth=max_depth,
+                max_visited=max_visited,
+            )
+        except SearchTruncated as e:
+            _dict = dict(
+                status=TASK_STATUSES.FAILURE.value,
+                path=None,
+                message="Search truncated.",
+                error=str(e),
+            )
+            self.update_state(
+                meta=_dict,
+            )
+            return _dict
 
         if path is None:
             _dict = dict(
@@ -90,3 +128,112 @@ def slow_find_path_task(
             meta=_dict,
         )
         raise Ignore() from e
+
+
+@shared_task(name="graph_api.build_reachability_index")
+def build_reachability_index_task() -> int:
+    """
+    Celery task to build and store the reachability index of the graph.
+
+    The index is built from this worker's snapshot at the current graph
+    version and stored for the web workers; it is skipped if an index for
+    that version already exists. The build lock taken by the requesting
+    worker is released when done.
+
+    Returns:
+        The graph version the index was built at
+    """
+    try:
+        snapshot = get_snapshot()
+
+        if not ReachabilityIndex.objects.filter(version=snapshot.version).exists():
+            Reachability.build(snapshot).save(snapshot)
+    finally:
+        release_build_lock(GRAPH_INDEX_KINDS.REACHABILITY.value)
+
+    return snapshot.version
+
+
+@shared_task(name="graph_api.build_landmark_index")
+def build_landmark_index_task(weighted: bool = False) -> int:
+    """
+    Celery task to compute and store the landmark distances of the graph.
+
+    settings.GRAPH_LANDMARKS hop landmarks, or settings.GRAPH_WEIGHTED_LANDMARKS
+    weighted ones, are picked with settings.GRAPH_LANDMARK_STRATEGY from this
+    worker's snapshot at the current graph version; it is skipped if
+    distances for that version already exist. The build lock taken by the
+    requesting worker is released when done.
+
+    Args:
+        weighted: Compute connection weight distances for the A* bounds of
+            the "weighted" search mode instead of hop distances
+
+    Returns:
+        The graph version the distances were computed at
+    """
+    try:
+        snapshot = get_snapshot()
+
+        if not LandmarkIndex.objects.filter(
+            version=snapshot.version, weighted=weighted
+        ).exists():
+            strategy = settings.GRAPH_LANDMARK_STRATEGY
+            count = (
+                settings.GRAPH_WEIGHTED_LANDMARKS
+                if weighted
+                else settings.GRAPH_LANDMARKS
+            )
+            landmarks = Landmarks.build(
+                snapshot, count, weighted=weighted, strategy=strategy
+            )
+            landmarks.save(snapshot, strategy)
+    finally:
+        release_build_lock(landmark_index_kind(weighted))
+
+    return snapshot.version
+
+
+@shared_task(name="graph_api.prune_graph_changes")
+def prune_graph_changes_task() -> int:
+    """
+    Celery task to delete the change log entries no snapshot needs anymore.
+
+    Entries older than settings.GRAPH_CHANGE_LOG_RETENTION versions are
+    deleted; snapshots older than that are reloaded from scratch anyway.
+
+    Returns:
+        The number of deleted entries
+    """
+    oldest = GraphVersion.current() - settings.GRAPH_CHANGE_LOG_RETENTION
+    deleted, _ = GraphChange.objects.filter(version__lte=oldest).delete()
+    return deleted
+
+
+@shared_task(name="graph_api.export_graph_csr")
+def export_graph_csr_task() -> Optional[int]:
+    """
+    Celery task to export the graph to a CSR file in settings.GRAPH_CSR_DIR.
+
+    Workers whose snapshot caught up past the newest CSR file hold a private
+    copy of the graph; run periodically, this task writes a file for the
+    current version so that they map it again (see SnapshotHolder). The
+    file is written from this worker's snapshot, and only if the version
+    has none yet. Like the export_graph_csr command, the CSR_FILES_KEPT most
+    recent files are kept.
+
+    Returns:
+        The exported graph version, or None if GRAPH_CSR_DIR is not set
+    """
+    directory = settings.GRAPH_CSR_DIR
+    if not directory:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    snapshot = get_snapshot()
+    path = csr_file_path(directory, snapshot.version)
+    if not os.path.exists(path):
+        write_csr_file(snapshot, path)
+    remove_old_csr_files(directory, CSR_FILES_KEPT)
+
+    return snapshot.version
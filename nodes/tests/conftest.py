@@ -0,0 +1,17 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+
+from nodes.landmarks import clear_landmarks
+from nodes.reachability import clear_reachability
+from nodes.snapshot import clear_snapshot
+
+
+@pytest.fixture(autouse=True)
+def clear_process_graph_state():
+    """Drop process-level graph state so tests never see another test's graph."""
+    clear_snapshot()
+    clear_reachability()
+    clear_landmarks()
+    caches[settings.GRAPH_PATH_CACHE_ALIAS].clear()
+    yield
@@ -0,0 +1,194 @@
+import io
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from ..edgelist import read_edge_list
+from ..mapped import csr_file_chunks
+from ..models import Connection, GraphChange, GraphVersion, Node
+from ..snapshot import GraphSnapshot, SnapshotHolder
+
+
+class ReadEdgeListTest(SimpleTestCase):
+    """Test cases for parsing edge list files."""
+
+    def test_csv(self):
+        """Test CSV rows with a header, default weights and quoted names."""
+        lines = StringIO('from_node,to_node,weight\nA,B,2.5\n\n"C,1",A\n')
+        self.assertEqual(
+            list(read_edge_list(lines, "csv")),
+            [(2, ("A", "B", 2.5), None), (4, ("C,1", "A", 1.0), None)],
+        )
+
+    def test_ndjson(self):
+        """Test NDJSON objects with and without a weight."""
+        lines = [
+            '{"from_node": "A", "to_node": "B"}\n',
+            '{"from_node": "B", "to_node": "C", "weight": 3}\n',
+        ]
+        self.assertEqual(
+            [edge for _, edge, _ in read_edge_list(lines, "ndjson")],
+            [("A", "B", 1.0), ("B", "C", 3.0)],
+        )
+
+    def test_invalid_lines(self):
+        """Test that invalid lines are reported with their line number."""
+        csv_lines = StringIO("A,A\nA,B,-1\nA,B,x\nA\nA,B,1,2\n,B\n")
+        self.assertEqual(
+            [(line, edge) for line, edge, _ in read_edge_list(csv_lines, "csv")],
+            [(1, None), (2, None), (3, None), (4, None), (5, None), (6, None)],
+        )
+
+        ndjson_lines = ["{", "[1]", '{"from_node": "A", "to_node": 1}']
+        results = list(read_edge_list(ndjson_lines, "ndjson"))
+        self.assertEqual([edge for _, edge, _ in results], [None, None, None])
+        self.assertTrue(all(error for _, _, error in results))
+
+
+class ImportGraphCommandTest(TestCase):
+    """Test cases for the import_graph command."""
+
+    def setUp(self):
+        """Set up test data: A -> B."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        node_a = Node.objects.create(name="A")
+        node_b = Node.objects.create(name="B")
+        Connection.objects.create(from_node=node_a, to_node=node_b)
+
+    def import_file(self, name, content, **options):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write(content)
+        out = StringIO()
+        call_command("import_graph", path, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def edges(self):
+        return sorted(
+            Connection.objects.values_list("from_node__name", "to_node__name", "weight")
+        )
+
+    def test_import(self):
+        """Test that nodes are created and connections upserted in batches."""
+        version = GraphVersion.current()
+
+        out = self.import_file(
+            "edges.csv", "A,B,4\nB,C\nC,D,2\nD,D\nC,D,3\n", batch_size=2
+        )
+
+        self.assertEqual(
+            self.edges(),
+            [("A", "B", 4.0), ("B", "C", 1.0), ("C", "D", 3.0)],
+        )
+        self.assertEqual(Node.objects.count(), 4)
+        self.assertIn("rows/s", out)
+        self.assertIn("Imported 4 edges", out)
+        self.assertIn("1 invalid lines skipped", out)
+        # One version for the whole import, and no change log entries
+        self.assertEqual(GraphVersion.current(), version + 1)
+        self.assertFalse(GraphChange.objects.filter(version=version + 1).exists())
+
+    def test_ndjson_import_reloads_snapshots(self):
+        """Test that held snapshots reload the imported graph."""
+        holder = SnapshotHolder()
+        holder.get()
+
+        self.import_file(
+            "edges.ndjson",
+            '{"from_node": "B", "to_node": "C", "weight": 0.5}\n',
+            verbosity=0,
+        )
+
+        snapshot = holder.get()
+        self.assertEqual(snapshot.version, GraphVersion.current())
+        self.assertEqual(snapshot.num_edges, 2)
+        self.assertEqual(len(snapshot), len(GraphSnapshot.build()))
+
+    def test_stdin(self):
+        """Test that standard input is read as UTF-8 CSV and left open."""
+        stdin = io.TextIOWrapper(io.BytesIO('B,"C\r\nD",2\r\n'.encode()))
+        with patch("sys.stdin", stdin):
+            call_command("import_graph", "-", verbosity=0, stdout=StringIO())
+
+        self.assertIn(("B", "C\r\nD", 2.0), self.edges())
+        self.assertFalse(stdin.buffer.closed)
+
+    def test_nothing_to_import(self):
+        """Test that a file without valid edges leaves the graph version alone."""
+        version = GraphVersion.current()
+        out = self.import_file("edges.csv", "from_node,to_node\nA,A\n")
+
+        self.assertIn("Nothing imported", out)
+        self.assertEqual(GraphVersion.current(), version)
+
+    def test_missing_file(self):
+        """Test that an unreadable file is a command error."""
+        with self.assertRaises(CommandError):
+            call_command("import_graph", os.path.join(self.directory, "missing.csv"))
+
+
+class ExportGraphCommandTest(TestCase):
+    """Test cases for the export_graph command."""
+
+    def setUp(self):
+        """Set up test data: A -> B -> C, and an isolated node D."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        nodes = [Node.objects.create(name=name) for name in ["A", "B", "C,1", "D"]]
+        Connection.objects.create(from_node=nodes[0], to_node=nodes[1], weight=0.5)
+        Connection.objects.create(from_node=nodes[1], to_node=nodes[2])
+
+    def export(self, name, **options):
+        path = os.path.join(self.directory, name)
+        call_command("export_graph", output=path, stdout=StringIO(), **options)
+        return path
+
+    def test_round_trip(self):
+        """Test that exported connections import back to the same graph."""
+        for fmt in ["csv", "ndjson"]:
+            with self.subTest(fmt=fmt):
+                path = self.export(f"edges.{fmt}", format=fmt)
+                expected = sorted(
+                    Connection.objects.values_list(
+                        "from_node__name", "to_node__name", "weight"
+                    )
+                )
+                Connection.objects.all().delete()
+
+                call_command("import_graph", path, verbosity=0)
+
+                self.assertEqual(
+                    sorted(
+                        Connection.objects.values_list(
+                            "from_node__name", "to_node__name", "weight"
+                        )
+                    ),
+                    expected,
+                )
+
+    def test_nodes(self):
+        """Test that node exports include isolated nodes."""
+        with open(self.export("nodes.csv", kind="nodes")) as f:
+            self.assertEqual(
+                sorted(f.read().splitlines()), ['"C,1"', "A", "B", "D", "name"]
+            )
+
+    def test_csr(self):
+        """Test that the CSR form is the file export_graph_csr writes."""
+        path = self.export("graph.csr", format="csr")
+        with open(path, "rb") as f:
+            exported = f.read()
+
+        self.assertEqual(
+            exported,
+            b"".join(bytes(chunk) for chunk in csr_file_chunks(GraphSnapshot.build())),
+        )
@@ -0,0 +1,190 @@
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..landmarks import Landmarks, get_landmarks, get_weighted_landmarks
+from ..models import Connection, LandmarkIndex, Node
+from ..services import GraphService
+from ..snapshot import GraphSnapshot, get_snapshot
+from ..traversal import bfs
+from .test_traversal import distances_from, random_snapshot
+
+
+class LandmarkPruningTest(SimpleTestCase):
+    """Test cases for pruning searches with landmark distances."""
+
+    def test_pruned_nodes_cannot_reach_targets(self):
+        """Test that only nodes unable to reach any target are pruned."""
+        for seed in range(10):
+            snapshot = random_snapshot(40, 50, seed=seed)
+            landmarks = Landmarks.build(snapshot, 4, weighted=False)
+            reaches = [set(distances_from(snapshot, node)) for node in range(40)]
+            for targets in [{0}, {3, 17}]:
+                parents = landmarks.pruned_parents(targets)
+                if parents is None:
+                    continue
+                for node in range(40):
+                    if parents[node] != -1:
+                        with self.subTest(seed=seed, node=node, targets=targets):
+                            self.assertFalse(reaches[node] & targets)
+
+    def test_pruned_parents_match_per_target_masks(self):
+        """Test that grouped targets prune exactly the per-target masks."""
+        for seed in range(10):
+            snapshot = random_snapshot(60, 70, seed=seed)
+            for weighted in [False, True]:
+                landmarks = Landmarks.build(snapshot, 4, weighted=weighted)
+                unreachable = landmarks.unreachable
+                for targets in [[5], [1, 2, 3], list(range(0, 60, 2))]:
+                    expected = np.ones(60, dtype=bool)
+                    for target in targets:
+                        target_pruned = np.zeros(60, dtype=bool)
+                        for forward, backward in zip(
+                            landmarks.forward, landmarks.backward
+                        ):
+                            if forward[target] == unreachable:
+                                target_pruned |= np.array(forward) != unreachable
+                            if backward[target] != unreachable:
+                                target_pruned |= np.array(backward) == unreachable
+                        expected &= target_pruned
+
+                    parents = landmarks.pruned_parents(targets)
+                    with self.subTest(seed=seed, weighted=weighted, targets=targets):
+                        if not expected.any():
+                            self.assertIsNone(parents)
+                        else:
+                            self.assertEqual(
+                                list(parents), [-2 if p else -1 for p in expected]
+                            )
+
+    def test_pruned_parents_are_fresh_arrays(self):
+        """Test that cached pruning results are copied for every search."""
+        snapshot = random_snapshot(40, 50, seed=2)
+        landmarks = Landmarks.build(snapshot, 4, weighted=False)
+        target = next(t for t in range(40) if landmarks.pruned_parents([t]) is not None)
+
+        first = landmarks.pruned_parents([target])
+        expected = list(first)
+        bfs(snapshot, target, target, parents=first)
+
+        self.assertEqual(list(landmarks.pruned_parents([target])), expected)
+
+    def test_pruned_bfs_finds_shortest_paths(self):
+        """Test that pruning never changes the path length."""
+        for seed in range(10):
+            snapshot = random_snapshot(40, 60, seed=seed)
+            landmarks = Landmarks.build(snapshot, 4, weighted=False)
+            for source in range(0, 40, 3):
+                for target in range(0, 40, 4):
+                    expected = bfs(snapshot, source, target)
+                    parents = landmarks.pruned_parents([target])
+                    path = bfs(snapshot, source, target, parents=parents)
+                    with self.subTest(seed=seed, pair=(source, target)):
+                        if landmarks.lower_bound(source, target) == float("inf"):
+                            self.assertIsNone(expected)
+                        elif expected is None:
+                            self.assertIsNone(path)
+                        else:
+                            self.assertEqual(len(path), len(expected))
+
+    def test_random_strategy(self):
+        """Test that random landmarks are distinct and stable per version."""
+        snapshot = random_snapshot(30, 40, seed=0)
+
+        first = Landmarks.build(snapshot, 5, weighted=False, strategy="random")
+        second = Landmarks.build(snapshot, 5, weighted=False, strategy="random")
+
+        self.assertEqual(first.landmarks, second.landmarks)
+        self.assertEqual(len(set(first.landmarks)), 5)
+
+
+class StoredLandmarksTest(TestCase):
+    """Test cases for storing and serving the landmark index."""
+
+    def setUp(self):
+        """Set up test data: A -> B -> C, D -> C."""
+        self.nodes = {name: Node.objects.create(name=name) for name in "ABCD"}
+        Connection.objects.create(from_node=self.nodes["A"], to_node=self.nodes["B"])
+        Connection.objects.create(from_node=self.nodes["B"], to_node=self.nodes["C"])
+        Connection.objects.create(from_node=self.nodes["D"], to_node=self.nodes["C"])
+
+    def test_save_and_load(self):
+        """Test that stored distances bound like the ones they came from."""
+        snapshot = get_snapshot()
+        built = Landmarks.build(snapshot, 2, weighted=False)
+        record = built.save(snapshot, "degree")
+
+        loaded = Landmarks.load(record, GraphSnapshot.build())
+
+        self.assertEqual(loaded.landmarks, built.landmarks)
+        for source in range(len(snapshot)):
+            for target in range(len(snapshot)):
+                self.assertEqual(
+                    loaded.lower_bound(source, target),
+                    built.lower_bound(source, target),
+                )
+
+    def test_build_requested_for_new_version(self):
+        """Test that missing distances are computed by the Celery task."""
+        snapshot = get_snapshot()
+
+        # Celery runs eagerly in tests, so the index is stored right away
+        self.assertIsNone(get_landmarks(snapshot))
+        record = LandmarkIndex.objects.get(version=snapshot.version, weighted=False)
+        self.assertEqual(record.num_landmarks, 4)
+
+    def test_save_and_load_weighted(self):
+        """Test that weighted distances are stored next to the hop distances."""
+        snapshot = get_snapshot()
+        Landmarks.build(snapshot, 2, weighted=False).save(snapshot, "degree")
+        built = Landmarks.build(snapshot, 2, weighted=True)
+        record = built.save(snapshot, "degree")
+
+        loaded = Landmarks.load(record, GraphSnapshot.build())
+
+        self.assertTrue(loaded.weighted)
+        self.assertEqual(loaded.forward, built.forward)
+        self.assertEqual(loaded.backward, built.backward)
+        self.assertEqual(
+            LandmarkIndex.objects.filter(version=snapshot.version).count(), 2
+        )
+
+    def test_weighted_build_requested_for_new_version(self):
+        """Test that weighted distances are computed by the Celery task."""
+        snapshot = get_snapshot()
+
+        with patch("nodes.services.traversal.dijkstra") as dijkstra:
+            dijkstra.return_value = None
+            GraphService.find_path(self.nodes["A"], self.nodes["C"], mode="weighted")
+        # The request searched without a heuristic instead of waiting
+        self.assertEqual(len(dijkstra.call_args.args), 3)
+
+        self.assertIsNone(get_weighted_landmarks(snapshot))
+        record = LandmarkIndex.objects.get(version=snapshot.version, weighted=True)
+        self.assertEqual(record.num_landmarks, 4)
+
+    @override_settings(GRAPH_REACHABILITY_INDEX=False, GRAPH_PATH_CACHE=False)
+    def test_find_path_short_circuits_unreachable_pairs(self):
+        """Test that pairs the landmarks prove unreachable never reach the BFS."""
+        snapshot = get_snapshot()
+        Landmarks.build(snapshot, 4, weighted=False).save(snapshot, "degree")
+
+        with patch("nodes.traversal.bfs_order") as bfs_order:
+            path = GraphService.find_path(self.nodes["A"], self.nodes["D"], mode="bfs")
+
+        self.assertIsNone(path)
+        bfs_order.assert_not_called()
+        self.assertEqual(
+            GraphService.find_path(self.nodes["A"], self.nodes["C"], mode="bfs"),
+            ["A", "B", "C"],
+        )
+        self.assertEqual(
+            GraphService.find_paths(
+                [
+                    (self.nodes["A"].id, self.nodes["D"].id),
+                    (self.nodes["D"].id, self.nodes["C"].id),
+                ]
+            ),
+            [None, ["D", "C"]],
+        )
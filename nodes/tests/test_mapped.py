@@ -0,0 +1,207 @@
+import os
+import random
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..mapped import (
+    MappedGraphSnapshot,
+    csr_file_path,
+    remove_old_csr_files,
+    write_csr_file,
+)
+from ..models import Connection, Node
+from ..services import GraphService
+from ..signals import record_graph_rewrite
+from ..snapshot import GraphSnapshot, SnapshotHolder, get_snapshot
+from ..tasks import export_graph_csr_task
+from ..vectorized import bfs as vectorized_bfs
+from .test_traversal import SEARCHES
+
+
+class MappedGraphSnapshotTest(SimpleTestCase):
+    """Test cases for the memory-mapped CSR file."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def random_snapshot(self, seed):
+        """A random weighted snapshot with unsorted, sparse node ids."""
+        rng = random.Random(seed)
+        node_ids = rng.sample(range(1, 10_000), 50)
+        edges = [(rng.randrange(50), rng.randrange(50)) for _ in range(120)]
+        weights = [rng.random() for _ in edges]
+        sources, targets = zip(*edges)
+        return GraphSnapshot(7, node_ids, sources, targets, weights)
+
+    def test_round_trip(self):
+        """Test that the mapped arrays match the exported snapshot."""
+        snapshot = self.random_snapshot(seed=0)
+        path = csr_file_path(self.directory, snapshot.version)
+        write_csr_file(snapshot, path)
+
+        mapped = MappedGraphSnapshot.load(self.directory, 7)
+
+        self.assertEqual(mapped.version, 7)
+        self.assertEqual(len(mapped), len(snapshot))
+        self.assertEqual(mapped.num_edges, snapshot.num_edges)
+        for name in [
+            "node_ids",
+            "offsets",
+            "targets",
+            "weights",
+            "in_offsets",
+            "in_sources",
+            "in_weights",
+        ]:
+            with self.subTest(array=name):
+                self.assertEqual(
+                    list(getattr(mapped, name)), list(getattr(snapshot, name))
+                )
+
+    def test_intern(self):
+        """Test that node ids are interned like in the exported snapshot."""
+        snapshot = self.random_snapshot(seed=1)
+        write_csr_file(snapshot, csr_file_path(self.directory, 7))
+        mapped = MappedGraphSnapshot.load(self.directory, 7)
+
+        for node_id in snapshot.node_ids:
+            self.assertEqual(mapped.intern(node_id), snapshot.intern(node_id))
+        for node_id in [0, 10_000, -5]:
+            self.assertIsNone(mapped.intern(node_id))
+
+    def test_searches_run_on_mapped_arrays(self):
+        """Test that every search gives the same answers on the mapped file."""
+        snapshot = self.random_snapshot(seed=2)
+        write_csr_file(snapshot, csr_file_path(self.directory, 7))
+        mapped = MappedGraphSnapshot.load(self.directory, 7)
+
+        for search in SEARCHES + [vectorized_bfs]:
+            for source in range(0, 50, 7):
+                for target in range(0, 50, 5):
+                    with self.subTest(search=search.__name__, pair=(source, target)):
+                        self.assertEqual(
+                            search(mapped, source, target),
+                            search(snapshot, source, target),
+                        )
+
+    def test_missing_and_invalid_files(self):
+        """Test that missing files are skipped and foreign files rejected."""
+        self.assertIsNone(MappedGraphSnapshot.load(self.directory, 1))
+
+        with open(csr_file_path(self.directory, 1), "wb") as f:
+            f.write(b"not a graph".ljust(64, b"\0"))
+        with self.assertRaises(ValueError):
+            MappedGraphSnapshot.load(self.directory, 1)
+
+    def test_newest_file_at_or_below_version(self):
+        """Test that the newest file not ahead of the version is mapped."""
+        for version in [3, 5, 9]:
+            snapshot = self.random_snapshot(version)
+            snapshot.version = version
+            write_csr_file(snapshot, csr_file_path(self.directory, version))
+
+        self.assertIsNone(MappedGraphSnapshot.load(self.directory, 2))
+        self.assertEqual(MappedGraphSnapshot.load(self.directory, 8).version, 5)
+        self.assertEqual(MappedGraphSnapshot.load(self.directory, 9).version, 9)
+
+        # The newest file is the base workers catch up from
+        remove_old_csr_files(self.directory, 0)
+        self.assertEqual(os.listdir(self.directory), ["graph-9.csr"])
+
+
+class ExportGraphCSRCommandTest(TestCase):
+    """Test cases for the export_graph_csr command and the mapped holder."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+        self.nodes = [Node.objects.create(name=name) for name in "ABC"]
+        Connection.objects.create(from_node=self.nodes[0], to_node=self.nodes[1])
+        Connection.objects.create(from_node=self.nodes[1], to_node=self.nodes[2])
+
+    def export(self, **options):
+        out = StringIO()
+        call_command(
+            "export_graph_csr", directory=self.directory, stdout=out, **options
+        )
+        return out.getvalue()
+
+    @override_settings(GRAPH_PATH_CACHE=False)
+    def test_workers_map_the_exported_file(self):
+        """Test that the snapshot is mapped until the graph changes."""
+        self.export()
+
+        with override_settings(GRAPH_CSR_DIR=self.directory):
+            self.assertIsInstance(get_snapshot(), MappedGraphSnapshot)
+            self.assertEqual(
+                GraphService.find_path(self.nodes[0], self.nodes[2]),
+                ["A", "B", "C"],
+            )
+
+            Connection.objects.create(from_node=self.nodes[2], to_node=self.nodes[0])
+
+            self.assertNotIsInstance(get_snapshot(), MappedGraphSnapshot)
+            self.assertEqual(
+                GraphService.find_path(self.nodes[2], self.nodes[1]), ["C", "A", "B"]
+            )
+
+    @override_settings(GRAPH_PATH_CACHE=False)
+    def test_workers_catch_up_from_an_older_file(self):
+        """Test that a new worker maps an older file and replays the log."""
+        self.export()
+        Connection.objects.create(from_node=self.nodes[2], to_node=self.nodes[0])
+
+        with (
+            override_settings(GRAPH_CSR_DIR=self.directory),
+            patch.object(GraphSnapshot, "build", side_effect=AssertionError),
+        ):
+            snapshot = SnapshotHolder().get()
+        self.assertEqual(snapshot.num_edges, 3)
+
+        # Without the change log since the file, the database is read
+        record_graph_rewrite()
+        with override_settings(GRAPH_CSR_DIR=self.directory):
+            snapshot = SnapshotHolder().get()
+        self.assertNotIsInstance(snapshot, MappedGraphSnapshot)
+        self.assertEqual(snapshot.num_edges, 3)
+
+    def test_export_task_remaps_private_copies(self):
+        """Test that a scheduled export lets caught-up workers map the graph."""
+        self.assertIsNone(export_graph_csr_task())
+
+        with override_settings(GRAPH_CSR_DIR=self.directory):
+            self.assertEqual(export_graph_csr_task(), get_snapshot().version)
+            holder = SnapshotHolder()
+            self.assertIsInstance(holder.get(), MappedGraphSnapshot)
+
+            Connection.objects.create(from_node=self.nodes[2], to_node=self.nodes[0])
+            self.assertNotIsInstance(holder.get(), MappedGraphSnapshot)
+
+            version = export_graph_csr_task()
+            self.assertTrue(os.path.exists(csr_file_path(self.directory, version)))
+            with patch.object(SnapshotHolder, "CSR_RECHECK_INTERVAL", 0):
+                snapshot = holder.get()
+            self.assertIsInstance(snapshot, MappedGraphSnapshot)
+            self.assertEqual((snapshot.version, snapshot.num_edges), (version, 3))
+
+    def test_old_files_removed(self):
+        """Test that only the most recent files are kept."""
+        self.export()
+        for name in "DEF":
+            Node.objects.create(name=name)
+            self.export(keep=2)
+
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_directory_required(self):
+        """Test that the command needs an output directory."""
+        with self.assertRaises(CommandError):
+            call_command("export_graph_csr", directory="")
@@ -69,6 +69,16 @@ class ConnectionModelTest(TestCase):
         with self.assertRaises(ValidationError):
             connection.save()
 
+    def test_connection_weight_validation(self):
+        """Test that negative and non-finite weights are rejected."""
+        for weight in [-1.0, float("nan"), float("inf")]:
+            with self.subTest(weight=weight):
+                connection = Connection(
+                    from_node=self.node_a, to_node=self.node_b, weight=weight
+                )
+                with self.assertRaises(ValidationError):
+                    connection.save()
+
     def test_connection_related_names(self):
         """Test related names for connections."""
         Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
@@ -0,0 +1,71 @@
+import os
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from ..models import GraphVersion, Node
+from ..notifications import GraphVersionListener, current_graph_version
+from ..snapshot import SnapshotHolder
+
+
+def listening_listener(version):
+    """A listener in the state of a connected listening thread."""
+    listener = GraphVersionListener()
+    listener._pid = os.getpid()
+    listener._version = version
+    return listener
+
+
+class GraphVersionListenerTest(TestCase):
+    """Test cases for the graph version notifications."""
+
+    def setUp(self):
+        Node.objects.create(name="A")
+
+    def test_not_listening_without_postgresql(self):
+        """Test that no thread starts on databases without LISTEN/NOTIFY."""
+        listener = GraphVersionListener()
+        threads = threading.active_count()
+
+        self.assertIsNone(listener.version())
+        self.assertEqual(threading.active_count(), threads)
+        self.assertEqual(current_graph_version(), GraphVersion.current())
+
+    def test_notifications_only_move_forward(self):
+        """Test that late notifications never move the version back."""
+        listener = listening_listener(5)
+
+        listener._receive("7")
+        listener._receive("6")
+        listener.advance(4)
+
+        self.assertEqual(listener.version(), 7)
+
+    def test_advance_requires_listening(self):
+        """Test that a disconnected listener does not report versions."""
+        listener = GraphVersionListener()
+        listener.advance(3)
+        self.assertIsNone(listener._version)
+
+    def test_holder_skips_version_query(self):
+        """Test that snapshots follow the listener without polling."""
+        listener = listening_listener(GraphVersion.current())
+        holder = SnapshotHolder()
+
+        with patch("nodes.notifications._listener", listener):
+            snapshot = holder.get()
+            with self.assertNumQueries(0):
+                self.assertIs(holder.get(), snapshot)
+
+            # The writing process advances its own listener on commit
+            with self.captureOnCommitCallbacks(execute=True):
+                Node.objects.create(name="B")
+            self.assertEqual(listener.version(), GraphVersion.current())
+            self.assertEqual(len(holder.get()), 2)
+
+    @override_settings(GRAPH_VERSION_LISTENER=False)
+    def test_disabled_listener(self):
+        """Test that the version is polled when the listener is disabled."""
+        with patch("nodes.notifications._listener", listening_listener(999)):
+            self.assertEqual(current_graph_version(), GraphVersion.current())
@@ -0,0 +1,132 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ..models import Connection, Node
+from ..queries import (
+    find_path_frontier_batched,
+    find_path_recursive_cte,
+    insert_connections,
+    insert_nodes,
+)
+from ..traversal import SearchTruncated
+
+
+class RecursiveCTETest(TestCase):
+    """Test cases for the database-side path search."""
+
+    def setUp(self):
+        """Set up a cycle A -> B -> C -> D -> A with the shortcut A -> C."""
+        self.nodes = {
+            name: Node.objects.create(name=name) for name in ["A", "B", "C", "D"]
+        }
+        for from_name, to_name in [("A", "B"), ("B", "C"), ("C", "D"), ("D", "A")]:
+            Connection.objects.create(
+                from_node=self.nodes[from_name], to_node=self.nodes[to_name]
+            )
+        Connection.objects.create(from_node=self.nodes["A"], to_node=self.nodes["C"])
+
+    def find_path(self, from_name, to_name, max_depth=10):
+        return find_path_recursive_cte(
+            self.nodes[from_name].id, self.nodes[to_name].id, max_depth
+        )
+
+    def test_shortest_path(self):
+        """Test that the shortcut is preferred over the longer path."""
+        self.assertEqual(self.find_path("A", "D"), ["A", "C", "D"])
+
+    def test_path_through_cycle(self):
+        """Test that the walk terminates on cyclic graphs."""
+        self.assertEqual(self.find_path("B", "A"), ["B", "C", "D", "A"])
+
+    def test_depth_cap(self):
+        """Test that paths longer than max_depth are reported as truncated."""
+        with self.assertRaises(SearchTruncated):
+            self.find_path("B", "A", max_depth=2)
+        self.assertEqual(self.find_path("B", "D", max_depth=2), ["B", "C", "D"])
+        self.assertEqual(self.find_path("B", "A", max_depth=3), ["B", "C", "D", "A"])
+
+    def test_no_path(self):
+        """Test that unreachable nodes have no path."""
+        isolated = Node.objects.create(name="Isolated")
+        self.assertIsNone(
+            find_path_recursive_cte(self.nodes["A"].id, isolated.id, max_depth=10)
+        )
+
+
+class FrontierBatchedTest(TestCase):
+    """Test cases for the level-by-level lazy BFS."""
+
+    def setUp(self):
+        """Set up a chain A -> B -> C -> D with the shortcut A -> C."""
+        self.nodes = {
+            name: Node.objects.create(name=name) for name in ["A", "B", "C", "D", "E"]
+        }
+        for from_name, to_name in [("A", "B"), ("B", "C"), ("C", "D"), ("A", "C")]:
+            Connection.objects.create(
+                from_node=self.nodes[from_name], to_node=self.nodes[to_name]
+            )
+
+    def find_path(self, from_name, to_name, **budget):
+        return find_path_frontier_batched(
+            self.nodes[from_name].id, self.nodes[to_name].id, **budget
+        )
+
+    def test_shortest_path(self):
+        """Test that the shortcut is preferred over the longer path."""
+        self.assertEqual(self.find_path("A", "D"), ["A", "C", "D"])
+
+    def test_same_node(self):
+        """Test that a node has a path to itself."""
+        self.assertEqual(self.find_path("B", "B"), ["B"])
+
+    def test_no_path(self):
+        """Test that unreachable nodes have no path."""
+        self.assertIsNone(self.find_path("D", "A"))
+        self.assertIsNone(self.find_path("A", "E"))
+
+    def test_one_query_per_level(self):
+        """Test that each BFS level costs a single query."""
+        # Two levels of edges plus the final name lookup
+        with self.assertNumQueries(3):
+            self.find_path("A", "D")
+
+    def test_frontier_split_into_batches(self):
+        """Test that large frontiers are split across IN batches."""
+        with patch("nodes.queries.IN_BATCH_SIZE", 1):
+            self.assertEqual(self.find_path("A", "D"), ["A", "C", "D"])
+
+    def test_budget(self):
+        """Test that a search out of budget is told apart from no path."""
+        self.assertEqual(self.find_path("A", "D", max_depth=2), ["A", "C", "D"])
+        with self.assertRaises(SearchTruncated):
+            self.find_path("A", "D", max_depth=1)
+        with self.assertRaises(SearchTruncated):
+            self.find_path("A", "D", max_visited=2)
+        self.assertIsNone(self.find_path("C", "A", max_depth=1))
+
+
+class BulkInsertTest(TestCase):
+    """Test cases for the bulk INSERT ... ON CONFLICT helpers."""
+
+    def test_nodes_inserted_in_name_order(self):
+        """Test that names are inserted sorted, so row locks never cross."""
+        Node.objects.create(name="B")
+
+        with patch(
+            "nodes.queries._batched", side_effect=lambda values: [values]
+        ) as batched:
+            inserted = insert_nodes(["D", "B", "C", "A"])
+        self.assertEqual(batched.call_args.args[0], ["A", "B", "C", "D"])
+        self.assertEqual(sorted(name for _, name in inserted), ["A", "C", "D"])
+
+    def test_connections_inserted_in_key_order(self):
+        """Test that edges are inserted sorted, so row locks never cross."""
+        ids = [Node.objects.create(name=name).id for name in "AB"]
+        edges = [(ids[1], ids[0], 1.0), (ids[0], ids[1], 2.0)]
+
+        with patch(
+            "nodes.queries._batched", side_effect=lambda values: [values]
+        ) as batched:
+            self.assertEqual(len(insert_connections(edges)), 2)
+        self.assertEqual(batched.call_args.args[0], sorted(edges))
@@ -0,0 +1,147 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..constants import GRAPH_INDEX_KINDS
+from ..models import Connection, Node, ReachabilityIndex
+from ..reachability import (
+    Reachability,
+    ReachabilityHolder,
+    acquire_build_lock,
+    get_reachability,
+    release_build_lock,
+    strongly_connected_components,
+)
+from ..services import GraphService
+from ..snapshot import GraphSnapshot, get_snapshot
+from .test_traversal import distances_from, random_snapshot
+
+
+class StronglyConnectedComponentsTest(SimpleTestCase):
+    """Test cases for the SCC labeling."""
+
+    def test_components(self):
+        """Test labeling two cycles joined by a one-way connection."""
+        # 0 <-> 1 -> 2 <-> 3, 4 isolated
+        snapshot = GraphSnapshot(0, list(range(5)), [0, 1, 1, 2, 3], [1, 0, 2, 3, 2])
+
+        component, count = strongly_connected_components(snapshot)
+
+        self.assertEqual(count, 3)
+        self.assertEqual(component[0], component[1])
+        self.assertEqual(component[2], component[3])
+        self.assertNotEqual(component[0], component[2])
+        # Reverse topological numbering
+        self.assertGreater(component[1], component[2])
+
+    def test_reverse_topological_order(self):
+        """Test that connections never go to a higher component id."""
+        for seed in range(10):
+            snapshot = random_snapshot(60, 90, seed=seed)
+            component, _ = strongly_connected_components(snapshot)
+            for node in range(len(snapshot)):
+                for neighbor in snapshot.successors(node):
+                    self.assertGreaterEqual(component[node], component[neighbor])
+
+
+class ReachabilityTest(SimpleTestCase):
+    """Test cases for the reachability index queries."""
+
+    def test_random_graphs(self):
+        """Test that the index agrees with a BFS on random graphs."""
+        for seed in range(5):
+            snapshot = random_snapshot(60, 80, seed=seed)
+            index = Reachability.build(snapshot, num_labels=2)
+            for source in range(len(snapshot)):
+                reachable = distances_from(snapshot, source)
+                for target in range(len(snapshot)):
+                    with self.subTest(seed=seed, source=source, target=target):
+                        self.assertEqual(
+                            index.is_reachable(source, target), target in reachable
+                        )
+
+
+class StoredReachabilityTest(TestCase):
+    """Test cases for storing and serving the reachability index."""
+
+    def setUp(self):
+        """Set up test data: A -> B -> C, D isolated."""
+        self.nodes = {name: Node.objects.create(name=name) for name in "ABCD"}
+        Connection.objects.create(from_node=self.nodes["A"], to_node=self.nodes["B"])
+        Connection.objects.create(from_node=self.nodes["B"], to_node=self.nodes["C"])
+
+    def test_save_and_load(self):
+        """Test that a stored index answers like the one it was built from."""
+        snapshot = get_snapshot()
+        built = Reachability.build(snapshot)
+        record = built.save(snapshot)
+
+        loaded = Reachability.load(record, GraphSnapshot.build())
+
+        for source in range(len(snapshot)):
+            for target in range(len(snapshot)):
+                self.assertEqual(
+                    loaded.is_reachable(source, target),
+                    built.is_reachable(source, target),
+                )
+
+    def test_build_requested_for_new_version(self):
+        """Test that a missing index is built by the Celery task."""
+        snapshot = get_snapshot()
+
+        # Celery runs eagerly in tests, so the index is stored right away
+        self.assertIsNone(get_reachability(snapshot))
+        self.assertTrue(
+            ReachabilityIndex.objects.filter(version=snapshot.version).exists()
+        )
+
+    @patch.object(ReachabilityHolder, "_enqueue_build")
+    def test_build_requested_once_across_processes(self, enqueue_build):
+        """Test that holders of different processes share one build request."""
+        snapshot = get_snapshot()
+
+        # Each holder stands for the holder of another worker process
+        for _ in range(3):
+            self.assertIsNone(ReachabilityHolder().get(snapshot))
+
+        enqueue_build.assert_called_once_with()
+
+    @override_settings(GRAPH_INDEX_BUILD_INTERVAL=0)
+    def test_build_requests_throttled(self):
+        """Test that one build per index kind is in flight at a time."""
+        kind = GRAPH_INDEX_KINDS.REACHABILITY.value
+
+        self.assertTrue(acquire_build_lock(kind, 1))
+        self.assertFalse(acquire_build_lock(kind, 2))
+        self.assertTrue(acquire_build_lock(GRAPH_INDEX_KINDS.LANDMARKS.value, 2))
+
+        release_build_lock(kind)
+        self.assertTrue(acquire_build_lock(kind, 2))
+        release_build_lock(kind)
+        # Each version is built once
+        self.assertFalse(acquire_build_lock(kind, 1))
+
+    @override_settings(GRAPH_INDEX_BUILD_INTERVAL=60)
+    def test_build_interval(self):
+        """Test that the next build waits for the interval after a build."""
+        kind = GRAPH_INDEX_KINDS.REACHABILITY.value
+
+        self.assertTrue(acquire_build_lock(kind, 1))
+        release_build_lock(kind)
+
+        self.assertFalse(acquire_build_lock(kind, 2))
+
+    def test_find_path_short_circuits_unreachable_pairs(self):
+        """Test that pairs proven unreachable never reach the BFS."""
+        snapshot = get_snapshot()
+        Reachability.build(snapshot).save(snapshot)
+
+        with patch("nodes.traversal.bfs_order") as bfs_order:
+            path = GraphService.find_path(self.nodes["C"], self.nodes["A"], mode="bfs")
+
+        self.assertIsNone(path)
+        bfs_order.assert_not_called()
+        self.assertEqual(
+            GraphService.find_path(self.nodes["A"], self.nodes["C"]),
+            ["A", "B", "C"],
+        )
@@ -1,7 +1,14 @@
-from django.test import TestCase
+from unittest.mock import patch
 
-from ..models import Connection, Node
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+
+from ..constants import SEARCH_MODES
+from ..landmarks import Landmarks
+from ..models import Connection, GraphChange, GraphVersion, Node
 from ..services import GraphService
+from ..snapshot import clear_snapshot, get_snapshot
+from ..traversal import SearchTruncated
 
 
 class GraphServiceTest(TestCase):
@@ -51,6 +58,338 @@ class GraphServiceTest(TestCase):
         path = GraphService.find_path(self.node_d, self.node_a)
         self.assertIsNone(path)
 
+    @override_settings(GRAPH_PATH_CACHE=False)
+    def test_find_path_all_modes(self):
+        """Test that every search mode returns the same shortest paths."""
+        for mode in SEARCH_MODES:
+            with self.subTest(mode=mode.value):
+                self.assertEqual(
+                    GraphService.find_path(self.node_a, self.node_d, mode=mode.value),
+                    ["A", "E", "D"],
+                )
+                self.assertEqual(
+                    GraphService.find_path(self.node_b, self.node_d, mode=mode.value),
+                    ["B", "C", "D"],
+                )
+                self.assertIsNone(
+                    GraphService.find_path(self.node_d, self.node_a, mode=mode.value)
+                )
+
+    def test_find_path_weighted(self):
+        """Test that the weighted mode minimizes the sum of weights."""
+        connection = Connection.objects.get(from_node=self.node_e, to_node=self.node_d)
+        connection.weight = 5.0
+        connection.save()
+
+        self.assertEqual(
+            GraphService.find_path(self.node_a, self.node_d, mode="weighted"),
+            ["A", "B", "C", "D"],
+        )
+        # Hop-count answers are cached separately from weighted ones
+        self.assertEqual(
+            GraphService.find_path(self.node_a, self.node_d, mode="bfs"),
+            ["A", "E", "D"],
+        )
+
+    @override_settings(GRAPH_WEIGHTED_LANDMARKS=0)
+    def test_find_path_weighted_without_landmarks(self):
+        """Test that the weighted mode falls back to plain Dijkstra."""
+        self.assertEqual(
+            GraphService.find_path(self.node_a, self.node_d, mode="weighted"),
+            ["A", "E", "D"],
+        )
+
+    @override_settings(GRAPH_PATH_CACHE=False)
+    def test_find_path_budget_all_modes(self):
+        """Test that every search mode reports a search out of budget."""
+        for mode in SEARCH_MODES:
+            budget = (
+                {"max_visited": 1}
+                if mode == SEARCH_MODES.WEIGHTED
+                else {"max_depth": 1}
+            )
+            with self.subTest(mode=mode.value):
+                with self.assertRaises(SearchTruncated):
+                    GraphService.find_path(
+                        self.node_b, self.node_d, mode=mode.value, **budget
+                    )
+                self.assertEqual(
+                    GraphService.find_path(
+                        self.node_a, self.node_b, mode=mode.value, **budget
+                    ),
+                    ["A", "B"],
+                )
+
+    def test_find_path_cached_path_respects_max_depth(self):
+        """Test that a cached path longer than max_depth is not returned."""
+        with self.assertRaises(SearchTruncated):
+            GraphService.find_path(self.node_b, self.node_d, max_depth=1)
+
+        self.assertEqual(
+            GraphService.find_path(self.node_b, self.node_d), ["B", "C", "D"]
+        )
+
+        with self.assertRaises(SearchTruncated):
+            GraphService.find_path(self.node_b, self.node_d, max_depth=1)
+        self.assertEqual(
+            GraphService.find_path(self.node_b, self.node_d, max_depth=2),
+            ["B", "C", "D"],
+        )
+
+    def test_find_path_truncated_not_cached(self):
+        """Test that a truncated search does not poison the path cache."""
+        with self.assertRaises(SearchTruncated):
+            GraphService.find_path(self.node_b, self.node_d, max_depth=1)
+
+        self.assertEqual(
+            GraphService.find_path(self.node_b, self.node_d), ["B", "C", "D"]
+        )
+
+    def test_find_path_weighted_max_depth(self):
+        """Test that hop limits are rejected by the weighted mode."""
+        with self.assertRaises(ValueError):
+            GraphService.find_path(
+                self.node_a, self.node_d, mode="weighted", max_depth=2
+            )
+
+    def test_find_path_unknown_mode(self):
+        """Test that an unknown search mode is rejected."""
+        with self.assertRaises(ValueError):
+            GraphService.find_path(self.node_a, self.node_b, mode="unknown")
+
+    def test_find_paths(self):
+        """Test finding paths for many pairs, grouped by source."""
+        pairs = [
+            (self.node_a.id, self.node_d.id),
+            (self.node_b.id, self.node_d.id),
+            (self.node_a.id, self.node_c.id),
+            (self.node_a.id, self.node_isolated.id),
+            (self.node_a.id, self.node_a.id),
+        ]
+        self.assertEqual(
+            GraphService.find_paths(pairs),
+            [["A", "E", "D"], ["B", "C", "D"], ["A", "B", "C"], None, ["A"]],
+        )
+
+    def test_get_component(self):
+        """Test that nodes on a cycle share a component."""
+        Connection.objects.create(from_node=self.node_d, to_node=self.node_a)
+
+        component_a = GraphService.get_component(self.node_a)
+        component_c = GraphService.get_component(self.node_c)
+        component_isolated = GraphService.get_component(self.node_isolated)
+
+        self.assertEqual(component_a["component_id"], component_c["component_id"])
+        self.assertEqual(component_a["component_size"], 5)
+        self.assertEqual(component_isolated["component_size"], 1)
+        self.assertEqual(component_a["num_components"], 2)
+
+    def test_find_path_cached(self):
+        """Test that repeated queries are answered from the path cache."""
+        self.assertEqual(
+            GraphService.find_path(self.node_a, self.node_d), ["A", "E", "D"]
+        )
+        self.assertIsNone(GraphService.find_path(self.node_d, self.node_a))
+
+        # Only the graph version is read
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                GraphService.find_path(self.node_a, self.node_d), ["A", "E", "D"]
+            )
+        with self.assertNumQueries(1):
+            self.assertIsNone(GraphService.find_path(self.node_d, self.node_a))
+
+    def test_find_path_cache_invalidated_by_writes(self):
+        """Test that graph writes invalidate cached answers."""
+        self.assertIsNone(GraphService.find_path(self.node_d, self.node_a))
+
+        Connection.objects.create(from_node=self.node_d, to_node=self.node_a)
+        self.assertEqual(GraphService.find_path(self.node_d, self.node_a), ["D", "A"])
+
+        self.node_a.name = "Renamed"
+        self.node_a.save()
+        self.assertEqual(
+            GraphService.find_path(self.node_d, self.node_a), ["D", "Renamed"]
+        )
+
+    @override_settings(GRAPH_PATH_CACHE=False)
+    def test_find_path_cache_disabled(self):
+        """Test that the search runs every time with the cache disabled."""
+        GraphService.find_path(self.node_a, self.node_d)
+
+        with patch("nodes.services.GraphService._search") as search:
+            search.return_value = ["A", "E", "D"]
+            GraphService.find_path(self.node_a, self.node_d)
+
+        search.assert_called_once()
+
+    @patch("nodes.cache.caches")
+    def test_find_path_cache_unavailable(self, mock_caches):
+        """Test that cache errors do not fail the search."""
+        mock_caches.__getitem__.return_value.get.side_effect = ConnectionError
+
+        self.assertEqual(
+            GraphService.find_path(self.node_a, self.node_d), ["A", "E", "D"]
+        )
+
+    def test_find_paths_cached(self):
+        """Test that batch answers are shared with the path cache."""
+        GraphService.find_path(self.node_a, self.node_d)
+
+        with patch("nodes.services.GraphService._search_many") as search_many:
+            search_many.return_value = [["B", "C"]]
+            paths = GraphService.find_paths(
+                [(self.node_a.id, self.node_d.id), (self.node_b.id, self.node_c.id)]
+            )
+
+        self.assertEqual(paths, [["A", "E", "D"], ["B", "C"]])
+        search_many.assert_called_once_with([(self.node_b.id, self.node_c.id)])
+
+    def test_find_nearest_path(self):
+        """Test that the nearest of several sources and targets is found."""
+        self.assertEqual(
+            GraphService.find_nearest_path(
+                [self.node_a.id, self.node_b.id, self.node_isolated.id],
+                [self.node_d.id, self.node_c.id],
+            ),
+            ["B", "C"],
+        )
+        self.assertIsNone(
+            GraphService.find_nearest_path(
+                [self.node_d.id], [self.node_a.id, self.node_isolated.id]
+            )
+        )
+        with self.assertRaises(SearchTruncated):
+            GraphService.find_nearest_path(
+                [self.node_a.id], [self.node_d.id], max_depth=1
+            )
+
+    def test_find_nearest_path_prunes_targets_in_groups(self):
+        """Test that a large target set is pruned with one grouped pass."""
+        # Every target reaches the hub, which makes it a landmark
+        hub = Node.objects.create(name="Hub")
+        targets = [Node.objects.create(name=f"T{i}") for i in range(200)]
+        for target in targets:
+            Connection.objects.create(from_node=target, to_node=hub)
+        Connection.objects.create(from_node=self.node_d, to_node=targets[0])
+        snapshot = get_snapshot()
+        Landmarks.build(snapshot, 4, weighted=False).save(snapshot, "degree")
+
+        with patch.object(
+            Landmarks, "_prune", autospec=True, side_effect=Landmarks._prune
+        ) as prune:
+            path = GraphService.find_nearest_path(
+                [self.node_a.id], [target.id for target in targets]
+            )
+
+        self.assertEqual(path, ["A", "E", "D", "T0"])
+        prune.assert_called_once()
+        self.assertLess(len(prune.call_args.args[1]), len(targets))
+
+    def test_neighborhood_snapshot_matches_database(self):
+        """Test that both neighborhood sources extract the same subgraph."""
+        for direction in ["out", "in", "both"]:
+            for depth in range(4):
+                clear_snapshot()
+                from_database = GraphService.neighborhood(self.node_c, depth, direction)
+                get_snapshot()
+                from_snapshot = GraphService.neighborhood(self.node_c, depth, direction)
+
+                with self.subTest(direction=direction, depth=depth):
+                    self.assertEqual(
+                        sorted(from_snapshot["nodes"]), sorted(from_database["nodes"])
+                    )
+                    self.assertEqual(
+                        sorted(from_snapshot["edges"]), sorted(from_database["edges"])
+                    )
+
+        self.assertEqual(
+            GraphService.neighborhood(self.node_a, 2, "out")["nodes"],
+            [("A", 0), ("B", 1), ("E", 1), ("C", 2), ("D", 2)],
+        )
+
+    def test_neighborhood_limit(self):
+        """Test that the node limit is reported as truncation."""
+        for load_snapshot in [False, True]:
+            clear_snapshot()
+            if load_snapshot:
+                get_snapshot()
+            neighborhood = GraphService.neighborhood(self.node_a, 3, limit=3)
+            with self.subTest(load_snapshot=load_snapshot):
+                self.assertEqual(len(neighborhood["nodes"]), 3)
+                self.assertTrue(neighborhood["truncated"])
+
+    def test_bulk_create_nodes(self):
+        """Test that bulk-created nodes are logged at a single graph version."""
+        holder_snapshot = get_snapshot()
+        version = GraphVersion.current()
+
+        created, existing = GraphService.bulk_create_nodes(["X", "A", "Y", "X"])
+
+        self.assertEqual((created, existing), (["X", "Y"], ["A"]))
+        self.assertEqual(GraphVersion.current(), version + 1)
+        self.assertEqual(GraphChange.objects.filter(version=version + 1).count(), 2)
+        # The held snapshot catches up from the change log
+        snapshot = get_snapshot()
+        self.assertEqual(len(snapshot), len(holder_snapshot) + 2)
+        self.assertIsNotNone(snapshot.intern(Node.objects.get(name="Y").id))
+
+    def test_bulk_create_existing_nodes(self):
+        """Test that creating only existing nodes leaves the version alone."""
+        version = GraphVersion.current()
+
+        self.assertEqual(GraphService.bulk_create_nodes(["A"]), ([], ["A"]))
+        self.assertEqual(GraphVersion.current(), version)
+
+    @override_settings(GRAPH_PATH_CACHE=False)
+    def test_bulk_connect(self):
+        """Test that bulk connections are logged at a single graph version."""
+        get_snapshot()
+        version = GraphVersion.current()
+
+        statuses = GraphService.bulk_connect(
+            [("D", "A", 1.0), ("A", "B", 1.0), ("D", "Isolated", 3.0)]
+        )
+
+        self.assertEqual(
+            statuses, [("created", None), ("exists", None), ("created", None)]
+        )
+        self.assertEqual(GraphVersion.current(), version + 1)
+        self.assertEqual(
+            GraphService.find_path(self.node_d, self.node_b, mode="bfs"),
+            ["D", "A", "B"],
+        )
+        self.assertEqual(
+            GraphService.find_path(self.node_c, self.node_isolated, mode="weighted"),
+            ["C", "D", "Isolated"],
+        )
+
+    def test_create_connection(self):
+        """Test creating a connection with one insert, logged for snapshots."""
+        snapshot = get_snapshot()
+        version = GraphVersion.current()
+
+        connection = GraphService.create_connection("D", "A", 2.0)
+
+        self.assertEqual(
+            Connection.objects.get(pk=connection.id).weight, connection.weight
+        )
+        self.assertEqual(GraphVersion.current(), version + 1)
+        self.assertEqual(
+            GraphChange.objects.get(version=version + 1).kind,
+            GraphChange.Kind.EDGE_CREATED,
+        )
+        self.assertEqual(get_snapshot().num_edges, snapshot.num_edges + 1)
+
+        # Existing connections are reported without writing anything
+        self.assertIsNone(GraphService.create_connection("D", "A"))
+        self.assertEqual(GraphVersion.current(), version + 1)
+
+        with self.assertRaisesMessage(Node.DoesNotExist, "'Missing'"):
+            GraphService.create_connection("A", "Missing")
+        with self.assertRaises(ValidationError):
+            GraphService.create_connection("A", "A")
+
     def test_get_or_create_node_existing(self):
         """Test getting an existing node."""
         node, created = GraphService.get_or_create_node("A")
@@ -0,0 +1,243 @@
+import random
+
+from django.test import TestCase, override_settings
+
+from ..models import Connection, GraphChange, GraphVersion, Node
+from ..snapshot import GraphSnapshot, SnapshotHolder, build_csr
+
+
+class BuildCSRTest(TestCase):
+    """Test cases for the CSR builder."""
+
+    def test_build_csr(self):
+        """Test that neighbors are grouped by source node."""
+        offsets, neighbors, weights = build_csr(3, [2, 0, 0], [1, 1, 2])
+        self.assertEqual(list(offsets), [0, 2, 2, 3])
+        self.assertEqual(sorted(neighbors[0:2]), [1, 2])
+        self.assertEqual(list(neighbors[2:3]), [1])
+        self.assertIsNone(weights)
+
+    def test_build_csr_weights(self):
+        """Test that weights follow their edges."""
+        offsets, neighbors, weights = build_csr(
+            3, [2, 0, 0], [1, 1, 2], [0.5, 1.5, 2.5]
+        )
+        self.assertEqual(
+            sorted(zip(neighbors[0:2], weights[0:2])), [(1, 1.5), (2, 2.5)]
+        )
+        self.assertEqual(list(weights[2:3]), [0.5])
+
+
+class GraphSnapshotTest(TestCase):
+    """Test cases for the in-memory graph snapshot."""
+
+    def setUp(self):
+        """Set up test data: A -> B, A -> C, C -> B."""
+        self.node_a = Node.objects.create(name="A")
+        self.node_b = Node.objects.create(name="B")
+        self.node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_c)
+        Connection.objects.create(from_node=self.node_c, to_node=self.node_b)
+
+    def successor_names(self, snapshot, node):
+        names = {n.id: n.name for n in Node.objects.all()}
+        return sorted(
+            names[snapshot.node_ids[i]]
+            for i in snapshot.successors(snapshot.intern(node.id))
+        )
+
+    def test_build(self):
+        """Test that the snapshot mirrors the database."""
+        snapshot = GraphSnapshot.build()
+
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot.num_edges, 3)
+        self.assertEqual(snapshot.version, GraphVersion.current())
+        self.assertEqual(self.successor_names(snapshot, self.node_a), ["B", "C"])
+        self.assertEqual(self.successor_names(snapshot, self.node_b), [])
+        self.assertEqual(self.successor_names(snapshot, self.node_c), ["B"])
+
+    def test_intern_unknown_node(self):
+        """Test interning a node id that is not in the snapshot."""
+        snapshot = GraphSnapshot.build()
+        self.assertIsNone(snapshot.intern(-1))
+
+    def test_version_bumped_on_writes(self):
+        """Test that node and connection writes bump the graph version."""
+        version = GraphVersion.current()
+
+        node_d = Node.objects.create(name="D")
+        self.assertEqual(GraphVersion.current(), version + 1)
+
+        connection = Connection.objects.create(from_node=self.node_b, to_node=node_d)
+        self.assertEqual(GraphVersion.current(), version + 2)
+
+        connection.delete()
+        self.assertEqual(GraphVersion.current(), version + 3)
+
+    def test_holder_reuses_snapshot(self):
+        """Test that an unchanged graph is served without reloading it."""
+        holder = SnapshotHolder()
+        snapshot = holder.get()
+
+        # Only the version check hits the database
+        with self.assertNumQueries(1):
+            self.assertIs(holder.get(), snapshot)
+
+    def test_holder_rebuilds_on_change(self):
+        """Test that a graph write invalidates the held snapshot."""
+        holder = SnapshotHolder()
+        snapshot = holder.get()
+
+        Node.objects.create(name="D")
+
+        rebuilt = holder.get()
+        self.assertIsNot(rebuilt, snapshot)
+        self.assertEqual(len(rebuilt), 4)
+
+
+class GraphChangeLogTest(TestCase):
+    """Test cases for the graph change log and incremental snapshot updates."""
+
+    def setUp(self):
+        """Set up test data: A -> B -> C."""
+        self.nodes = [Node.objects.create(name=name) for name in "ABC"]
+        Connection.objects.create(from_node=self.nodes[0], to_node=self.nodes[1])
+        Connection.objects.create(from_node=self.nodes[1], to_node=self.nodes[2])
+
+    def assertSameGraph(self, snapshot, expected):
+        """Assert that two snapshots hold the same nodes and weighted edges."""
+
+        def edges(s, offsets, neighbors, weights):
+            return sorted(
+                (s.node_ids[node], s.node_ids[neighbors[i]], weights[i])
+                for node in range(len(s))
+                if s.intern(s.node_ids[node]) is not None
+                for i in range(offsets[node], offsets[node + 1])
+            )
+
+        self.assertEqual(snapshot.version, expected.version)
+        self.assertEqual(
+            sorted(i for i in snapshot.node_ids if snapshot.intern(i) is not None),
+            sorted(expected.node_ids),
+        )
+        for names in [
+            ("offsets", "targets", "weights"),
+            ("in_offsets", "in_sources", "in_weights"),
+        ]:
+            self.assertEqual(
+                edges(snapshot, *(getattr(snapshot, name) for name in names)),
+                edges(expected, *(getattr(expected, name) for name in names)),
+            )
+
+    def test_writes_are_logged(self):
+        """Test that every node and connection write is logged at its version."""
+        GraphChange.objects.all().delete()
+        node_d = Node.objects.create(name="D")
+        connection = Connection.objects.create(
+            from_node=self.nodes[2], to_node=node_d, weight=2.0
+        )
+        connection.weight = 3.0
+        connection.save()
+        node_d_id, node_c_id = node_d.pk, self.nodes[2].pk
+        node_d.delete()
+
+        version = GraphVersion.current()
+        self.assertEqual(
+            list(
+                GraphChange.objects.values_list(
+                    "version", "kind", "node_id", "from_node_id", "to_node_id", "weight"
+                )
+            ),
+            [
+                (version - 4, "node_created", node_d_id, None, None, None),
+                (version - 3, "edge_created", None, node_c_id, node_d_id, 2.0),
+                (version - 2, "edge_updated", None, node_c_id, node_d_id, 3.0),
+                (version - 1, "edge_deleted", None, node_c_id, node_d_id, None),
+                (version, "node_deleted", node_d_id, None, None, None),
+            ],
+        )
+
+    def test_holder_applies_new_changes(self):
+        """Test that the holder catches up without reloading the graph."""
+        holder = SnapshotHolder()
+        snapshot = holder.get()
+
+        node_d = Node.objects.create(name="D")
+        Connection.objects.create(from_node=self.nodes[2], to_node=node_d)
+        Connection.objects.get(from_node=self.nodes[0]).delete()
+
+        # The version check and the change log, but no graph scan
+        with self.assertNumQueries(2):
+            updated = holder.get()
+
+        self.assertIsNot(updated, snapshot)
+        self.assertSameGraph(updated, GraphSnapshot.build())
+        # The previous snapshot is left untouched for its readers
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot.num_edges, 2)
+
+    def test_moved_connection(self):
+        """Test that changing the endpoints of a connection moves it."""
+        holder = SnapshotHolder()
+        holder.get()
+
+        connection = Connection.objects.get(from_node=self.nodes[0])
+        connection.to_node = self.nodes[2]
+        connection.save()
+
+        self.assertSameGraph(holder.get(), GraphSnapshot.build())
+
+    def test_random_changes_match_rebuild(self):
+        """Test that replaying random writes gives the rebuilt graph."""
+        rng = random.Random(0)
+        nodes = list(self.nodes)
+        holder = SnapshotHolder()
+        holder.get()
+
+        for step in range(60):
+            action = rng.random()
+            if action < 0.2:
+                nodes.append(Node.objects.create(name=f"N{step}"))
+            elif action < 0.3 and len(nodes) > 2:
+                nodes.pop(rng.randrange(len(nodes))).delete()
+            elif action < 0.8:
+                from_node, to_node = rng.sample(nodes, 2)
+                Connection.objects.get_or_create(
+                    from_node=from_node,
+                    to_node=to_node,
+                    defaults={"weight": rng.random()},
+                )
+            else:
+                connection = Connection.objects.order_by("?").first()
+                if connection is not None:
+                    connection.delete()
+
+            if step % 7 == 0:
+                with self.subTest(step=step):
+                    self.assertSameGraph(holder.get(), GraphSnapshot.build())
+
+        self.assertSameGraph(holder.get(), GraphSnapshot.build())
+
+    def test_holder_reloads_when_log_is_missing(self):
+        """Test that a gap in the change log forces a full reload."""
+        holder = SnapshotHolder()
+        holder.get()
+
+        Node.objects.create(name="D")
+        GraphChange.objects.all().delete()
+
+        self.assertSameGraph(holder.get(), GraphSnapshot.build())
+
+    @override_settings(GRAPH_SNAPSHOT_MAX_CHANGES=1)
+    def test_holder_reloads_after_too_many_changes(self):
+        """Test that a large change log is not replayed."""
+        holder = SnapshotHolder()
+        holder.get()
+
+        Node.objects.create(name="D")
+        Node.objects.create(name="E")
+
+        with self.assertNumQueries(4):  # Version, change log, nodes, connections
+            self.assertEqual(len(holder.get()), 5)
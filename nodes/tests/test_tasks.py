@@ -1,9 +1,10 @@
 from unittest.mock import patch, MagicMock
 
-from django.test import TestCase
+from django.conf import settings
+from django.test import TestCase, override_settings
 
-from ..models import Node
-from ..tasks import slow_find_path_task
+from ..models import GraphChange, GraphVersion, Node
+from ..tasks import prune_graph_changes_task, slow_find_path_task
 
 
 class TasksTest(TestCase):
@@ -28,6 +29,20 @@ class TasksTest(TestCase):
         mock_sleep.assert_called_once_with(5)
         self.assertIsNotNone(result.result)
 
+    @patch("nodes.tasks.time.sleep")
+    @patch("nodes.tasks.GraphService.find_path")
+    def test_slow_find_path_task_budgets(self, mock_find_path, mock_sleep):
+        """Test that the search budgets are passed on to find_path."""
+        mock_find_path.return_value = ["A", "B"]
+
+        slow_find_path_task.apply(
+            args=["A", "B"], kwargs={"max_depth": 2, "max_visited": 10}
+        )
+
+        mock_find_path.assert_called_once_with(
+            self.node_a, self.node_b, mode=None, max_depth=2, max_visited=10
+        )
+
     @patch("nodes.tasks.time.sleep")
     def test_slow_find_path_task_node_not_found(self, mock_sleep):
         """Test slow_find_path_task when node doesn't exist."""
@@ -37,3 +52,19 @@ class TasksTest(TestCase):
         self.assertEqual(result.info.get("status"), "FAILURE")
         self.assertIn("Node not found", result.info["message"])
         mock_sleep.assert_called_once_with(5)
+
+    @override_settings(GRAPH_CHANGE_LOG_RETENTION=1)
+    def test_prune_graph_changes_task(self):
+        """Test that only the most recent change log entries are kept."""
+        Node.objects.create(name="C")
+
+        self.assertEqual(prune_graph_changes_task.apply().result, 2)
+        self.assertEqual(
+            list(GraphChange.objects.values_list("version", flat=True)),
+            [GraphVersion.current()],
+        )
+
+    def test_prune_graph_changes_is_scheduled(self):
+        """Test that Celery beat schedules the registered prune task."""
+        tasks = [entry["task"] for entry in settings.CELERY_BEAT_SCHEDULE.values()]
+        self.assertIn(prune_graph_changes_task.name, tasks)
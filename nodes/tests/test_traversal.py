@@ -0,0 +1,291 @@
+import math
+import random
+from collections import deque
+
+from django.test import SimpleTestCase
+
+from ..landmarks import Landmarks
+from ..snapshot import GraphSnapshot
+from ..traversal import (
+    SearchTruncated,
+    bfs,
+    bfs_many,
+    bfs_order,
+    bidirectional_bfs,
+    dijkstra,
+    direction_optimizing_bfs,
+    multi_source_bfs,
+)
+
+SEARCHES = [bfs, bidirectional_bfs, direction_optimizing_bfs]
+
+
+def random_snapshot(num_nodes, num_edges, seed, weighted=False):
+    """Build an in-memory snapshot of a random directed graph."""
+    rng = random.Random(seed)
+    edges = set()
+    while len(edges) < num_edges:
+        source, target = rng.randrange(num_nodes), rng.randrange(num_nodes)
+        if source != target:
+            edges.add((source, target))
+    sources, targets = zip(*edges) if edges else ((), ())
+    weights = [rng.randint(0, 9) for _ in edges] if weighted else None
+    return GraphSnapshot(0, list(range(num_nodes)), sources, targets, weights)
+
+
+def distances_from(snapshot, source):
+    """Reference hop distances computed with a plain BFS."""
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in snapshot.successors(node):
+            if neighbor not in distances:
+                distances[neighbor] = distances[node] + 1
+                queue.append(neighbor)
+    return distances
+
+
+def weighted_distances_from(snapshot, source):
+    """Reference weighted distances computed with Bellman-Ford."""
+    distances = {source: 0.0}
+    for _ in range(len(snapshot)):
+        for node in list(distances):
+            for neighbor, weight in zip(
+                snapshot.successors(node), snapshot.successor_weights(node)
+            ):
+                if distances[node] + weight < distances.get(neighbor, math.inf):
+                    distances[neighbor] = distances[node] + weight
+    return distances
+
+
+class TraversalTest(SimpleTestCase):
+    """Test cases for the snapshot traversals."""
+
+    def assertShortestPath(self, snapshot, path, source, target, distance):
+        self.assertEqual(path[0], source)
+        self.assertEqual(path[-1], target)
+        self.assertEqual(len(path) - 1, distance)
+        for current, following in zip(path, path[1:]):
+            self.assertIn(following, snapshot.successors(current))
+
+    def test_same_node(self):
+        """Test that a node has a path to itself."""
+        snapshot = random_snapshot(5, 0, seed=0)
+        for search in SEARCHES:
+            with self.subTest(search=search.__name__):
+                self.assertEqual(search(snapshot, 3, 3), [3])
+
+    def test_no_path(self):
+        """Test that disconnected nodes have no path."""
+        snapshot = GraphSnapshot(0, [0, 1, 2], [0], [1])
+        for search in SEARCHES:
+            with self.subTest(search=search.__name__):
+                self.assertIsNone(search(snapshot, 1, 0))
+                self.assertIsNone(search(snapshot, 0, 2))
+
+    def test_bidirectional_picks_shortest_meeting(self):
+        """Test that the shortest of several meeting points is returned."""
+        # 0 -> 1 -> 2 -> 3 -> 4 -> 5 and the shortcut 0 -> 6 -> 5
+        snapshot = GraphSnapshot(
+            0, list(range(7)), [0, 1, 2, 3, 4, 0, 6], [1, 2, 3, 4, 5, 6, 5]
+        )
+        self.assertEqual(bidirectional_bfs(snapshot, 0, 5), [0, 6, 5])
+
+    def test_random_graphs_agree(self):
+        """Test that every search finds a shortest path on random graphs."""
+        for seed in range(20):
+            snapshot = random_snapshot(40, 70, seed=seed)
+            rng = random.Random(seed)
+            for _ in range(10):
+                source, target = rng.randrange(40), rng.randrange(40)
+                distance = distances_from(snapshot, source).get(target)
+                for search in SEARCHES:
+                    with self.subTest(seed=seed, search=search.__name__):
+                        path = search(snapshot, source, target)
+                        if distance is None:
+                            self.assertIsNone(path)
+                        else:
+                            self.assertShortestPath(
+                                snapshot, path, source, target, distance
+                            )
+
+    def test_bfs_many(self):
+        """Test that one traversal answers every target of a source."""
+        for seed in range(5):
+            snapshot = random_snapshot(40, 70, seed=seed)
+            distances = distances_from(snapshot, 0)
+            targets = set(range(0, 40, 3))
+
+            paths = bfs_many(snapshot, 0, targets)
+
+            self.assertEqual(set(paths), targets & set(distances))
+            for target, path in paths.items():
+                self.assertShortestPath(snapshot, path, 0, target, distances[target])
+
+    def test_multi_source_bfs(self):
+        """Test that the path found joins the nearest source and target."""
+        for seed in range(10):
+            snapshot = random_snapshot(40, 60, seed=seed)
+            rng = random.Random(seed)
+            sources, targets = rng.sample(range(40), 3), set(rng.sample(range(40), 4))
+            nearest = min(
+                (
+                    (distance, source)
+                    for source in sources
+                    for target, distance in distances_from(snapshot, source).items()
+                    if target in targets
+                ),
+                default=None,
+            )
+
+            path = multi_source_bfs(snapshot, sources, targets)
+
+            with self.subTest(seed=seed):
+                if nearest is None:
+                    self.assertIsNone(path)
+                    continue
+                self.assertIn(path[0], sources)
+                self.assertIn(path[-1], targets)
+                self.assertShortestPath(
+                    snapshot,
+                    path,
+                    path[0],
+                    path[-1],
+                    distances_from(snapshot, path[0])[path[-1]],
+                )
+                self.assertEqual(len(path) - 1, nearest[0])
+
+    def test_multi_source_bfs_budget(self):
+        """Test that set-to-set searches honor the search budget."""
+        # 0 -> 1 -> 2 -> 3
+        snapshot = GraphSnapshot(0, list(range(4)), [0, 1, 2], [1, 2, 3])
+
+        self.assertEqual(multi_source_bfs(snapshot, [0, 2], {3}, max_depth=1), [2, 3])
+        with self.assertRaises(SearchTruncated):
+            multi_source_bfs(snapshot, [0], {3}, max_depth=2)
+        self.assertEqual(multi_source_bfs(snapshot, [1, 3], {3, 0}), [3])
+
+    def test_bfs_order(self):
+        """Test that every reachable node is yielded once with its distance."""
+        for seed in range(5):
+            snapshot = random_snapshot(40, 70, seed=seed)
+            distances = distances_from(snapshot, 0)
+
+            visited = list(bfs_order(snapshot, 0))
+
+            self.assertEqual(dict(visited), distances)
+            self.assertEqual(len(visited), len(distances))
+            self.assertEqual([d for _, d in visited], sorted(d for _, d in visited))
+
+    def test_bfs_order_max_depth(self):
+        """Test that nodes beyond max_depth are not yielded."""
+        snapshot = random_snapshot(40, 70, seed=0)
+        distances = distances_from(snapshot, 0)
+
+        visited = dict(bfs_order(snapshot, 0, max_depth=2))
+
+        self.assertEqual(visited, {n: d for n, d in distances.items() if d <= 2})
+
+    def test_direction_optimizing_goes_bottom_up_at_hubs(self):
+        """Test that a hub's huge frontier is expanded bottom-up."""
+        # 0 -> hub 1 -> 2..201, each of which links back into 2..201; 202 is
+        # only reachable from 201
+        sources, targets = [0], [1]
+        for node in range(2, 202):
+            sources += [1, node, node]
+            targets += [node, 2 + (node + 1) % 200, 2 + (node + 2) % 200]
+        sources.append(201)
+        targets.append(202)
+        snapshot = GraphSnapshot(0, list(range(203)), sources, targets)
+
+        stats = {}
+        path = direction_optimizing_bfs(snapshot, 0, 202, stats=stats)
+
+        self.assertEqual(path, [0, 1, 201, 202])
+        self.assertGreater(stats["bottom_up_levels"], 0)
+        self.assertLess(stats["edges_inspected"], snapshot.num_edges)
+
+    def test_max_depth(self):
+        """Test that a search cut off by max_depth is told apart from no path."""
+        # 0 -> 1 -> 2 -> 3 -> 4, and the dead end 5 -> 6
+        snapshot = GraphSnapshot(0, list(range(7)), [0, 1, 2, 3, 5], [1, 2, 3, 4, 6])
+        for search in SEARCHES:
+            with self.subTest(search=search.__name__):
+                self.assertEqual(search(snapshot, 0, 4, max_depth=4), [0, 1, 2, 3, 4])
+                with self.assertRaises(SearchTruncated):
+                    search(snapshot, 0, 4, max_depth=3)
+                # Everything reachable is within the budget, so "no path" holds
+                self.assertIsNone(search(snapshot, 5, 0, max_depth=3))
+
+    def test_max_visited(self):
+        """Test that a search cut off by max_visited is told apart from no path."""
+        snapshot = GraphSnapshot(0, list(range(7)), [0, 1, 2, 3, 5], [1, 2, 3, 4, 6])
+        for search in SEARCHES + [dijkstra]:
+            with self.subTest(search=search.__name__):
+                self.assertEqual(search(snapshot, 0, 4, max_visited=5), [0, 1, 2, 3, 4])
+                with self.assertRaises(SearchTruncated):
+                    search(snapshot, 0, 4, max_visited=2)
+                # The bidirectional search also counts the target side
+                self.assertIsNone(search(snapshot, 5, 0, max_visited=3))
+
+    def test_dijkstra_prefers_lighter_path(self):
+        """Test that the minimum-weight path wins over the fewest hops."""
+        # 0 -> 1 (10) and the lighter detour 0 -> 2 -> 3 -> 1 (1 + 1 + 1)
+        snapshot = GraphSnapshot(
+            0, [0, 1, 2, 3], [0, 0, 2, 3], [1, 2, 3, 1], [10.0, 1.0, 1.0, 1.0]
+        )
+        self.assertEqual(dijkstra(snapshot, 0, 1), [0, 2, 3, 1])
+        self.assertEqual(bfs(snapshot, 0, 1), [0, 1])
+        self.assertIsNone(dijkstra(snapshot, 1, 0))
+
+    def test_dijkstra_and_astar_random_graphs(self):
+        """Test that Dijkstra and landmark A* find minimum-weight paths."""
+        for seed in range(10):
+            snapshot = random_snapshot(40, 80, seed=seed, weighted=True)
+            landmarks = Landmarks.build(snapshot, 3, weighted=True)
+            rng = random.Random(seed)
+            for _ in range(10):
+                source, target = rng.randrange(40), rng.randrange(40)
+                distance = weighted_distances_from(snapshot, source).get(target)
+                searches = {
+                    "dijkstra": dijkstra(snapshot, source, target),
+                    "astar": dijkstra(
+                        snapshot,
+                        source,
+                        target,
+                        lambda node, landmarks=landmarks, target=target: (
+                            landmarks.lower_bound(node, target)
+                        ),
+                    ),
+                }
+                for name, path in searches.items():
+                    with self.subTest(seed=seed, search=name):
+                        if distance is None:
+                            self.assertIsNone(path)
+                            continue
+                        self.assertEqual(path[0], source)
+                        self.assertEqual(path[-1], target)
+                        weight = 0.0
+                        for current, following in zip(path, path[1:]):
+                            successors = list(snapshot.successors(current))
+                            weight += snapshot.successor_weights(current)[
+                                successors.index(following)
+                            ]
+                        self.assertEqual(weight, distance)
+
+    def test_landmark_bounds(self):
+        """Test that landmark bounds never overestimate the distance."""
+        for weighted in (False, True):
+            snapshot = random_snapshot(30, 45, seed=1, weighted=weighted)
+            landmarks = Landmarks.build(snapshot, 4, weighted=weighted)
+            for source in range(30):
+                if weighted:
+                    distances = weighted_distances_from(snapshot, source)
+                else:
+                    distances = distances_from(snapshot, source)
+                for target in range(30):
+                    with self.subTest(weighted=weighted, pair=(source, target)):
+                        bound = landmarks.lower_bound(source, target)
+                        if target in distances:
+                            self.assertLessEqual(bound, distances[target])
@@ -0,0 +1,84 @@
+import random
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..models import Connection, Node
+from ..services import GraphService
+from ..snapshot import GraphSnapshot
+from ..traversal import SearchTruncated
+from ..traversal import bfs as python_bfs
+from ..vectorized import bfs, csr_arrays
+from .test_traversal import distances_from, random_snapshot
+
+
+class VectorizedBFSTest(SimpleTestCase):
+    """Test cases for the NumPy BFS engine."""
+
+    def test_csr_arrays_share_snapshot_buffers(self):
+        """Test that the NumPy arrays are views over the snapshot arrays."""
+        snapshot = random_snapshot(20, 30, seed=0)
+
+        indptr, indices = csr_arrays(snapshot)
+
+        self.assertEqual(indptr.tolist(), list(snapshot.offsets))
+        self.assertEqual(indices.tolist(), list(snapshot.targets))
+        self.assertIs(csr_arrays(snapshot)[0], indptr)
+
+    def test_random_graphs_match_python_bfs(self):
+        """Test that both engines find paths of the same length."""
+        for seed in range(20):
+            snapshot = random_snapshot(60, 120, seed=seed)
+            rng = random.Random(seed)
+            for _ in range(10):
+                source, target = rng.randrange(60), rng.randrange(60)
+                expected = python_bfs(snapshot, source, target)
+                with self.subTest(seed=seed, pair=(source, target)):
+                    path = bfs(snapshot, source, target)
+                    if expected is None:
+                        self.assertIsNone(path)
+                        continue
+                    self.assertEqual(len(path), len(expected))
+                    self.assertEqual(path[0], source)
+                    self.assertEqual(path[-1], target)
+                    for current, following in zip(path, path[1:]):
+                        self.assertIn(following, snapshot.successors(current))
+
+    def test_every_reachable_node(self):
+        """Test that every reachable node is found at its BFS distance."""
+        snapshot = random_snapshot(50, 80, seed=3)
+        distances = distances_from(snapshot, 0)
+        for target in range(50):
+            path = bfs(snapshot, 0, target)
+            if target in distances:
+                self.assertEqual(len(path) - 1, distances[target])
+            else:
+                self.assertIsNone(path)
+
+    def test_budget(self):
+        """Test that a search out of budget is told apart from no path."""
+        # 0 -> 1 -> 2 -> 3 -> 4, and the dead end 5 -> 6
+        snapshot = GraphSnapshot(0, list(range(7)), [0, 1, 2, 3, 5], [1, 2, 3, 4, 6])
+
+        self.assertEqual(bfs(snapshot, 0, 4, max_depth=4), [0, 1, 2, 3, 4])
+        with self.assertRaises(SearchTruncated):
+            bfs(snapshot, 0, 4, max_depth=3)
+        with self.assertRaises(SearchTruncated):
+            bfs(snapshot, 0, 4, max_visited=3)
+        self.assertIsNone(bfs(snapshot, 5, 0, max_depth=1))
+
+
+@override_settings(GRAPH_BFS_ENGINE="numpy", GRAPH_PATH_CACHE=False)
+class VectorizedEngineServiceTest(TestCase):
+    """Test cases for selecting the NumPy engine in the GraphService."""
+
+    def test_find_path(self):
+        """Test that the "bfs" mode returns node names from the NumPy engine."""
+        nodes = [Node.objects.create(name=name) for name in "ABCD"]
+        for from_node, to_node in zip(nodes, nodes[1:]):
+            Connection.objects.create(from_node=from_node, to_node=to_node)
+
+        self.assertEqual(
+            GraphService.find_path(nodes[0], nodes[3], mode="bfs"),
+            ["A", "B", "C", "D"],
+        )
+        self.assertIsNone(GraphService.find_path(nodes[3], nodes[0], mode="bfs"))
@@ -1,13 +1,17 @@
+import json
 import os
+import tempfile
 from unittest.mock import MagicMock, patch
 
 import pytest
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from ..mapped import MappedGraphSnapshot
 from ..models import Connection, Node
+from ..snapshot import get_snapshot
 
 
 class NodesAPITest(APITestCase):
@@ -57,6 +61,31 @@ class NodesAPITest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_bulk_create_nodes(self):
+        """Test creating many nodes and reporting the existing ones."""
+        url = reverse("nodes:bulk_create_nodes")
+        data = {"names": ["C", "A", "D", "C", "E"]}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], ["C", "D", "E"])
+        self.assertEqual(response.data["existing"], ["A"])
+        self.assertEqual(Node.objects.count(), 5)
+
+        response = self.client.post(url, {"names": ["D", "E"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["existing_count"], 2)
+
+    def test_bulk_create_nodes_invalid(self):
+        """Test rejecting empty and oversized name lists."""
+        url = reverse("nodes:bulk_create_nodes")
+        for data in [{"names": []}, {"names": ["x" * 256]}, {}]:
+            with self.subTest(data=data):
+                response = self.client.post(url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_connect_nodes_success(self):
         """Test connecting nodes successfully."""
         url = reverse("nodes:connect_nodes")
@@ -72,6 +101,86 @@ class NodesAPITest(APITestCase):
             ).exists()
         )
 
+    def test_connect_nodes_weight(self):
+        """Test connecting nodes with a weight, and rejecting negative ones."""
+        url = reverse("nodes:connect_nodes")
+
+        response = self.client.post(
+            url, {"from_node": "A", "to_node": "B", "weight": -1}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("weight", response.data)
+
+        for weight in ["nan", "inf", "-inf"]:
+            with self.subTest(weight=weight):
+                response = self.client.post(
+                    url,
+                    {"from_node": "A", "to_node": "B", "weight": weight},
+                    format="json",
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("weight", response.data)
+
+        response = self.client.post(
+            url, {"from_node": "A", "to_node": "B", "weight": 2.5}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["weight"], 2.5)
+        self.assertEqual(Connection.objects.get(from_node=self.node_a).weight, 2.5)
+
+    def test_bulk_connect_nodes(self):
+        """Test connecting many pairs with a status per pair."""
+        Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+
+        url = reverse("nodes:bulk_connect_nodes")
+        data = {
+            "connections": [
+                {"from_node": "B", "to_node": "C", "weight": 2.5},
+                {"from_node": "A", "to_node": "B"},
+                {"from_node": "A", "to_node": "Missing"},
+                {"from_node": "C", "to_node": "C"},
+                {"from_node": "B", "to_node": "C"},
+            ]
+        }
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created", "exists", "invalid", "invalid", "exists"],
+        )
+        self.assertIn("does not exist", response.data["results"][2]["error"])
+        self.assertIn("itself", response.data["results"][3]["error"])
+        self.assertEqual(response.data["created_count"], 1)
+        self.assertEqual(Connection.objects.get(to_node__name="C").weight, 2.5)
+
+    def test_bulk_connect_nodes_invalid(self):
+        """Test rejecting empty lists and negative weights."""
+        url = reverse("nodes:bulk_connect_nodes")
+        for data in [
+            {"connections": []},
+            {"connections": [{"from_node": "A", "to_node": "B", "weight": -1}]},
+            {"connections": [{"from_node": "A", "to_node": "B", "weight": "nan"}]},
+            {"connections": [{"from_node": "A", "to_node": "B", "weight": "inf"}]},
+        ]:
+            with self.subTest(data=data):
+                response = self.client.post(url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_connect_nodes_existing(self):
+        """Test that connecting an already connected pair is a conflict."""
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        url = reverse("nodes:connect_nodes")
+        data = {"from_node": "A", "to_node": "B"}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("already exists", response.data["error"])
+        self.assertEqual(Connection.objects.count(), 1)
+
     def test_connect_nodes_nonexistent_node(self):
         """Test connecting nodes when one doesn't exist."""
         url = reverse("nodes:connect_nodes")
@@ -104,6 +213,75 @@ class NodesAPITest(APITestCase):
         self.assertEqual(response.data["path"], ["A", "B"])
         self.assertTrue(response.data["path_exists"])
 
+    def test_find_path_with_mode(self):
+        """Test finding a path with an explicit search mode."""
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+
+        url = reverse("nodes:find_path")
+        data = {"from_node": "A", "to_node": "B", "mode": "bfs"}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["path"], ["A", "B"])
+
+    def test_find_path_invalid_mode(self):
+        """Test finding a path with an unknown search mode."""
+        url = reverse("nodes:find_path")
+        data = {"from_node": "A", "to_node": "B", "mode": "unknown"}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("mode", response.data)
+
+    def test_find_path_truncated(self):
+        """Test that a search out of budget is reported as truncated."""
+        node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+
+        url = reverse("nodes:find_path")
+        data = {"from_node": "A", "to_node": "C", "max_depth": 1}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["path"])
+        self.assertIsNone(response.data["path_exists"])
+        self.assertTrue(response.data["truncated"])
+
+        data["max_depth"] = 2
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.data["path"], ["A", "B", "C"])
+        self.assertFalse(response.data["truncated"])
+
+    @override_settings(GRAPH_FIND_PATH_MAX_DEPTH=1)
+    def test_find_path_budget_ceiling(self):
+        """Test that budgets are capped at the configured ceiling."""
+        node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+
+        url = reverse("nodes:find_path")
+        data = {"from_node": "A", "to_node": "C", "max_depth": 5}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertTrue(response.data["truncated"])
+
+    def test_find_path_invalid_budget(self):
+        """Test rejecting invalid budgets and hop limits on weighted searches."""
+        url = reverse("nodes:find_path")
+        for data in [
+            {"from_node": "A", "to_node": "B", "max_visited": 0},
+            {"from_node": "A", "to_node": "B", "mode": "weighted", "max_depth": 2},
+        ]:
+            with self.subTest(data=data):
+                response = self.client.post(url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_find_path_no_connection(self):
         """Test finding a path when no connection exists."""
         url = reverse("nodes:find_path")
@@ -115,6 +293,185 @@ class NodesAPITest(APITestCase):
         self.assertIsNone(response.data["path"])
         self.assertFalse(response.data["path_exists"])
 
+    def test_find_path_batch(self):
+        """Test finding paths for many pairs in one request."""
+        node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+
+        url = reverse("nodes:find_path_batch")
+        data = {
+            "pairs": [
+                {"from_node": "A", "to_node": "C"},
+                {"from_node": "C", "to_node": "A"},
+                {"from_node": "A", "to_node": "Missing"},
+                {"from_node": "A", "to_node": "B"},
+            ]
+        }
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 4)
+        results = response.data["results"]
+        self.assertEqual(results[0]["path"], ["A", "B", "C"])
+        self.assertFalse(results[1]["path_exists"])
+        self.assertIn("does not exist", results[2]["error"])
+        self.assertEqual(results[3]["path"], ["A", "B"])
+
+    def test_find_path_batch_empty(self):
+        """Test that an empty batch is rejected."""
+        url = reverse("nodes:find_path_batch")
+
+        response = self.client.post(url, {"pairs": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_find_nearest_path(self):
+        """Test finding the shortest path between two sets of nodes."""
+        node_c = Node.objects.create(name="C")
+        Node.objects.create(name="D")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+
+        url = reverse("nodes:find_nearest_path")
+        data = {"from_nodes": ["A", "D"], "to_nodes": ["C", "B"]}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["path"], ["A", "B"])
+        self.assertEqual(response.data["from_node"], "A")
+        self.assertEqual(response.data["to_node"], "B")
+        self.assertTrue(response.data["path_exists"])
+
+        data = {"from_nodes": ["C"], "to_nodes": ["A", "D"]}
+        response = self.client.post(url, data, format="json")
+
+        self.assertFalse(response.data["path_exists"])
+        self.assertFalse(response.data["truncated"])
+
+    def test_find_nearest_path_invalid(self):
+        """Test rejecting empty sets and unknown node names."""
+        url = reverse("nodes:find_nearest_path")
+        for data in [
+            {"from_nodes": [], "to_nodes": ["B"]},
+            {"from_nodes": ["A"], "to_nodes": ["B", "Missing"]},
+        ]:
+            with self.subTest(data=data):
+                response = self.client.post(url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_node_component(self):
+        """Test getting the strongly connected component of a node."""
+        node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=self.node_a)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+
+        url = reverse("nodes:node_component", kwargs={"name": "A"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["node"], "A")
+        self.assertEqual(response.data["component_size"], 2)
+        self.assertEqual(response.data["num_components"], 2)
+        self.assertEqual(response.data["largest_component_sizes"], [2, 1])
+
+    def test_node_component_not_found(self):
+        """Test getting the component of a missing node."""
+        url = reverse("nodes:node_component", kwargs={"name": "Missing"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_node_neighborhood(self):
+        """Test extracting the subgraph around a node."""
+        node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+        Connection.objects.create(from_node=node_c, to_node=self.node_a, weight=2.0)
+
+        url = reverse("nodes:node_neighborhood", kwargs={"name": "A"})
+        response = self.client.get(url, {"depth": 1, "direction": "both"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["nodes"],
+            [
+                {"name": "A", "distance": 0},
+                {"name": "B", "distance": 1},
+                {"name": "C", "distance": 1},
+            ],
+        )
+        self.assertEqual(len(response.data["edges"]), 3)
+        self.assertFalse(response.data["truncated"])
+
+        response = self.client.get(url, {"depth": 2, "limit": 2})
+
+        self.assertEqual([node["name"] for node in response.data["nodes"]], ["A", "B"])
+        self.assertEqual(
+            response.data["edges"], [{"from_node": "A", "to_node": "B", "weight": 1.0}]
+        )
+        self.assertTrue(response.data["truncated"])
+
+    def test_node_neighborhood_invalid(self):
+        """Test the neighborhood of a missing node and invalid parameters."""
+        url = reverse("nodes:node_neighborhood", kwargs={"name": "Missing"})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        url = reverse("nodes:node_neighborhood", kwargs={"name": "A"})
+        for params in [{"direction": "sideways"}, {"depth": -1}, {"limit": 0}]:
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reachable_nodes(self):
+        """Test streaming the nodes reachable from a node."""
+        node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+
+        url = reverse("nodes:reachable_nodes", kwargs={"name": "A"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [
+                {"node": "A", "distance": 0},
+                {"node": "B", "distance": 1},
+                {"node": "C", "distance": 2},
+            ],
+        )
+
+    def test_reachable_nodes_max_depth(self):
+        """Test capping the reachability stream at max_depth."""
+        node_c = Node.objects.create(name="C")
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        Connection.objects.create(from_node=self.node_b, to_node=node_c)
+
+        url = reverse("nodes:reachable_nodes", kwargs={"name": "A"})
+        response = self.client.get(url, {"max_depth": 1})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["node"] for line in lines], ["A", "B"])
+
+    def test_reachable_nodes_not_found(self):
+        """Test the reachability stream for a missing node."""
+        url = reverse("nodes:reachable_nodes", kwargs={"name": "Missing"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reachable_nodes_invalid_depth(self):
+        """Test the reachability stream with a negative max_depth."""
+        url = reverse("nodes:reachable_nodes", kwargs={"name": "A"})
+        response = self.client.get(url, {"max_depth": -1})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_list_nodes(self):
         """Test listing all nodes."""
         url = reverse("nodes:list_nodes")
@@ -125,6 +482,51 @@ class NodesAPITest(APITestCase):
         self.assertEqual(response.data["count"], 2)
         self.assertEqual(len(response.data["nodes"]), 2)
 
+    def test_export_graph(self):
+        """Test streaming the connections and nodes as CSV and NDJSON."""
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b, weight=2)
+        url = reverse("nodes:export_graph")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="edges.csv"', response["Content-Disposition"])
+        self.assertEqual(
+            b"".join(response.streaming_content).decode(),
+            "from_node,to_node,weight\nA,B,2.0\n",
+        )
+
+        response = self.client.get(url, {"kind": "nodes", "output": "ndjson"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(sorted(json.loads(line)["name"] for line in lines), ["A", "B"])
+
+    def test_export_graph_csr(self):
+        """Test streaming the binary CSR file of the graph."""
+        Connection.objects.create(from_node=self.node_a, to_node=self.node_b)
+        get_snapshot()
+        # Replaying a deletion leaves the node in the held snapshot
+        Node.objects.create(name="C").delete()
+        url = reverse("nodes:export_graph")
+
+        response = self.client.get(url, {"output": "csr"})
+
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.csr")
+            with open(path, "wb") as f:
+                f.write(b"".join(response.streaming_content))
+            snapshot = MappedGraphSnapshot(path)
+            self.assertEqual(len(snapshot), 2)
+            self.assertEqual(snapshot.num_edges, 1)
+            del snapshot
+
+    def test_export_graph_invalid_output(self):
+        """Test the graph export with an unknown file format."""
+        url = reverse("nodes:export_graph")
+        response = self.client.get(url, {"output": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     @patch("nodes.views.slow_find_path_task.delay")
     def test_slow_find_path_success(self, mock_delay):
         """Test async task initiation for finding path."""
@@ -141,7 +543,24 @@ class NodesAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(response.data["task_id"], "test-task-id")
         self.assertEqual(response.data["status"], "PENDING")
-        mock_delay.assert_called_once_with("A", "B")
+        mock_delay.assert_called_once_with(
+            "A", "B", mode=None, max_depth=None, max_visited=None
+        )
+
+    @patch("nodes.views.slow_find_path_task.delay")
+    def test_slow_find_path_budgets(self, mock_delay):
+        """Test that the search budgets are passed on to the task."""
+        mock_delay.return_value = MagicMock(id="test-task-id", state="PENDING")
+
+        url = reverse("nodes:slow_find_path")
+        data = {"from_node": "A", "to_node": "B", "max_depth": 2, "max_visited": 10}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        mock_delay.assert_called_once_with(
+            "A", "B", mode=None, max_depth=2, max_visited=10
+        )
 
     @patch("nodes.views.AsyncResult")
     def test_get_slow_path_result_pending(self, mock_async_result_class):
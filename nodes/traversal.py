@@ -0,0 +1,686 @@
+import heapq
+import math
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .snapshot import GraphSnapshot
+
+# Hop distance of unreachable nodes in integer distance arrays
+UNREACHABLE_HOPS = 2**31 - 1
+
+# Switching thresholds of the direction-optimizing BFS (Beamer et al.): go
+# bottom-up once the frontier's outgoing connections exceed 1/ALPHA of the
+# unvisited nodes' incoming connections, back top-down once the frontier
+# holds fewer than 1/BETA of all nodes
+DIRECTION_ALPHA = 14
+DIRECTION_BETA = 24
+
+
+class SearchTruncated(Exception):
+    """Raised when a search runs out of budget before it can answer."""
+
+
+def bfs(
+    snapshot: GraphSnapshot,
+    source: int,
+    target: int,
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
+    parents: Optional[array] = None,
+) -> Optional[List[int]]:
+    """
+    Find a shortest path with a one-sided BFS from the source.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        source: Interned index of the starting node
+        target: Interned index of the destination node
+        max_depth: Maximum number of hops of the path, unbounded if None
+        max_visited: Maximum number of nodes to visit, unbounded if None
+        parents: Optional parent array for bfs_order, to prune nodes
+
+    Returns:
+        A list of interned indices from source to target, or None if no path exists
+
+    Raises:
+        SearchTruncated: If the budget runs out before the search is decided
+    """
+    paths = bfs_many(snapshot, source, {target}, max_depth, max_visited, parents)
+    return paths.get(target)
+
+
+def bfs_many(
+    snapshot: GraphSnapshot,
+    source: int,
+    targets: Set[int],
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
+    parents: Optional[array] = None,
+) -> Dict[int, List[int]]:
+    """
+    Find shortest paths from one source to several targets with a single BFS.
+
+    Each discovered node records its predecessor in an array over the interned
+    indices, so paths are rebuilt once at the end instead of copying a path
+    list for every enqueued node. The search stops as soon as every target
+    has been reached.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        source: Interned index of the starting node
+        targets: Interned indices of the destination nodes
+        max_depth: Maximum number of hops of the paths, unbounded if None
+        max_visited: Maximum number of nodes to visit, unbounded if None
+        parents: Optional parent array for bfs_order, to prune nodes that
+            cannot lead to a target (see Landmarks.pruned_parents)
+
+    Returns:
+        A mapping of each reachable target to its list of interned indices
+        from source to target; unreachable targets are left out
+
+    Raises:
+        SearchTruncated: If the budget runs out before every target is decided
+    """
+    remaining = set(targets)
+    paths = {}
+    if parents is None:
+        parents = array("i", [-1]) * len(snapshot)
+
+    # One level past max_depth tells "nothing left to explore" from "cut off"
+    depth_limit = None if max_depth is None else max_depth + 1
+    visited = 0
+
+    for node, depth in bfs_order(snapshot, source, depth_limit, parents=parents):
+        if depth_limit is not None and depth == depth_limit:
+            raise SearchTruncated(f"No path within max_depth={max_depth} hops.")
+
+        visited += 1
+        if max_visited is not None and visited > max_visited:
+            raise SearchTruncated(f"No path within max_visited={max_visited} nodes.")
+
+        if node in remaining:
+            paths[node] = _walk_parent_array(parents, source, node)
+            remaining.discard(node)
+            if not remaining:
+                break
+
+    return paths
+
+
+def multi_source_bfs(
+    snapshot: GraphSnapshot,
+    sources: Iterable[int],
+    targets: Iterable[int],
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
+    parents: Optional[array] = None,
+) -> Optional[List[int]]:
+    """
+    Find a shortest path from any of several sources to any of several targets.
+
+    A single BFS starts from all sources at once and stops at the first
+    target it discovers, which is the nearest one; membership in the target
+    set is checked in O(1) with a byte per node.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        sources: Interned indices of the starting nodes
+        targets: Interned indices of the destination nodes
+        max_depth: Maximum number of hops of the path, unbounded if None
+        max_visited: Maximum number of nodes to visit, unbounded if None
+        parents: Optional parent array for bfs_order, to prune nodes
+
+    Returns:
+        A list of interned indices from the nearest source to the nearest
+        target, or None if no target is reachable from any source
+
+    Raises:
+        SearchTruncated: If the budget runs out before the search is decided
+    """
+    is_target = bytearray(len(snapshot))
+    for target in targets:
+        is_target[target] = 1
+    if parents is None:
+        parents = array("i", [-1]) * len(snapshot)
+
+    depth_limit = None if max_depth is None else max_depth + 1
+    visited = 0
+
+    for node, depth in multi_source_bfs_order(snapshot, sources, depth_limit, parents):
+        if depth_limit is not None and depth == depth_limit:
+            raise SearchTruncated(f"No path within max_depth={max_depth} hops.")
+
+        visited += 1
+        if max_visited is not None and visited > max_visited:
+            raise SearchTruncated(f"No path within max_visited={max_visited} nodes.")
+
+        if is_target[node]:
+            return _walk_to_root(parents, node)
+
+    return None
+
+
+def bfs_order(
+    snapshot: GraphSnapshot,
+    source: int,
+    max_depth: Optional[int] = None,
+    parents: Optional[array] = None,
+) -> Iterator[Tuple[int, int]]:
+    """
+    Traverse the graph breadth first, one level at a time.
+
+    This is the traversal core shared by the one-sided searches. Nodes are
+    yielded as soon as they are discovered, so callers can stop early.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        source: Interned index of the starting node
+        max_depth: Maximum number of hops to explore, unbounded if None
+        parents: Optional array over the interned indices filled with -1; if
+            given, it receives the predecessor of every discovered node.
+            Nodes whose entry is not -1 are never visited
+
+    Yields:
+        (node, depth) tuples in BFS order, starting with (source, 0)
+    """
+    yield from multi_source_bfs_order(snapshot, [source], max_depth, parents)
+
+
+def multi_source_bfs_order(
+    snapshot: GraphSnapshot,
+    sources: Iterable[int],
+    max_depth: Optional[int] = None,
+    parents: Optional[array] = None,
+) -> Iterator[Tuple[int, int]]:
+    """
+    Traverse the graph breadth first from several sources at once.
+
+    Every source starts at depth 0, so each node is reached from its nearest
+    source. This is the traversal core of bfs_order.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        sources: Interned indices of the starting nodes
+        max_depth: Maximum number of hops to explore, unbounded if None
+        parents: Optional parent array, see bfs_order. Sources whose entry
+            is not -1 are skipped too
+
+    Yields:
+        (node, depth) tuples in BFS order, starting with the sources at depth 0
+    """
+    if parents is None:
+        parents = array("i", [-1]) * len(snapshot)
+    offsets, neighbors = snapshot.offsets, snapshot.targets
+
+    # -1 marks unvisited nodes; sources are their own parents
+    frontier, depth = [], 0
+    for source in sources:
+        if parents[source] != -1:
+            continue
+        parents[source] = source
+        frontier.append(source)
+        yield source, 0
+
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for current in frontier:
+            for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+                if parents[neighbor] != -1:
+                    continue
+
+                parents[neighbor] = current
+                next_frontier.append(neighbor)
+                yield neighbor, depth
+
+        frontier = next_frontier
+
+
+def neighborhood(
+    snapshot: GraphSnapshot,
+    source: int,
+    max_depth: int,
+    outgoing: bool = True,
+    incoming: bool = False,
+    limit: Optional[int] = None,
+) -> Tuple[Dict[int, int], bool]:
+    """
+    Collect the nodes within ``max_depth`` hops of a node, level by level.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        source: Interned index of the center node
+        max_depth: Maximum hop distance from the center
+        outgoing: Follow connections from node to neighbor
+        incoming: Follow connections from neighbor to node
+        limit: Maximum number of nodes to collect, unbounded if None
+
+    Returns:
+        A tuple of (distances, truncated): the hop distance of every collected
+        node, and whether nodes within max_depth were left out by the limit
+    """
+    adjacencies = []
+    if outgoing:
+        adjacencies.append((snapshot.offsets, snapshot.targets))
+    if incoming:
+        adjacencies.append((snapshot.in_offsets, snapshot.in_sources))
+
+    distances = {source: 0}
+    frontier, depth = [source], 0
+    while frontier and depth < max_depth:
+        depth += 1
+        next_frontier = []
+        for current in frontier:
+            for offsets, neighbors in adjacencies:
+                for neighbor in neighbors[offsets[current] : offsets[current + 1]]:
+                    if neighbor in distances:
+                        continue
+                    if limit is not None and len(distances) >= limit:
+                        return distances, True
+                    distances[neighbor] = depth
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+
+    return distances, False
+
+
+def induced_edges(
+    snapshot: GraphSnapshot, nodes: Iterable[int]
+) -> List[Tuple[int, int, float]]:
+    """
+    Return the connections between the given nodes.
+
+    Args:
+        snapshot: The graph snapshot to read
+        nodes: Interned indices of the subgraph nodes
+
+    Returns:
+        (source, target, weight) tuples of interned indices
+    """
+    members = set(nodes)
+    offsets, targets, weights = snapshot.offsets, snapshot.targets, snapshot.weights
+    edges = []
+    for node in members:
+        for position in range(offsets[node], offsets[node + 1]):
+            if targets[position] in members:
+                edges.append((node, targets[position], weights[position]))
+    return edges
+
+
+def direction_optimizing_bfs(
+    snapshot: GraphSnapshot,
+    source: int,
+    target: int,
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Optional[List[int]]:
+    """
+    Find a shortest path with a BFS that switches between top-down and bottom-up.
+
+    Top-down levels scan the outgoing connections of the frontier. On
+    scale-free graphs the middle levels reach hubs whose frontier covers most
+    of the graph; those levels run bottom-up instead, where every unvisited
+    node scans its incoming connections and stops at the first parent found
+    in the frontier. This skips most of the connections into already visited
+    nodes that a top-down level would inspect.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        source: Interned index of the starting node
+        target: Interned index of the destination node
+        max_depth: Maximum number of hops of the path, unbounded if None
+        max_visited: Maximum number of nodes to visit, unbounded if None;
+            checked after every level
+        stats: Optional dict that receives the number of "edges_inspected"
+            and of "bottom_up_levels"
+
+    Returns:
+        A list of interned indices from source to target, or None if no path exists
+
+    Raises:
+        SearchTruncated: If the budget runs out before the search is decided
+    """
+    if stats is not None:
+        stats.update(edges_inspected=0, bottom_up_levels=0)
+    if source == target:
+        return [source]
+
+    n = len(snapshot)
+    offsets, neighbors = snapshot.offsets, snapshot.targets
+    in_offsets, in_sources = snapshot.in_offsets, snapshot.in_sources
+
+    parents = array("i", [-1]) * n
+    parents[source] = source
+    num_visited = 1
+    unvisited_edges = snapshot.num_edges - (in_offsets[source + 1] - in_offsets[source])
+    unvisited = None  # Built by the first bottom-up level
+
+    frontier, previous_size, depth, bottom_up = [source], 0, 0, False
+    while frontier:
+        depth += 1
+        frontier_edges = 0
+        for node in frontier:
+            frontier_edges += offsets[node + 1] - offsets[node]
+
+        if not bottom_up:
+            bottom_up = frontier_edges > unvisited_edges / DIRECTION_ALPHA
+        elif len(frontier) < previous_size and len(frontier) < n / DIRECTION_BETA:
+            bottom_up = False
+
+        next_frontier = []
+        if bottom_up:
+            in_frontier = bytearray(n)
+            for node in frontier:
+                in_frontier[node] = 1
+
+            if unvisited is None:
+                unvisited = range(n)
+            remaining, inspected = [], 0
+            for node in unvisited:
+                if parents[node] != -1:
+                    continue
+                for position in range(in_offsets[node], in_offsets[node + 1]):
+                    inspected += 1
+                    parent = in_sources[position]
+                    if in_frontier[parent]:
+                        parents[node] = parent
+                        next_frontier.append(node)
+                        break
+                else:
+                    remaining.append(node)
+            unvisited = remaining
+        else:
+            inspected = frontier_edges
+            for node in frontier:
+                for neighbor in neighbors[offsets[node] : offsets[node + 1]]:
+                    if parents[neighbor] == -1:
+                        parents[neighbor] = node
+                        next_frontier.append(neighbor)
+
+        if stats is not None:
+            stats["edges_inspected"] += inspected
+            stats["bottom_up_levels"] += bottom_up
+
+        if next_frontier and max_depth is not None and depth > max_depth:
+            raise SearchTruncated(f"No path within max_depth={max_depth} hops.")
+        if parents[target] != -1:
+            return _walk_parent_array(parents, source, target)
+
+        num_visited += len(next_frontier)
+        if max_visited is not None and num_visited > max_visited:
+            raise SearchTruncated(f"No path within max_visited={max_visited} nodes.")
+
+        for node in next_frontier:
+            unvisited_edges -= in_offsets[node + 1] - in_offsets[node]
+
+        previous_size = len(frontier)
+        frontier = next_frontier
+
+    return None
+
+
+def bidirectional_bfs(
+    snapshot: GraphSnapshot,
+    source: int,
+    target: int,
+    max_depth: Optional[int] = None,
+    max_visited: Optional[int] = None,
+) -> Optional[List[int]]:
+    """
+    Find a shortest path with a BFS growing from both ends.
+
+    The source side follows outgoing connections and the target side follows
+    incoming connections. Each step expands one full level of whichever
+    frontier is smaller, which explores roughly O(b^(d/2)) nodes instead of
+    O(b^d) on high fan-out graphs.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        source: Interned index of the starting node
+        target: Interned index of the destination node
+        max_depth: Maximum number of hops of the path, unbounded if None
+        max_visited: Maximum number of nodes to visit, unbounded if None;
+            checked after every level, so a search may overshoot it by one
+            level
+
+    Returns:
+        A list of interned indices from source to target, or None if no path exists
+
+    Raises:
+        SearchTruncated: If the budget runs out before the search is decided
+    """
+    if source == target:
+        return [source]
+
+    forward_parents, forward_depths = {source: -1}, {source: 0}
+    backward_parents, backward_depths = {target: -1}, {target: 0}
+    forward_frontier, backward_frontier = [source], [target]
+
+    # Every expanded level adds one hop to the shortest possible path, so
+    # frontiers still growing past max_depth levels mean the search was cut off
+    levels = 0
+
+    while forward_frontier and backward_frontier:
+        if max_depth is not None and levels > max_depth:
+            raise SearchTruncated(f"No path within max_depth={max_depth} hops.")
+        if (
+            max_visited is not None
+            and len(forward_parents) + len(backward_parents) > max_visited
+        ):
+            raise SearchTruncated(f"No path within max_visited={max_visited} nodes.")
+
+        levels += 1
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = _expand_level(
+                forward_frontier,
+                snapshot.offsets,
+                snapshot.targets,
+                forward_parents,
+                forward_depths,
+                backward_depths,
+            )
+        else:
+            backward_frontier, meeting = _expand_level(
+                backward_frontier,
+                snapshot.in_offsets,
+                snapshot.in_sources,
+                backward_parents,
+                backward_depths,
+                forward_depths,
+            )
+
+        if meeting is not None:
+            if max_depth is not None and levels > max_depth:
+                raise SearchTruncated(f"No path within max_depth={max_depth} hops.")
+            path = _walk_parents(forward_parents, meeting)
+            path.reverse()
+            path.extend(_walk_parents(backward_parents, meeting)[1:])
+            return path
+
+    return None
+
+
+def _expand_level(frontier, offsets, neighbors, parents, depths, other_depths):
+    """
+    Expand one BFS level and return the next frontier and the best meeting node.
+
+    The whole level is expanded before returning so that, among all nodes where
+    the two searches meet, the one with the shortest total path is chosen.
+    """
+    next_frontier = []
+    meeting, meeting_length = None, None
+
+    for node in frontier:
+        depth = depths[node] + 1
+        for neighbor in neighbors[offsets[node] : offsets[node + 1]]:
+            if neighbor in parents:
+                continue
+
+            parents[neighbor] = node
+            depths[neighbor] = depth
+            next_frontier.append(neighbor)
+
+            other_depth = other_depths.get(neighbor)
+            if other_depth is not None and (
+                meeting_length is None or depth + other_depth < meeting_length
+            ):
+                meeting, meeting_length = neighbor, depth + other_depth
+
+    return next_frontier, meeting
+
+
+def dijkstra(
+    snapshot: GraphSnapshot,
+    source: int,
+    target: int,
+    lower_bound: Optional[Callable[[int], float]] = None,
+    max_visited: Optional[int] = None,
+) -> Optional[List[int]]:
+    """
+    Find a minimum-weight path with a heap-based Dijkstra search.
+
+    With a lower_bound function this becomes A*: nodes are popped in order of
+    distance + lower_bound(node), which must never overestimate the remaining
+    distance to the target (for example the landmark bounds of
+    nodes.landmarks.Landmarks). A bound of infinity marks nodes that cannot
+    reach the target, which are never expanded.
+
+    Args:
+        snapshot: The graph snapshot to traverse
+        source: Interned index of the starting node
+        target: Interned index of the destination node
+        lower_bound: Optional admissible and consistent estimate of the
+            remaining distance from a node to the target
+        max_visited: Maximum number of nodes to settle, unbounded if None
+
+    Returns:
+        A list of interned indices from source to target, or None if no path exists
+
+    Raises:
+        SearchTruncated: If max_visited nodes are settled before the target
+    """
+    if source == target:
+        return [source]
+
+    offsets, targets, weights = snapshot.offsets, snapshot.targets, snapshot.weights
+    distances = {source: 0.0}
+    parents = {source: -1}
+    heap = [(lower_bound(source) if lower_bound else 0.0, 0.0, source)]
+    settled = 0
+
+    while heap:
+        _, distance, node = heapq.heappop(heap)
+        if node == target:
+            path = _walk_parents(parents, target)
+            path.reverse()
+            return path
+        if distance > distances[node]:
+            continue  # Stale heap entry
+
+        settled += 1
+        if max_visited is not None and settled > max_visited:
+            raise SearchTruncated(f"No path within max_visited={max_visited} nodes.")
+
+        for position in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[position]
+            neighbor_distance = distance + weights[position]
+            if neighbor_distance >= distances.get(neighbor, math.inf):
+                continue
+
+            estimate = neighbor_distance
+            if lower_bound is not None:
+                bound = lower_bound(neighbor)
+                if bound == math.inf:
+                    continue
+                estimate += bound
+
+            distances[neighbor] = neighbor_distance
+            parents[neighbor] = node
+            heapq.heappush(heap, (estimate, neighbor_distance, neighbor))
+
+    return None
+
+
+def distances_from(
+    offsets: array,
+    neighbors: array,
+    weights: Optional[array],
+    source: int,
+    num_nodes: int,
+) -> array:
+    """
+    Compute the distance from one node to every node of a CSR adjacency.
+
+    Hop counts are computed with a level-by-level BFS, weighted distances
+    with Dijkstra. Pass the incoming adjacency to get distances *to* source.
+
+    Args:
+        offsets: CSR row offsets
+        neighbors: CSR column indices
+        weights: Weights aligned with neighbors, or None for hop counts
+        source: Interned index of the starting node
+        num_nodes: Number of interned nodes
+
+    Returns:
+        An array of distances over the interned indices; unreachable nodes
+        get UNREACHABLE_HOPS (int array) or infinity (float array)
+    """
+    if weights is None:
+        distances = array("i", [UNREACHABLE_HOPS]) * num_nodes
+        distances[source] = 0
+        frontier, depth = [source], 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbor in neighbors[offsets[node] : offsets[node + 1]]:
+                    if distances[neighbor] == UNREACHABLE_HOPS:
+                        distances[neighbor] = depth
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return distances
+
+    distances = array("d", [math.inf]) * num_nodes
+    distances[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if distance > distances[node]:
+            continue
+        for position in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[position]
+            neighbor_distance = distance + weights[position]
+            if neighbor_distance < distances[neighbor]:
+                distances[neighbor] = neighbor_distance
+                heapq.heappush(heap, (neighbor_distance, neighbor))
+    return distances
+
+
+def _walk_parent_array(parents: array, source: int, node: int) -> List[int]:
+    """Follow a parent array from ``node`` back to ``source``, in path order."""
+    path = [node]
+    while node != source:
+        node = parents[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def _walk_to_root(parents: array, node: int) -> List[int]:
+    """Follow a parent array from ``node`` back to a node that is its own parent."""
+    path = [node]
+    while parents[node] != node:
+        node = parents[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def _walk_parents(parents, node) -> List[int]:
+    """Follow parent pointers from ``node`` back to the search root."""
+    path = []
+    while node != -1:
+        path.append(node)
+        node = parents[node]
+    return path
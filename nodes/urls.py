@@ -9,11 +9,32 @@ urlpatterns = [
     path("health/", views.health_check, name="health_check"),
     # Node operations
     path("nodes/create/", views.create_node, name="create_node"),
+    path("nodes/bulk/", views.bulk_create_nodes, name="bulk_create_nodes"),
     path("nodes/", views.list_nodes, name="list_nodes"),
+    path(
+        "nodes/<str:name>/component/",
+        views.node_component,
+        name="node_component",
+    ),
+    path(
+        "nodes/<str:name>/reachable/",
+        views.reachable_nodes,
+        name="reachable_nodes",
+    ),
+    path(
+        "nodes/<str:name>/neighborhood/",
+        views.node_neighborhood,
+        name="node_neighborhood",
+    ),
     # Connection operations
     path("nodes/connect/", views.connect_nodes, name="connect_nodes"),
+    path("nodes/connect/bulk/", views.bulk_connect_nodes, name="bulk_connect_nodes"),
+    # Graph export
+    path("graph/export/", views.export_graph, name="export_graph"),
     # Path finding operations
     path("path/find/", views.find_path, name="find_path"),
+    path("path/find/batch/", views.find_path_batch, name="find_path_batch"),
+    path("path/find/nearest/", views.find_nearest_path, name="find_nearest_path"),
     path("path/slow-find/", views.slow_find_path, name="slow_find_path"),
     path(
         "path/result/<str:task_id>/",
@@ -1,20 +1,37 @@
+import json
 from datetime import datetime
 
 from celery.result import AsyncResult
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from .constants import BULK_ITEM_STATUSES, GRAPH_EXPORT_FORMATS
 from .models import Node
 from .serializers import (
+    BulkConnectNodesSerializer,
+    BulkCreateNodesSerializer,
     ConnectNodesSerializer,
     CreateNodeSerializer,
+    FindNearestPathSerializer,
+    FindPathBatchSerializer,
     FindPathSerializer,
+    GraphExportQuerySerializer,
+    NeighborhoodQuerySerializer,
     NodeSerializer,
+    ReachableQuerySerializer,
     TaskResultSerializer,
 )
 from .services import GraphService
 from .tasks import slow_find_path_task
+from .traversal import SearchTruncated
+
+EXPORT_CONTENT_TYPES = {
+    GRAPH_EXPORT_FORMATS.CSV.value: "text/csv",
+    GRAPH_EXPORT_FORMATS.NDJSON.value: "application/x-ndjson",
+    GRAPH_EXPORT_FORMATS.CSR.value: "application/octet-stream",
+}
 
 
 @api_view(["POST"])
@@ -43,37 +60,148 @@ def create_node(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["POST"])
+def bulk_create_nodes(request):
+    """
+    Create many nodes at once.
+
+    Accepts a list of names, up to settings.GRAPH_BULK_MAX_NODES. Duplicates
+    are ignored, and names that already exist are reported instead of
+    failing the request.
+
+    Request body:
+    {
+        "names": ["node_name", ...]
+    }
+
+    Returns:
+    - 201: At least one node was created
+    - 200: Every name already existed
+    - 400: Invalid input data
+    """
+    serializer = BulkCreateNodesSerializer(data=request.data)
+    if serializer.is_valid():
+        created, existing = GraphService.bulk_create_nodes(
+            serializer.validated_data["names"]
+        )
+        return Response(
+            {
+                "created": created,
+                "existing": existing,
+                "created_count": len(created),
+                "existing_count": len(existing),
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(["POST"])
 def connect_nodes(request):
     """
     Connect two nodes.
 
-    Accepts two parameters: from_node and to_node
+    Accepts two parameters: from_node and to_node, and an optional weight
+    (the non-negative cost of the connection, defaults to 1).
     Connects the from_node to the to_node.
 
     Request body:
     {
         "from_node": "source_node_name",
-        "to_node": "target_node_name"
+        "to_node": "target_node_name",
+        "weight": 1.0
     }
 
     Returns:
     - 201: Connection created successfully
     - 400: Invalid input data or nodes don't exist
+    - 409: The connection already exists
     """
     serializer = ConnectNodesSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    from_name = serializer.validated_data["from_node"]
+    to_name = serializer.validated_data["to_node"]
+    try:
+        connection = GraphService.create_connection(
+            from_name, to_name, serializer.validated_data["weight"]
+        )
+    except Node.DoesNotExist as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if connection is None:
+        return Response(
+            {"error": f"Connection from '{from_name}' to '{to_name}' already exists."},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    return Response(
+        {
+            "id": connection.id,
+            "message": f"Successfully connected '{from_name}' to '{to_name}'",
+            "from_node": from_name,
+            "to_node": to_name,
+            "weight": connection.weight,
+            "created_at": connection.created_at,
+        },
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@api_view(["POST"])
+def bulk_connect_nodes(request):
+    """
+    Connect many pairs of nodes at once.
+
+    Accepts a list of connections, up to settings.GRAPH_BULK_MAX_CONNECTIONS,
+    each with an optional weight (defaults to 1). Every connection gets its
+    own status: "created", "exists" when it was already there, or "invalid"
+    with an error for missing nodes and self-loops.
+
+    Request body:
+    {
+        "connections": [
+            {"from_node": "source_node_name", "to_node": "target_node_name", "weight": 1.0},
+            ...
+        ]
+    }
+
+    Returns:
+    - 201: At least one connection was created
+    - 200: No connection was created
+    - 400: Invalid input data
+    """
+    serializer = BulkConnectNodesSerializer(data=request.data)
 
     if serializer.is_valid():
-        connection = serializer.save()
+        connections = serializer.validated_data["connections"]
+        statuses = GraphService.bulk_connect(
+            [
+                (item["from_node"], item["to_node"], item["weight"])
+                for item in connections
+            ]
+        )
+
+        results = []
+        for item, (item_status, error) in zip(connections, statuses):
+            result = {
+                "from_node": item["from_node"],
+                "to_node": item["to_node"],
+                "status": item_status,
+            }
+            if error is not None:
+                result["error"] = error
+            results.append(result)
+
+        created_count = sum(
+            item_status == BULK_ITEM_STATUSES.CREATED.value
+            for item_status, _ in statuses
+        )
         return Response(
-            {
-                "id": connection.id,
-                "message": f"Successfully connected '{connection.from_node.name}' to '{connection.to_node.name}'",
-                "from_node": connection.from_node.name,
-                "to_node": connection.to_node.name,
-                "created_at": connection.created_at,
-            },
-            status=status.HTTP_201_CREATED,
+            {"results": results, "count": len(results), "created_count": created_count},
+            status=status.HTTP_201_CREATED if created_count else status.HTTP_200_OK,
         )
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -84,17 +212,29 @@ def find_path(request):
     """
     Find a path between two nodes.
 
-    Accepts two parameters: from_node and to_node
+    Accepts two parameters: from_node and to_node, and an optional search mode
+    ("bfs", "bidirectional", "cte", "lazy", "weighted" or "hybrid", defaults
+    to settings.GRAPH_FIND_PATH_MODE). All modes minimize the number of hops,
+    except "weighted" which minimizes the sum of connection weights.
     Returns a list of node names representing the path or None if no path exists.
 
+    The optional max_depth (hops) and max_visited (nodes) budgets bound the
+    work of the search, capped at settings.GRAPH_FIND_PATH_MAX_DEPTH and
+    settings.GRAPH_FIND_PATH_MAX_VISITED. When the budget runs out before the
+    search can tell whether a path exists, "truncated" is true and
+    "path_exists" is null.
+
     Request body:
     {
         "from_node": "source_node_name",
-        "to_node": "target_node_name"
+        "to_node": "target_node_name",
+        "mode": "bidirectional",
+        "max_depth": 6,
+        "max_visited": 100000
     }
 
     Returns:
-    - 200: Path found or no path exists (both are successful responses)
+    - 200: Path found, no path exists or search truncated (all successful responses)
     - 400: Invalid input data or nodes don't exist
     """
     serializer = FindPathSerializer(data=request.data)
@@ -103,7 +243,25 @@ def find_path(request):
         from_node = serializer.validated_data["from_node"]
         to_node = serializer.validated_data["to_node"]
 
-        path = GraphService.find_path(from_node, to_node)
+        try:
+            path = GraphService.find_path(
+                from_node,
+                to_node,
+                mode=serializer.validated_data.get("mode"),
+                max_depth=serializer.validated_data.get("max_depth"),
+                max_visited=serializer.validated_data.get("max_visited"),
+            )
+        except SearchTruncated as e:
+            return Response(
+                {
+                    "path": None,
+                    "from_node": from_node.name,
+                    "to_node": to_node.name,
+                    "path_exists": None,
+                    "truncated": True,
+                    "message": str(e),
+                }
+            )
 
         return Response(
             {
@@ -111,24 +269,269 @@ def find_path(request):
                 "from_node": from_node.name,
                 "to_node": to_node.name,
                 "path_exists": path is not None,
+                "truncated": False,
             },  # status=status.HTTP_200_OK if path is not None else status.HTTP_404_NOT_FOUND
         )
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["POST"])
+def find_path_batch(request):
+    """
+    Find paths between many pairs of nodes.
+
+    Accepts a list of (from_node, to_node) pairs. Pairs sharing a source node
+    are answered by a single traversal, and results are returned in input order.
+
+    Request body:
+    {
+        "pairs": [
+            {"from_node": "source_node_name", "to_node": "target_node_name"},
+            ...
+        ]
+    }
+
+    Returns:
+    - 200: One result per pair, with an error for pairs whose nodes don't exist
+    - 400: Invalid input data
+    """
+    serializer = FindPathBatchSerializer(data=request.data)
+
+    if serializer.is_valid():
+        pairs = serializer.validated_data["pairs"]
+        node_ids = serializer.validated_data["node_ids"]
+
+        resolved = [
+            (node_ids[pair["from_node"]], node_ids[pair["to_node"]])
+            for pair in pairs
+            if pair["from_node"] in node_ids and pair["to_node"] in node_ids
+        ]
+        paths = iter(GraphService.find_paths(resolved))
+
+        results = []
+        for pair in pairs:
+            result = {"from_node": pair["from_node"], "to_node": pair["to_node"]}
+            missing = [
+                name
+                for name in (pair["from_node"], pair["to_node"])
+                if name not in node_ids
+            ]
+            if missing:
+                result["error"] = f"Node with name '{missing[0]}' does not exist."
+            else:
+                path = next(paths)
+                result["path"] = path
+                result["path_exists"] = path is not None
+            results.append(result)
+
+        return Response({"results": results, "count": len(results)})
+
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["POST"])
+def find_nearest_path(request):
+    """
+    Find a shortest path from any of several nodes to any of several others.
+
+    Accepts two lists of node names, from_nodes and to_nodes, and the optional
+    max_depth and max_visited budgets of find_path. The whole query is
+    answered by a single multi-source BFS. Returns the path between the
+    nearest (source, target) pair, or None if no target is reachable.
+
+    Request body:
+    {
+        "from_nodes": ["source_node_name", ...],
+        "to_nodes": ["target_node_name", ...],
+        "max_depth": 6
+    }
+
+    Returns:
+    - 200: Path found, no path exists or search truncated
+    - 400: Invalid input data or nodes don't exist
+    """
+    serializer = FindNearestPathSerializer(data=request.data)
+
+    if serializer.is_valid():
+        node_ids = serializer.validated_data["node_ids"]
+
+        try:
+            path = GraphService.find_nearest_path(
+                [node_ids[name] for name in serializer.validated_data["from_nodes"]],
+                [node_ids[name] for name in serializer.validated_data["to_nodes"]],
+                max_depth=serializer.validated_data.get("max_depth"),
+                max_visited=serializer.validated_data.get("max_visited"),
+            )
+        except SearchTruncated as e:
+            return Response(
+                {
+                    "path": None,
+                    "from_node": None,
+                    "to_node": None,
+                    "path_exists": None,
+                    "truncated": True,
+                    "message": str(e),
+                }
+            )
+
+        return Response(
+            {
+                "path": path,
+                "from_node": path[0] if path else None,
+                "to_node": path[-1] if path else None,
+                "path_exists": path is not None,
+                "truncated": False,
+            }
+        )
+
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["GET"])
+def node_component(request, name):
+    """
+    Get the strongly connected component of a node.
+
+    All nodes of a component can reach each other. Component ids are only
+    stable within one graph version.
+
+    URL parameter:
+    - name: The name of the node
+
+    Returns:
+    - 200: The component id and size, the number of components and the
+      sizes of the largest components
+    - 404: Node not found
+    """
+    try:
+        node = GraphService.get_node_by_name(name)
+    except Node.DoesNotExist:
+        return Response(
+            {"error": f"Node with name '{name}' does not exist."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    component = GraphService.get_component(node)
+    if component is None:
+        return Response(
+            {"error": f"Node with name '{name}' is not indexed yet."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return Response({"node": node.name, **component})
+
+
+@api_view(["GET"])
+def reachable_nodes(request, name):
+    """
+    Stream every node reachable from a node with its hop distance.
+
+    URL parameter:
+    - name: The name of the starting node
+
+    Query parameters:
+    - max_depth: Optional maximum hop distance
+
+    The response is newline-delimited JSON, one object per node in BFS order:
+    {"node": "node_name", "distance": 0}
+
+    Returns:
+    - 200: Stream of reachable nodes (starting with the node itself)
+    - 400: Invalid query parameters
+    - 404: Node not found
+    """
+    serializer = ReachableQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        node = GraphService.get_node_by_name(name)
+    except Node.DoesNotExist:
+        return Response(
+            {"error": f"Node with name '{name}' does not exist."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    reachable = GraphService.reachable_from(
+        node, max_depth=serializer.validated_data.get("max_depth")
+    )
+    return StreamingHttpResponse(
+        (
+            json.dumps({"node": node_name, "distance": distance}) + "\n"
+            for node_name, distance in reachable
+        ),
+        content_type="application/x-ndjson",
+    )
+
+
+@api_view(["GET"])
+def node_neighborhood(request, name):
+    """
+    Get the subgraph within a number of hops of a node.
+
+    URL parameter:
+    - name: The name of the center node
+
+    Query parameters:
+    - depth: Maximum hop distance (default 1)
+    - direction: "out" (default), "in" or "both"
+    - limit: Maximum number of nodes, capped at settings.GRAPH_NEIGHBORHOOD_MAX_NODES
+
+    Returns the nodes with their hop distance, in BFS order, and every
+    connection between them. "truncated" is true when the limit left nodes
+    within the depth out.
+
+    Returns:
+    - 200: Neighborhood returned
+    - 400: Invalid query parameters
+    - 404: Node not found
+    """
+    serializer = NeighborhoodQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        node = GraphService.get_node_by_name(name)
+    except Node.DoesNotExist:
+        return Response(
+            {"error": f"Node with name '{name}' does not exist."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    neighborhood = GraphService.neighborhood(node, **serializer.validated_data)
+    return Response(
+        {
+            "node": node.name,
+            **serializer.validated_data,
+            "nodes": [
+                {"name": node_name, "distance": distance}
+                for node_name, distance in neighborhood["nodes"]
+            ],
+            "edges": [
+                {"from_node": from_name, "to_node": to_name, "weight": weight}
+                for from_name, to_name, weight in neighborhood["edges"]
+            ],
+            "truncated": neighborhood["truncated"],
+        }
+    )
+
+
 @api_view(["POST"])
 def slow_find_path(request):
     """
     Initiate a slow path-finding operation using Celery.
 
     This endpoint enqueues a Celery task that sleeps for 5 seconds
-    and then calls the path-finding logic.
+    and then calls the path-finding logic with the optional search mode and
+    max_depth/max_visited budgets, as find_path does.
 
     Request body:
     {
         "from_node": "source_node_name",
-        "to_node": "target_node_name"
+        "to_node": "target_node_name",
+        "mode": "bfs",
+        "max_depth": 6
     }
 
     Returns:
@@ -142,7 +545,13 @@ def slow_find_path(request):
         to_node = serializer.validated_data["to_node"]
 
         # Start the Celery task
-        task = slow_find_path_task.delay(from_node.name, to_node.name)
+        task = slow_find_path_task.delay(
+            from_node.name,
+            to_node.name,
+            mode=serializer.validated_data.get("mode"),
+            max_depth=serializer.validated_data.get("max_depth"),
+            max_visited=serializer.validated_data.get("max_visited"),
+        )
 
         return Response(
             {
@@ -238,6 +647,41 @@ def list_nodes(request):
     )
 
 
+@api_view(["GET"])
+def export_graph(request):
+    """
+    Stream the whole graph as a file.
+
+    Query parameters:
+    - kind: "edges" (default) or "nodes"
+    - output: "csv" (default), "ndjson" or "csr"
+
+    CSV exports start with a header row, NDJSON exports hold one object per
+    line ({"from_node", "to_node", "weight"} or {"name"}), and edge exports
+    can be imported again with the import_graph command. "csr" streams the
+    binary CSR file of the whole graph, as written by export_graph_csr.
+
+    Returns:
+    - 200: Stream of the export file
+    - 400: Invalid query parameters
+    """
+    serializer = GraphExportQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    kind = serializer.validated_data["kind"]
+    output = serializer.validated_data["output"]
+    filename = (
+        "graph.csr" if output == GRAPH_EXPORT_FORMATS.CSR.value else f"{kind}.{output}"
+    )
+    response = StreamingHttpResponse(
+        GraphService.export_graph(kind, output),
+        content_type=EXPORT_CONTENT_TYPES[output],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 @api_view(["GET"])
 def health_check(request):
     """